@@ -0,0 +1,556 @@
+"""
+Benchmarks for the Exercise 1 maths quiz.
+
+Usage:
+    python bench.py startup [--gif "start screen.gif"]
+    python bench.py firstpaint [--frames 10 100 1000]
+    python bench.py animation [--seconds 5] [--draw-ms 4] [--stall-ms 150]
+    python bench.py transitions [--questions 1000]
+    python bench.py bank [--questions 10000000] [--sessions 1000000]
+    python bench.py feedback [--games 100]
+    python bench.py telemetry [--sessions 20000]
+    python bench.py history [--sessions 2000000]
+
+Each start-up case runs in a fresh subprocess so that peak RSS and the
+disk sprite cache state are not polluted by earlier runs. The quiz script
+builds its Tk window at import time, so the benchmarks drive its helper
+modules directly.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GIF_SIZE = (500, 550)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(*argv):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "_child", *argv],
+                         check=True, capture_output=True, text=True, cwd=HERE)
+    return json.loads(out.stdout)
+
+
+def tk_root():
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+
+def child(task, gif, cache_dir):
+    from PIL import Image, ImageSequence, ImageTk
+    from gif_frames import FrameCache
+
+    root = tk_root()
+    convert = ImageTk.PhotoImage if root is not None else None
+    base = peak_rss_mb()
+    t0 = time.perf_counter()
+    if task == "legacy":
+        # the original show_start_screen(): decode, resize and convert every frame
+        frames = []
+        for frame in ImageSequence.Iterator(Image.open(gif)):
+            frame = frame.resize(GIF_SIZE)
+            frames.append(convert(frame) if convert else frame)
+        first = total = time.perf_counter() - t0
+        again = total
+    else:
+        cache = FrameCache(cache_dir=cache_dir, convert=convert)
+        frames = cache.get(gif, GIF_SIZE)
+        frames.frame(0)
+        first = time.perf_counter() - t0
+        while not frames.complete and frames.error is None:
+            time.sleep(0.001)
+        total = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        cache.get(gif, GIF_SIZE)
+        again = time.perf_counter() - t1
+        # let the background sprite write finish before the process exits
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread():
+                thread.join()
+    print(json.dumps({"frames": len(frames), "first": first, "total": total, "again": again,
+                      "tk": root is not None, "peak_rss_mb": peak_rss_mb(), "base_rss_mb": base}))
+
+
+def bench_startup(args):
+    gif = os.path.abspath(args.gif)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = [("legacy", run_child("legacy", gif, cache_dir))]
+        results.append(("cold cache", run_child("cache", gif, cache_dir)))
+        results.append(("disk cache", run_child("cache", gif, cache_dir)))
+        sprites = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+
+    tk = "with Tk PhotoImages" if results[0][1]["tk"] else "PIL frames only (no display for Tk)"
+    print(f"{os.path.basename(gif)}: {results[0][1]['frames']} frames scaled to "
+          f"{GIF_SIZE[0]}x{GIF_SIZE[1]}, {tk}; sprite file {sprites / 1e6:.1f} MB")
+    print(f"{'start':>12} {'first frame ms':>15} {'all frames ms':>14} {'revisit ms':>11} {'peak RSS MB':>12}")
+    for label, r in results:
+        print(f"{label:>12} {r['first'] * 1000:>15.0f} {r['total'] * 1000:>14.0f} "
+              f"{r['again'] * 1000:>11.2f} {r['peak_rss_mb'] - r['base_rss_mb']:>12.1f}")
+
+
+def make_gif(path, frames, size=(250, 275)):
+    """A synthetic animated GIF: a square moving over a gradient"""
+    from PIL import Image, ImageDraw
+    base = Image.linear_gradient("L").resize(size).convert("RGB")
+    images = []
+    for i in range(frames):
+        im = base.copy()
+        x = i * 7 % (size[0] - 40)
+        ImageDraw.Draw(im).rectangle((x, 40 + i % 50, x + 40, 80 + i % 50),
+                                     fill=(i * 37 % 256, 90, 200))
+        images.append(im.quantize(64, dither=Image.Dither.NONE))
+    images[0].save(path, save_all=True, append_images=images[1:], duration=40, loop=0)
+
+
+def bench_firstpaint(args):
+    print(f"synthetic GIFs scaled to {GIF_SIZE[0]}x{GIF_SIZE[1]}; first paint = frame 0 ready to draw")
+    print(f"{'frames':>7} {'start':>11} {'first paint ms':>15} {'all frames ms':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.frames:
+            gif = os.path.join(tmp, f"synthetic_{n}.gif")
+            make_gif(gif, n)
+            cache_dir = os.path.join(tmp, f"sprites_{n}")
+            for label, task in (("legacy", "legacy"), ("cold cache", "cache"), ("disk cache", "cache")):
+                r = run_child(task, gif, cache_dir)
+                print(f"{n:>7} {label:>11} {r['first'] * 1000:>15.1f} {r['total'] * 1000:>14.0f}")
+
+
+class TimerLoop:
+    """Stand-in for a Tk root (after/after_cancel/mainloop) when there is no display"""
+
+    def __init__(self):
+        self.timers = []
+        self.running = True
+
+    def after(self, ms, fn):
+        self.timers.append([time.monotonic() + ms / 1000, fn])
+        return self.timers[-1]
+
+    def after_cancel(self, timer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def quit(self):
+        self.running = False
+
+    def mainloop(self):
+        while self.running and self.timers:
+            self.timers.sort(key=lambda t: t[0])
+            due, fn = self.timers.pop(0)
+            time.sleep(max(0.0, due - time.monotonic()))
+            fn()
+
+
+class Durations:
+    """Just the timing of a GIF, which is all the schedulers look at"""
+
+    def __init__(self, durations):
+        self.durations = durations
+        self.ready = len(durations)
+
+
+def busy(ms):
+    # stands in for work that holds the event loop (PhotoImage, layout, ...)
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def run_animation(root, kind, gif, seconds, draw_ms, stall_ms):
+    """Play gif for `seconds` with the event loop stalled every half second"""
+    from frame_scheduler import FrameScheduler
+
+    shown = []
+
+    def draw(i):
+        shown.append((i, time.monotonic()))
+        busy(draw_ms)
+
+    def stall():
+        busy(stall_ms)
+        root.after(500, stall)
+
+    if kind == "legacy":
+        # the original animate_gif(): a fixed 80 ms re-arm after each frame
+        state = {"i": 0, "id": None}
+
+        def animate():
+            draw(state["i"])
+            state["i"] = (state["i"] + 1) % gif.ready
+            state["id"] = root.after(80, animate)
+        stop = lambda: root.after_cancel(state["id"])
+        start = time.monotonic()
+        animate()
+    else:
+        animation = FrameScheduler(root, gif, draw)
+        stop = animation.stop
+        start = time.monotonic()
+        animation.start()
+    root.after(250, stall)
+    root.after(int(seconds * 1000), lambda: (stop(), root.quit()))
+    root.mainloop()
+    elapsed = time.monotonic() - start
+
+    # how far the last frame drawn was behind the GIF's own timeline: the
+    # frames before it, shown or skipped, should have taken `due` seconds
+    due = 0.0
+    for (a, _), (b, _) in zip(shown, shown[1:]):
+        while a != b:
+            due += gif.durations[a] / 1000
+            a = (a + 1) % gif.ready
+    dropped = sum((b - a - 1) % gif.ready for (a, _), (b, _) in zip(shown, shown[1:]))
+    result = {"shown": len(shown), "dropped": dropped, "fps": len(shown) / elapsed,
+              "target_fps": 1000 * gif.ready / sum(gif.durations),
+              "behind_ms": 1000 * (shown[-1][1] - start - due), "jitter_ms": None}
+    if kind != "legacy":
+        result["jitter_ms"] = animation.stats.jitter_ms
+    return result
+
+
+def bench_animation(args):
+    import tkinter as tk
+    from PIL import Image, ImageSequence
+
+    with Image.open(args.gif) as im:
+        gif = Durations([f.info.get("duration") or 80 for f in ImageSequence.Iterator(im)])
+    print(f"{os.path.basename(args.gif)}: {gif.ready} frames, {min(gif.durations)}-"
+          f"{max(gif.durations)} ms each; {args.draw_ms} ms per frame drawn, "
+          f"{args.stall_ms} ms stall every 500 ms, {args.seconds} s")
+    print(f"{'scheduler':>10} {'fps':>6} {'target':>7} {'shown':>6} {'dropped':>8} "
+          f"{'behind GIF ms':>14} {'jitter ms':>10}")
+    for kind in ("legacy", "scheduler"):
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError:
+            root = TimerLoop()
+        r = run_animation(root, kind, gif, args.seconds, args.draw_ms, args.stall_ms)
+        if isinstance(root, tk.Tk):
+            root.destroy()
+        jitter = "-" if r["jitter_ms"] is None else f"{r['jitter_ms']:.1f}"
+        print(f"{kind:>10} {r['fps']:>6.1f} {r['target_fps']:>7.1f} {r['shown']:>6} "
+              f"{r['dropped']:>8} {r['behind_ms']:>14.0f} {jitter:>10}")
+
+
+def legacy_problem(root, number, score, problem):
+    """The original displayProblem(): destroy everything, build it all again"""
+    import tkinter as tk
+    from quiz_screens import BG_COLOR, BUTTON_COLOR, BUTTON_HOVER, HEADER_COLOR, LIGHT_TEXT, TEXT_COLOR
+
+    for widget in root.winfo_children():
+        widget.destroy()
+    tk.Label(root, text=f"📝 Question {number}/10", font=("Comic Sans MS", 18, "bold"),
+             bg=HEADER_COLOR, fg=LIGHT_TEXT, pady=12).pack(fill=tk.X)
+    tk.Label(root, text=f"Current Score: {score}/100", font=("Arial", 14, "bold"),
+             bg=BG_COLOR, fg="#27ae60").pack(pady=15)
+    problem_frame = tk.Frame(root, bg="#ff76bd", relief=tk.RAISED, borderwidth=3)
+    problem_frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
+    tk.Label(problem_frame, text=f"{problem} = ?", font=("Arial", 32, "bold"),
+             bg="#ff76bd", fg=HEADER_COLOR, pady=30).pack()
+    tk.Label(root, text="Enter your answer:", font=("Arial", 12),
+             bg=BG_COLOR, fg=TEXT_COLOR).pack(pady=5)
+    answer_entry = tk.Entry(root, font=("Arial", 20), width=15, justify='center',
+                            relief=tk.SOLID, borderwidth=2)
+    answer_entry.pack(pady=10)
+    answer_entry.focus()
+    answer_entry.bind('<Return>', lambda event: None)
+    tk.Button(root, text="✓ Submit Answer", font=("Arial", 14, "bold"),
+              bg=BUTTON_COLOR, fg=LIGHT_TEXT, activebackground=BUTTON_HOVER,
+              width=20, height=2, command=lambda: None).pack(pady=15)
+
+
+def bench_transitions(args):
+    import random
+    import tkinter as tk
+    from quiz_screens import MenuScreen, ProblemScreen, ResultsScreen, StartScreen
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("transitions needs a display (Tk could not start); run it on a desktop session")
+        return
+    root.geometry("500x550")
+
+    def commands():
+        return set(root.tk.splitlist(root.tk.call("info", "commands")))
+
+    def run(label, transition):
+        times, churn = [], 0
+        for n in range(args.questions):
+            problem = f"{random.randint(10, 99)} {random.choice('+-')} {random.randint(10, 99)}"
+            before = commands()
+            t0 = time.perf_counter()
+            transition(n % 10 + 1, n % 10 * 10, problem)
+            root.update_idletasks()     # geometry and redraw the user waits for
+            times.append(time.perf_counter() - t0)
+            churn += len(before ^ commands())
+        times.sort()
+        print(f"{label:>10} {1000 * sum(times) / len(times):>9.3f} "
+              f"{1000 * times[len(times) // 2]:>8.3f} {1000 * times[int(len(times) * 0.99)]:>8.3f} "
+              f"{churn / args.questions:>16.1f}")
+
+    print(f"{args.questions} question transitions, timed up to update_idletasks()")
+    print(f"{'screens':>10} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'Tcl cmds churned':>16}")
+    run("rebuild", lambda number, score, problem: legacy_problem(root, number, score, problem))
+    for widget in root.winfo_children():
+        widget.destroy()
+
+    StartScreen(root, on_start=None)
+    MenuScreen(root, on_level=None, on_quit=None)
+    ResultsScreen(root, on_again=None, on_quit=None)
+    screen = ProblemScreen(root, on_submit=lambda: None)
+
+    def reuse(number, score, problem):
+        screen.set_question(number, score, problem)
+        screen.show()
+    run("persistent", reuse)
+    root.destroy()
+
+
+def bench_feedback(args):
+    import random
+    import tkinter as tk
+    from quiz_app import QuizApp
+    from quiz_driver import QuizDriver
+    from quiz_engine import QuizEngine
+    from quiz_sim import parse_model
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("feedback needs a display (Tk could not start); run it on a desktop session")
+        return
+    root.geometry("500x550")
+
+    # the old flow, minus the click every messagebox waited for: rebuild
+    # the problem screen from scratch after each settled answer
+    rebuild = []
+    for n in range(200):
+        t0 = time.perf_counter()
+        legacy_problem(root, n % 10 + 1, 50, f"{n} + {n}")
+        root.update_idletasks()
+        rebuild.append(time.perf_counter() - t0)
+    for widget in root.winfo_children():
+        widget.destroy()
+
+    driver = QuizDriver(QuizApp(root, engine=QuizEngine(random.Random(1))))
+    model, rng = parse_model(args.model), random.Random(2)
+    steps = []
+    for _ in range(args.games):
+        driver.start(2)
+        steps += driver.play(model, rng)
+    settled = sorted(s.seconds for s in steps if s.settled)
+    rebuild.sort()
+    root.destroy()
+
+    def row(label, times, extra=""):
+        print(f"{label:>28} {1000 * times[len(times) // 2]:>8.3f} "
+              f"{1000 * times[int(len(times) * 0.99)]:>8.3f} {extra}")
+    print(f"{args.games} games through QuizDriver, answer to next question laid out")
+    print(f"{'':>28} {'p50 ms':>8} {'p99 ms':>8}")
+    row("messagebox + rebuild", rebuild, "+ a click on every dialog")
+    row("banner + persistent screen", settled)
+
+
+def bench_telemetry(args):
+    import random
+    from quiz_engine import QuizEngine
+    from quiz_sim import parse_model
+    from quiz_telemetry import BUDGET_US, Telemetry, open_sink
+
+    class NullSink:
+        def write(self, events):
+            pass
+
+        def close(self):
+            pass
+
+    def run(telemetry):
+        # the calls QuizApp makes, without the window
+        engine, rng = QuizEngine(random.Random(1)), random.Random(2)
+        model = parse_model("retry:0.6,0.9")
+        t0 = time.perf_counter()
+        for _ in range(args.sessions):
+            engine.start(2)
+            if telemetry:
+                telemetry.start()
+                telemetry.shown(engine)
+            while not engine.finished:
+                question, number, attempt = engine.question, engine.question_number, engine.attempts
+                value = model(rng, 2, question, attempt)
+                outcome = engine.submit(value)
+                if telemetry:
+                    telemetry.answered(2, number, question, attempt, value, outcome)
+                    if not outcome.retry and not engine.finished:
+                        telemetry.shown(engine)
+        if telemetry:
+            telemetry.close()
+        return time.perf_counter() - t0, telemetry.recorded if telemetry else 0
+
+    base, _ = run(None)
+    print(f"{args.sessions:,} headless sessions; budget {BUDGET_US} us per event")
+    print(f"{'sink':>8} {'events':>10} {'us/event':>9} {'budget':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, sink in (("memory", NullSink()),
+                            ("jsonl", open_sink(os.path.join(tmp, "t.jsonl"))),
+                            ("sqlite", open_sink(os.path.join(tmp, "t.db")))):
+            seconds, events = run(Telemetry(sink))
+            per = 1e6 * (seconds - base) / events
+            print(f"{label:>8} {events:>10,} {per:>9.2f} {'ok' if per <= BUDGET_US else 'OVER':>7}")
+
+
+def bench_bank(args):
+    import random
+    from question_bank import QuestionBank
+
+    def legacy(n, level):
+        # the original randomInt() and decideOperation(), once per question
+        ranges = {1: (1, 9), 2: (10, 99), 3: (1000, 9999)}
+        low, high = ranges[level]
+        return [(random.randint(low, high), random.choice(['+', '-']), random.randint(low, high))
+                for _ in range(n)]
+
+    sample = min(args.questions, 1_000_000)
+    print(f"{args.questions:,} questions per level, {args.sessions:,} sessions of 10; "
+          f"legacy timed on {sample:,} and scaled")
+    print(f"{'level':>5} {'legacy s':>9} {'bank s':>7} {'no-neg s':>9} {'python s':>9} {'sessions s':>11}")
+    for level in (1, 2, 3):
+        t0 = time.perf_counter()
+        legacy(sample, level)
+        old = (time.perf_counter() - t0) * args.questions / sample
+
+        timings = []
+        for bank, n in ((QuestionBank(seed=1), args.questions),
+                        (QuestionBank(seed=1, no_negative=True), args.questions),
+                        (QuestionBank(seed=1, use_numpy=False), sample)):
+            t0 = time.perf_counter()
+            bank.generate(n, level)
+            timings.append((time.perf_counter() - t0) * args.questions / n)
+        t0 = time.perf_counter()
+        QuestionBank(seed=1).sessions_array(args.sessions, level)
+        sessions = time.perf_counter() - t0
+        print(f"{level:>5} {old:>9.2f} {timings[0]:>7.3f} {timings[1]:>9.3f} {timings[2]:>9.2f} "
+              f"{sessions:>11.3f}")
+
+
+def bench_history(args):
+    import random
+    import statistics
+    from score_history import ScoreHistory
+
+    rng = random.Random(1)
+    players = [f"player{i}" for i in range(args.players)]
+
+    def rows(n):
+        now = time.time()
+        for i in range(n):
+            # a score out of 100 in steps of 5, most quizzes in the 60s-80s
+            score = 5 * min(20, max(0, round(rng.gauss(14, 3))))
+            yield (rng.choice(players), rng.randint(1, 3), score,
+                   [rng.randint(800, 9000) for _ in range(10)], now - n + i)
+
+    def timed(fn, repeat=200):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(1000 * (time.perf_counter() - t0))
+        return statistics.median(times), max(times)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = ScoreHistory(os.path.join(tmp, "scores.db"))
+        t0 = time.perf_counter()
+        for start in range(0, args.sessions, 100_000):
+            history.record_many(rows(min(100_000, args.sessions - start)))
+        fill = time.perf_counter() - t0
+        size = os.path.getsize(history.path) / 2**20
+        print(f"{args.sessions:,} sessions of {args.players:,} players stored in {fill:.1f} s "
+              f"({args.sessions / fill:,.0f}/s), {size:.0f} MB")
+
+        who = players[0]
+        cases = (
+            ("record one quiz", lambda: history.record(who, 2, 75, [3000] * 10), 50),
+            ("top 10 of a level", lambda: history.top(2, 10), 200),
+            ("rank of a score", lambda: history.rank(2, 75), 200),
+            ("percentile of a score", lambda: history.percentile(2, 75), 200),
+            ("a player's rank", lambda: history.player_rank(who, 2), 200),
+            ("a player's history", lambda: history.history(who), 200),
+            # what rank() would cost counting the sessions themselves
+            ("rank by COUNT(*)", lambda: history.db.execute(
+                "SELECT count(*) FROM sessions WHERE level = 2 AND score > 75").fetchone(), 5),
+        )
+        print(f"{'query':>22} {'median ms':>10} {'max ms':>8}")
+        for label, fn, repeat in cases:
+            median, worst = timed(fn, repeat)
+            print(f"{label:>22} {median:>10.3f} {worst:>8.3f}")
+        history.close()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_child":
+        child(*sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("startup", help="time to first frame and memory of the start screen GIF")
+    p.add_argument("--gif", default=os.path.join(HERE, "start screen.gif"))
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("firstpaint", help="time to first paint for synthetic GIFs of growing length")
+    p.add_argument("--frames", type=int, nargs="+", default=[10, 100, 1000])
+    p.set_defaults(func=bench_firstpaint)
+
+    p = sub.add_parser("animation", help="frame rate and timing of the start screen animation")
+    p.add_argument("--gif", default=os.path.join(HERE, "start screen.gif"))
+    p.add_argument("--seconds", type=float, default=5)
+    p.add_argument("--draw-ms", type=float, default=4)
+    p.add_argument("--stall-ms", type=float, default=150)
+    p.set_defaults(func=bench_animation)
+
+    p = sub.add_parser("transitions", help="latency and Tcl object churn of moving to the next question")
+    p.add_argument("--questions", type=int, default=1000)
+    p.set_defaults(func=bench_transitions)
+
+    p = sub.add_parser("bank", help="bulk question generation against per-question randint")
+    p.add_argument("--questions", type=int, default=10_000_000)
+    p.add_argument("--sessions", type=int, default=1_000_000)
+    p.set_defaults(func=bench_bank)
+
+    p = sub.add_parser("telemetry", help="cost per telemetry event with each sink")
+    p.add_argument("--sessions", type=int, default=20_000)
+    p.set_defaults(func=bench_telemetry)
+
+    p = sub.add_parser("history", help="leaderboard and rank queries over a large score history")
+    p.add_argument("--sessions", type=int, default=2_000_000)
+    p.add_argument("--players", type=int, default=10_000)
+    p.set_defaults(func=bench_history)
+
+    p = sub.add_parser("feedback", help="answer-to-next-question time with the feedback banner")
+    p.add_argument("--games", type=int, default=100)
+    p.add_argument("--model", default="retry:0.6,0.9")
+    p.set_defaults(func=bench_feedback)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Play GIF frames on the Tk event loop at their own durations.
+
+Re-arming with a fixed root.after(80, ...) ignores the GIF's timing and
+drifts: every frame also waits for the callback itself and for whatever
+else the event loop was busy with. FrameScheduler keeps an absolute
+deadline for the next frame on a monotonic clock and arms each timer for
+the time left until it, so late callbacks do not add up. When the loop
+falls behind by more than a frame it skips ahead to the frame that
+should be on screen now instead of playing the backlog, and counts the
+frames it dropped.
+
+    animation = FrameScheduler(root, gif, lambda i: label.config(image=gif.frame(i)))
+    animation.start()
+    ...
+    animation.stop()
+    print(animation.stats.as_dict())
+
+`frames` only needs `durations` (ms) and `ready` (frames that can be
+shown), so a GifFrames that is still decoding plays what it has.
+"""
+
+import math
+import time
+
+# Browsers treat very short GIF delays as "as fast as possible" and slow
+# them down; anything under this many ms is played at DEFAULT_MS
+MIN_MS = 20
+DEFAULT_MS = 100
+EARLY = 0.002       # Tk timers round to whole ms and may fire this early
+
+
+class FrameStats:
+    """What a run of the scheduler achieved; all times in seconds unless named _ms"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.started = None
+        self.stopped = None
+        self.shown = 0
+        self.dropped = 0
+        self.ticks = 0
+        # lateness of each tick against its deadline
+        self.late_sum = 0.0
+        self.late_sq = 0.0
+        self.late_max = 0.0
+
+    def record(self, late):
+        self.ticks += 1
+        self.late_sum += late
+        self.late_sq += late * late
+        self.late_max = max(self.late_max, late)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.stopped if self.stopped is not None else self.clock()) - self.started
+
+    @property
+    def fps(self):
+        elapsed = self.elapsed
+        return self.shown / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def mean_late_ms(self):
+        return 1000 * self.late_sum / self.ticks if self.ticks else 0.0
+
+    @property
+    def jitter_ms(self):
+        """Standard deviation of tick lateness"""
+        if self.ticks < 2:
+            return 0.0
+        mean = self.late_sum / self.ticks
+        return 1000 * math.sqrt(max(0.0, self.late_sq / self.ticks - mean * mean))
+
+    def as_dict(self):
+        return {"elapsed": self.elapsed, "shown": self.shown, "dropped": self.dropped,
+                "fps": self.fps, "mean_late_ms": self.mean_late_ms,
+                "max_late_ms": 1000 * self.late_max, "jitter_ms": self.jitter_ms}
+
+
+class FrameScheduler:
+    def __init__(self, root, frames, draw, clock=time.monotonic):
+        self.root = root
+        self.frames = frames
+        self.draw = draw
+        self.clock = clock
+        self.index = 0
+        self.due = None         # clock time at which the frame after `index` is due
+        self.after_id = None
+        self.stats = FrameStats(clock)
+
+    @property
+    def running(self):
+        return self.after_id is not None
+
+    def duration(self, i):
+        ms = self.frames.durations[i]
+        return (ms if ms and ms >= MIN_MS else DEFAULT_MS) / 1000
+
+    def start(self):
+        self.stop()
+        self.stats = FrameStats(self.clock)
+        now = self.stats.started = self.clock()
+        self.index = 0
+        self.draw(0)
+        self.stats.shown += 1
+        self.due = now + self.duration(0)
+        self._arm()
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+            self.stats.stopped = self.clock()
+
+    def _arm(self):
+        delay = max(0, round((self.due - self.clock()) * 1000))
+        self.after_id = self.root.after(delay, self._tick)
+
+    def _tick(self):
+        now = self.clock()
+        if now < self.due - EARLY:
+            self._arm()
+            return
+        self.stats.record(max(0.0, now - self.due))
+        ready = self.frames.ready
+        # the frame that should be on screen now, and when it started
+        i, start = (self.index + 1) % ready, self.due
+        skipped = 0
+        while start + self.duration(i) <= now:
+            start += self.duration(i)
+            i = (i + 1) % ready
+            skipped += 1
+            if skipped > ready:
+                # more than a whole loop behind (e.g. the machine slept):
+                # restart the timeline rather than count every loop missed
+                start = now
+                break
+        self.stats.dropped += skipped
+        self.index = i
+        self.draw(i)
+        self.stats.shown += 1
+        self.due = start + self.duration(i)
+        self._arm()
@@ -0,0 +1,272 @@
+"""
+Decoded, pre-scaled GIF frames for the quiz start screen.
+
+Decoding the start screen GIF and resizing all of its frames takes
+seconds, so it should happen once, and the window should not wait for
+it. FrameCache hands back a GifFrames as soon as frame 0 is decoded; a
+worker thread decodes the rest (Pillow and zlib release the GIL while
+they work) and the UI plays whatever frames are ready. Frames are
+converted to what the UI draws (e.g. ImageTk.PhotoImage) on the UI
+thread, the first time each one is shown.
+
+Decoded frame sets stay in memory (least recently used first out,
+bounded by bytes), and can also be written to a sprite file on disk: the
+scaled frames back to back, zlib-compressed, after a one-line JSON
+header. The header records the source GIF's size and mtime, so editing
+the GIF invalidates the sprite. Frames are kept palettized, so a
+150-frame 500x550 start screen is about 40 MB decoded and 14 MB as
+sprites.
+"""
+
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from PIL import Image, ImageSequence
+
+SPRITE_SUFFIX = ".sprites"
+DEFAULT_DURATION = 80       # ms, for frames without their own duration
+
+
+class GifFrames:
+    """
+    The frames of one GIF scaled to one size, with their durations in ms.
+
+    While the rest of the GIF is being decoded, `ready` counts the frames
+    that can be shown and `complete` is False. frame() converts, so only
+    the UI thread may call it.
+    """
+
+    def __init__(self, size, frames=(), durations=(), convert=None):
+        self.size = size
+        self.raw = list(frames)         # scaled PIL images, appended by the decoder
+        self.durations = list(durations)
+        self.convert = convert
+        self.converted = {}
+        self.complete = bool(self.raw)
+        self.error = None               # why decoding stopped early, if it did
+        self.stamp = None               # source_stamp() of the GIF they came from
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def ready(self):
+        return len(self.raw)
+
+    def frame(self, i):
+        """Frame i, converted on first use"""
+        if self.convert is None:
+            return self.raw[i]
+        image = self.converted.get(i)
+        if image is None:
+            image = self.converted[i] = self.convert(self.raw[i])
+        return image
+
+    @property
+    def frames(self):
+        """Every frame decoded so far, converted"""
+        return [self.frame(i) for i in range(self.ready)]
+
+    @property
+    def nbytes(self):
+        # a byte per pixel palettized, plus 4 for each converted frame
+        return self.size[0] * self.size[1] * (len(self.raw) + 4 * len(self.converted))
+
+    def add(self, frame, duration):
+        # duration first: whoever sees frame i also sees its duration
+        self.durations.append(duration)
+        self.raw.append(frame)
+
+
+def source_stamp(path):
+    """(size, mtime_ns) of a file; a change means cached frames are stale"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def iter_gif(path, size):
+    """
+    Yield (frame, duration) for each frame of path resized to size
+    (width, height). Pillow hands back frames after the first as RGB(A);
+    they are mapped back onto the GIF's own palette, which keeps them at
+    a byte per pixel and lets the sprite file compress well.
+    """
+    palette = None
+    with Image.open(path) as gif:
+        for frame in ImageSequence.Iterator(gif):
+            duration = frame.info.get("duration") or DEFAULT_DURATION
+            scaled = frame.resize(size)
+            if scaled.mode == "P":
+                palette = palette or scaled
+            elif palette is not None:
+                scaled = scaled.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+            yield scaled, duration
+
+
+def decode_gif(path, size):
+    """Decode every frame of path, resized to size"""
+    gif = GifFrames(size)
+    for frame, duration in iter_gif(path, size):
+        gif.add(frame, duration)
+    gif.complete = True
+    return gif
+
+
+def sprite_path(cache_dir, path, size):
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    return os.path.join(cache_dir, f"{stem}_{size[0]}x{size[1]}{SPRITE_SUFFIX}")
+
+
+def save_sprites(gif, sprite_file, source):
+    """Write gif's frames to sprite_file, stamped with the source GIF's size and mtime"""
+    blobs = [zlib.compress(f.tobytes()) for f in gif.raw]
+    header = {
+        "source": list(source_stamp(source)),
+        "size": list(gif.size),
+        "frames": [{"mode": f.mode, "duration": d, "length": len(b),
+                    "palette": f.getpalette() if f.mode == "P" else None,
+                    "transparency": f.info.get("transparency")}
+                   for f, d, b in zip(gif.raw, gif.durations, blobs)],
+    }
+    folder = os.path.dirname(sprite_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = sprite_file + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, sprite_file)
+
+
+def iter_sprites(sprite_file, source):
+    """
+    Yield (frame, duration) from a sprite file. Yields nothing if the file
+    is missing, unreadable or older than source; raises ValueError if the
+    frame data turns out to be damaged part way through.
+    """
+    try:
+        f = open(sprite_file, "rb")
+    except OSError:
+        return
+    with f:
+        try:
+            header = json.loads(f.readline())
+            if tuple(header["source"]) != source_stamp(source):
+                return
+            size = tuple(header["size"])
+            frames = header["frames"]
+        except (ValueError, KeyError, TypeError):
+            return
+        for info in frames:
+            try:
+                data = zlib.decompress(f.read(info["length"]))
+                frame = Image.frombytes(info["mode"], size, data)
+            except (zlib.error, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"damaged sprite file {sprite_file}: {e}") from None
+            if info.get("palette") is not None:
+                frame.putpalette(info["palette"])
+            if info.get("transparency") is not None:
+                frame.info["transparency"] = info["transparency"]
+            yield frame, info.get("duration") or DEFAULT_DURATION
+
+
+def load_sprites(sprite_file, source):
+    """Read a whole sprite file, or return None if it is missing, damaged or stale"""
+    gif = GifFrames(None)
+    try:
+        for frame, duration in iter_sprites(sprite_file, source):
+            gif.add(frame, duration)
+    except ValueError:
+        return None
+    if not gif.raw:
+        return None
+    gif.size = gif.raw[0].size
+    gif.complete = True
+    return gif
+
+
+class FrameCache:
+    """
+    Memory cache of decoded GIFs keyed by (path, size), bounded by the
+    bytes of their frames; optionally backed by sprite files in cache_dir.
+    convert(frame) turns a frame into what the UI draws, the first time
+    it is drawn. The most recently used GIF is always kept, even if it
+    alone is over the bound.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, cache_dir=None, convert=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.convert = convert
+        self.entries = OrderedDict()
+
+    @property
+    def nbytes(self):
+        # frame sets grow while they decode, so this is summed, not kept
+        return sum(gif.nbytes for gif in self.entries.values())
+
+    def get(self, path, size):
+        """
+        Return the GifFrames for path at size. Frame 0 is ready when this
+        returns; unless the GIF was already cached the rest are still
+        being decoded (check `ready` and `complete`).
+        """
+        key = (os.path.abspath(path), tuple(size))
+        gif = self.entries.get(key)
+        if gif is not None:
+            if gif.stamp == source_stamp(path) and gif.error is None:
+                self.entries.move_to_end(key)
+                return gif
+            del self.entries[key]
+
+        gif = GifFrames(tuple(size), convert=self.convert)
+        gif.stamp = source_stamp(path)
+        sprites = sprite_path(self.cache_dir, path, size) if self.cache_dir else None
+        frames, from_disk, first = iter(()), False, None
+        if sprites:
+            frames, from_disk = iter_sprites(sprites, path), True
+            try:
+                first = next(frames, None)
+            except ValueError:
+                first = None
+        if first is None:
+            frames, from_disk = iter_gif(path, size), False
+            first = next(frames)
+        gif.add(*first)
+        threading.Thread(target=self._decode, args=(gif, frames, from_disk, sprites, path),
+                         name="gif-decode", daemon=True).start()
+        self._keep(key, gif)
+        return gif
+
+    @staticmethod
+    def _decode(gif, frames, from_disk, sprites, path):
+        # worker thread: only appends to gif, never converts
+        try:
+            for frame, duration in frames:
+                gif.add(frame, duration)
+        except Exception as e:      # the frames so far still play; get() starts over
+            gif.error = e
+            if from_disk:
+                try:
+                    os.remove(sprites)
+                except OSError:
+                    pass
+            return
+        gif.complete = True
+        if sprites and not from_disk:
+            try:
+                save_sprites(gif, sprites, path)
+            except OSError:
+                pass    # the disk cache is an optimisation only
+
+    def _keep(self, key, gif):
+        self.entries[key] = gif
+        while len(self.entries) > 1 and self.nbytes > self.max_bytes:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
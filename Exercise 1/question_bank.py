@@ -0,0 +1,142 @@
+"""
+Quiz questions generated in bulk, reproducibly.
+
+QuestionBank draws whole arrays of operands and operations in one NumPy
+pass instead of two randint() calls and a choice() per question, and
+every draw comes from an explicit seed, so any session can be replayed:
+session k of a bank seeded with s is the same questions every time.
+
+    bank = QuestionBank(seed=7, no_negative=True)
+    num1, ops, num2 = bank.generate(10_000_000, level=2)    # arrays
+    bank.session(2, 41)      # [Question(...), ...] for session 41
+    QuizEngine(bank=bank)    # plays bank.session(level) in turn
+
+ops holds 0 for "+" and 1 for "-". With no_negative, a subtraction's
+larger operand always comes first; with unique (the default for
+sessions) no question repeats within a session. Without NumPy the same
+API falls back to the random module: identical rules, different
+numbers, much slower.
+"""
+
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from quiz_engine import LEVELS, OPERATIONS, QUESTIONS, Question
+
+# first word of every stream key, so bulk draws and sessions never overlap
+BULK, SESSION = 0, 1
+
+
+class QuestionBank:
+    def __init__(self, seed=None, no_negative=False, unique=True, use_numpy=True):
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.no_negative = no_negative
+        self.unique = unique
+        self.use_numpy = use_numpy and np is not None
+        self.sessions = 0       # sessions handed out by session() with no number
+
+    def _stream(self, key):
+        # an independent, reproducible stream for each key (a tuple of ints)
+        if self.use_numpy:
+            return np.random.default_rng([self.seed, *key])
+        return random.Random(repr((self.seed, *key)))
+
+    def generate(self, n, level, stream=(BULK,)):
+        """n questions for level as (num1, ops, num2) arrays"""
+        if level not in LEVELS:
+            raise ValueError(f"no such level: {level}")
+        rng = self._stream((level, *stream))
+        if not self.use_numpy:
+            return self._generate_py(rng, n, level)
+        low, high = LEVELS[level]
+        # the narrowest type the operands fit: less memory to fill and scan
+        dtype = np.int16 if high < 1 << 15 else np.int32 if high < 1 << 31 else np.int64
+        a = rng.integers(low, high + 1, size=n, dtype=dtype)
+        b = rng.integers(low, high + 1, size=n, dtype=dtype)
+        # one random bit per operation rather than one random byte
+        ops = np.unpackbits(rng.integers(0, 256, size=(n + 7) // 8, dtype=np.uint8), count=n)
+        if self.no_negative:
+            # swap a and b where a subtraction would go negative; an xor
+            # swap masked by multiplication is far cheaper than fancy indexing
+            swap = a < b
+            swap &= ops.view(bool)
+            x = a ^ b
+            x *= swap
+            a ^= x
+            b ^= x
+        return a, ops, b
+
+    def _generate_py(self, rng, n, level):
+        low, high = LEVELS[level]
+        span = high - low + 1
+        rand = rng.random
+        a = [low + int(rand() * span) for _ in range(n)]
+        b = [low + int(rand() * span) for _ in range(n)]
+        ops = [int(rand() < 0.5) for _ in range(n)]
+        if self.no_negative:
+            for i in range(n):
+                if ops[i] and a[i] < b[i]:
+                    a[i], b[i] = b[i], a[i]
+        return a, ops, b
+
+    def sessions_array(self, count, level, questions=QUESTIONS, stream=(BULK,)):
+        """
+        Questions for `count` sessions as three (count, questions) arrays,
+        with no question repeated within a row if the bank is unique.
+        Needs NumPy.
+        """
+        if not self.use_numpy:
+            raise RuntimeError("sessions_array needs NumPy")
+        self._check_unique(level, questions)
+        a, ops, b = (x.reshape(count, questions)
+                     for x in self.generate(count * questions, level, stream))
+        if self.unique:
+            self._dedupe(a, ops, b, level, stream)
+        return a, ops, b
+
+    def _dedupe(self, a, ops, b, level, stream):
+        # redraw every row that holds a repeat until none do; only the rows
+        # just redrawn need checking again, and there are fewer each round
+        low, high = LEVELS[level]
+        span = high - low + 1
+        rows = np.arange(len(a))
+        rnd = 1
+        while len(rows):
+            key = (a[rows].astype(np.int64) - low) * span + (b[rows] - low)
+            key = np.sort(key * 2 + ops[rows], axis=1)
+            rows = rows[(key[:, 1:] == key[:, :-1]).any(axis=1)]
+            if len(rows):
+                ra, rops, rb = (x.reshape(len(rows), a.shape[1])
+                                for x in self.generate(len(rows) * a.shape[1], level, (*stream, rnd)))
+                a[rows], ops[rows], b[rows] = ra, rops, rb
+            rnd += 1
+
+    def _check_unique(self, level, questions):
+        low, high = LEVELS.get(level, (0, -1))
+        if self.unique and 2 * (high - low + 1) ** 2 < questions:
+            raise ValueError(f"level {level} has fewer than {questions} distinct questions")
+
+    def session(self, level, number=None, questions=QUESTIONS):
+        """The questions of session `number` (by default the next one) as a list"""
+        self._check_unique(level, questions)
+        if number is None:
+            number = self.sessions
+            self.sessions += 1
+        if self.use_numpy:
+            a, ops, b = (x[0] for x in self.sessions_array(1, level, questions, (SESSION, number)))
+            a, ops, b = a.tolist(), ops.tolist(), b.tolist()
+        else:
+            a, ops, b = self._session_py(level, number, questions)
+        return [Question(x, OPERATIONS[o], y) for x, o, y in zip(a, ops, b)]
+
+    def _session_py(self, level, number, questions):
+        rnd = 0
+        while True:
+            a, ops, b = self.generate(questions, level, (SESSION, number, rnd))
+            if not self.unique or len(set(zip(a, ops, b))) == questions:
+                return a, ops, b
+            rnd += 1
@@ -0,0 +1,188 @@
+"""
+The maths quiz window: screens, start animation and answer feedback.
+
+QuizApp wires the screens in quiz_screens.py to a QuizEngine. It is a
+class, not module code, so that quiz_driver.py can build one on its own
+Tk root and play it from a script. Answer feedback is a banner that
+fades by itself, not a modal messagebox: nothing waits for a click, and
+the next question is already on screen while the feedback shows.
+"""
+
+import os
+import time
+import tkinter as tk
+
+from PIL import ImageTk  # for GIF animation
+
+from frame_scheduler import FrameScheduler
+from gif_frames import FrameCache
+from quiz_engine import FIRST_TRY_POINTS, QuizEngine
+from quiz_screens import (BAD_COLOR, GOOD_COLOR, WARN_COLOR, Banner, MenuScreen, ProblemScreen,
+                          ResultsScreen, StartScreen)
+
+GIF_SIZE = (500, 550)   # fit window
+FEEDBACK_MS = 1500      # how long answer feedback stays before it fades
+BOARD_SIZE = 5          # leaderboard lines on the results screen
+
+# colour and emoji for each grade on the results screen
+GRADE_STYLE = {
+    "A": ("#2ecc71", "🌟"),
+    "B": ("#3498db", "⭐"),
+    "C": ("#f39c12", "👍"),
+    "D": ("#e67e22", "👌"),
+    "F": ("#e74c3c", "📚"),
+}
+
+
+class QuizApp:
+    def __init__(self, root, gif_file=None, engine=None, feedback_ms=FEEDBACK_MS, telemetry=None,
+                 history=None, player="player"):
+        self.root = root
+        self.gif_file = gif_file
+        # the rules and session state live in QuizEngine; this class only
+        # shows its questions and results and passes it the player's answers
+        self.engine = engine or QuizEngine()
+        self.feedback_ms = feedback_ms
+        self.telemetry = telemetry      # a quiz_telemetry.Telemetry, if recording
+        self.history = history          # a score_history.ScoreHistory, if keeping scores
+        self.player = player
+        self.shown_at = None
+        self.timings = []               # ms spent on each settled question
+        self.animation = None   # FrameScheduler playing the start screen
+        self.screen = None      # the screen on top
+        self.gif_frames = None
+
+        # Start screen frames are decoded and scaled once, in the background
+        # after the first one, and turned into PhotoImages as they are first
+        # shown; the scaled frames are also saved next to the GIF for the
+        # next launch
+        self.frame_cache = None
+        if gif_file:
+            self.frame_cache = FrameCache(cache_dir=os.path.join(os.path.dirname(gif_file), "sprite_cache"),
+                                          convert=ImageTk.PhotoImage)
+
+        # Every screen is built once here and raised when needed
+        self.start_screen = StartScreen(root, on_start=self.displayMenu)
+        self.menu_screen = MenuScreen(root, on_level=self.start_quiz, on_quit=root.destroy)
+        self.problem_screen = ProblemScreen(root, on_submit=self.check_answer)
+        self.results_screen = ResultsScreen(root, on_again=self.displayMenu, on_quit=root.destroy)
+        self.banner = Banner(root)
+
+    # ----------------------------------------------------------
+    # START SCREEN (GIF)
+    # ----------------------------------------------------------
+
+    def show_start_screen(self):
+        self.show_screen(self.start_screen)
+        if self.frame_cache is not None:
+            self.gif_frames = self.frame_cache.get(self.gif_file, GIF_SIZE)
+            self.animate_gif()
+
+    def show_gif_frame(self, i):
+        self.start_screen.gif_label.config(image=self.gif_frames.frame(i))
+
+    def animate_gif(self):
+        # plays each frame for its own duration, only the frames decoded so
+        # far, and skips frames rather than falling behind
+        self.animation = FrameScheduler(self.root, self.gif_frames, self.show_gif_frame)
+        self.animation.start()
+
+    # ----------------------------------------------------------
+    # MAIN MENU
+    # ----------------------------------------------------------
+
+    def displayMenu(self):
+        """Display difficulty selection menu"""
+        self.banner.hide()
+        self.show_screen(self.menu_screen)
+
+    # ----------------------------------------------------------
+    # QUIZ LOGIC
+    # ----------------------------------------------------------
+
+    def displayProblem(self):
+        # the problem screen is reused: only its labels change per question
+        engine = self.engine
+        self.problem_screen.set_question(engine.question_number, engine.score, str(engine.question))
+        self.show_screen(self.problem_screen)
+        self.shown_at = time.perf_counter()
+        if self.telemetry is not None:
+            self.telemetry.shown(engine)
+
+    def check_answer(self):
+        if self.engine.question is None:
+            return      # no quiz running: Return pressed after the last question
+        entry = self.problem_screen.answer_entry
+        try:
+            user_answer = int(entry.get())
+        except ValueError:
+            self.banner.show("⚠️ Please enter a valid number!", WARN_COLOR, self.feedback_ms)
+            return
+
+        engine = self.engine
+        question, number, attempt = engine.question, engine.question_number, engine.attempts
+        outcome = engine.submit(user_answer)
+        if self.telemetry is not None:
+            self.telemetry.answered(engine.level, number, question, attempt, user_answer, outcome)
+
+        if outcome.retry:
+            entry.delete(0, tk.END)
+            entry.focus()
+            self.banner.show("❌ Oops! Wrong answer. Try once more!", BAD_COLOR, self.feedback_ms)
+            return
+        self.timings.append(round(1000 * (time.perf_counter() - self.shown_at)))
+
+        # the next question (or the results) goes up straight away, under
+        # the feedback for this one
+        if self.engine.finished:
+            self.displayResults()
+        else:
+            self.displayProblem()
+
+        if outcome.correct and outcome.points == FIRST_TRY_POINTS:
+            self.banner.show(f"🎉 Excellent! You got it right! +{outcome.points} points",
+                             GOOD_COLOR, self.feedback_ms)
+        elif outcome.correct:
+            self.banner.show(f"✓ Good job on second attempt! +{outcome.points} points",
+                             GOOD_COLOR, self.feedback_ms)
+        else:
+            self.banner.show(f"😔 Wrong again! {question} = {outcome.answer}",
+                             BAD_COLOR, self.feedback_ms)
+
+    def displayResults(self):
+        grade = self.engine.grade()
+        grade_color, emoji = GRADE_STYLE[grade]
+
+        self.results_screen.set_result(self.engine.score, grade, grade_color, emoji)
+        if self.history is not None:
+            self.show_standing()
+        self.show_screen(self.results_screen)
+
+    def show_standing(self):
+        # store the quiz first, so the rank and leaderboard include it
+        level, score = self.engine.level, self.engine.score
+        self.history.record(self.player, level, score, self.timings)
+        rank, total = self.history.rank(level, score)
+        beaten = self.history.percentile(level, score)
+        board = [f"{i}. {player[:12]:<12} {best:>3}"
+                 for i, (player, best, _) in enumerate(self.history.top(level, BOARD_SIZE), 1)]
+        self.results_screen.set_standing(
+            f"Rank #{rank} of {total} at level {level} · better than {beaten:.0f}%", board)
+
+    def start_quiz(self, level):
+        self.engine.start(level)
+        self.timings = []
+        if self.telemetry is not None:
+            self.telemetry.start()
+        self.displayProblem()
+
+    def show_screen(self, screen):
+        # Cancel any running animations
+        if self.animation is not None:
+            self.animation.stop()
+
+        if self.screen is not None and self.screen is not screen:
+            self.screen.hide()
+        self.screen = screen
+        screen.show()
+        self.banner.lift()      # feedback stays over whichever screen is up
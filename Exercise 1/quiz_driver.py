@@ -0,0 +1,76 @@
+"""
+Play the quiz window from a script, the way a player would.
+
+QuizDriver types answers into a QuizApp's entry and submits them, then
+reports what the player would see: the feedback banner, the question
+now on screen and how long the window took to get there. No dialog ever
+waits for a click, so a whole quiz can run unattended:
+
+    root = tk.Tk()
+    driver = QuizDriver(QuizApp(root, engine=QuizEngine(random.Random(1))))
+    driver.start(2)
+    step = driver.answer(driver.question.answer)
+    step.feedback, step.seconds     # 'Excellent! ...', 0.0004
+    driver.play(quiz_sim.parse_model("fixed:0.8"), random.Random(2))
+
+Needs a display, as any Tk window does.
+"""
+
+import time
+import tkinter as tk
+from collections import namedtuple
+
+# one submitted answer: the banner text and the on-screen problem after
+# it, whether it settled the question (rather than earning a retry), and
+# the seconds from submitting to the window being laid out again
+Step = namedtuple("Step", ["value", "feedback", "problem", "settled", "finished", "seconds"])
+
+
+class QuizDriver:
+    def __init__(self, app):
+        self.app = app
+        self.root = app.root
+
+    @property
+    def question(self):
+        return self.app.engine.question
+
+    @property
+    def finished(self):
+        return self.app.engine.finished
+
+    @property
+    def problem_text(self):
+        return self.app.problem_screen.problem_label.cget("text")
+
+    def start(self, level):
+        self.app.start_quiz(level)
+        self.root.update_idletasks()
+
+    def answer(self, value):
+        entry = self.app.problem_screen.answer_entry
+        entry.delete(0, tk.END)
+        entry.insert(0, str(value))
+        number = self.app.engine.question_number
+        t0 = time.perf_counter()
+        self.app.check_answer()
+        self.root.update_idletasks()    # geometry and redraw of what changed
+        seconds = time.perf_counter() - t0
+        return Step(value, self.app.banner.text, self.problem_text,
+                    self.app.engine.question_number != number, self.finished, seconds)
+
+    def play(self, model, rng):
+        """Answer every question with a quiz_sim answer model; returns the Steps"""
+        steps = []
+        while not self.finished:
+            engine = self.app.engine
+            steps.append(self.answer(model(rng, engine.level, engine.question, engine.attempts)))
+        return steps
+
+    def wait_for_banner(self, timeout=10.0):
+        """Run the event loop until the feedback banner has faded away"""
+        end = time.monotonic() + timeout
+        while self.app.banner.visible and time.monotonic() < end:
+            self.root.update()
+            time.sleep(0.005)
+        return not self.app.banner.visible
@@ -0,0 +1,130 @@
+"""
+The rules of the maths quiz, with no Tk in sight.
+
+A QuizEngine holds one session: the level, the question being asked, the
+score and how many tries the player has had. The GUI asks it for the
+question to show and hands it each answer; the simulator in quiz_sim.py
+plays it directly, millions of times, without a display.
+
+    engine = QuizEngine(random.Random(1))
+    engine.start(2)
+    while not engine.finished:
+        outcome = engine.submit(engine.question.answer)
+    engine.grade()      # 'A'
+"""
+
+import random
+from collections import namedtuple
+
+QUESTIONS = 10
+FIRST_TRY_POINTS = 10
+SECOND_TRY_POINTS = 5
+MAX_SCORE = QUESTIONS * FIRST_TRY_POINTS
+
+# smallest and largest operand for each level
+LEVELS = {1: (1, 9), 2: (10, 99), 3: (1000, 9999)}
+OPERATIONS = ("+", "-")
+
+# lowest score for each grade, best first; anything lower is an F
+GRADES = ((90, "A"), (80, "B"), (70, "C"), (60, "D"))
+
+
+class Question(namedtuple("Question", ["num1", "operation", "num2"])):
+    __slots__ = ()
+
+    @property
+    def answer(self):
+        return self.num1 + self.num2 if self.operation == "+" else self.num1 - self.num2
+
+    def __str__(self):
+        return f"{self.num1} {self.operation} {self.num2}"
+
+
+# what submit() did with an answer: `points` scored, whether the player
+# gets another try, and the right answer once they have run out of tries
+Outcome = namedtuple("Outcome", ["correct", "points", "retry", "answer"])
+
+
+def random_pair(rng, level):
+    # distributed like two rng.randint(low, high) calls, at a fraction of the cost
+    low, high = LEVELS[level]
+    span = high - low + 1
+    random_ = rng.random
+    return low + int(random_() * span), low + int(random_() * span)
+
+
+def grade_for(score):
+    for lowest, grade in GRADES:
+        if score >= lowest:
+            return grade
+    return "F"
+
+
+class QuizEngine:
+    """
+    One quiz session at a time. Questions are drawn from rng as they are
+    asked, or, given a question_bank.QuestionBank, taken from the bank's
+    next session so that a seeded bank replays the same quizzes.
+    """
+
+    def __init__(self, rng=None, bank=None):
+        self.rng = rng or random.Random()
+        self.bank = bank
+        self.planned = None     # this session's questions, from the bank
+        self.level = None
+        self.question = None
+        self.question_number = 0
+        self.score = 0
+        self.attempts = 0
+
+    @property
+    def finished(self):
+        return self.question_number > QUESTIONS
+
+    def start(self, level):
+        if level not in LEVELS:
+            raise ValueError(f"no such level: {level}")
+        self.level = level
+        self.score = 0
+        self.question_number = 1
+        if self.bank is not None:
+            self.planned = self.bank.session(level, questions=QUESTIONS)
+        self._ask()
+        return self.question
+
+    def _ask(self):
+        if self.planned is not None:
+            self.question = self.planned[self.question_number - 1]
+        else:
+            num1, num2 = random_pair(self.rng, self.level)
+            self.question = Question(num1, OPERATIONS[self.rng.random() < 0.5], num2)
+        self.attempts = 0
+
+    def _advance(self):
+        self.question_number += 1
+        if self.finished:
+            self.question = None
+        else:
+            self._ask()
+
+    def is_correct(self, answer):
+        return answer == self.question.answer
+
+    def submit(self, answer):
+        """Score an answer to the current question and move on if it is settled"""
+        if self.question is None:
+            raise RuntimeError("the quiz is not running")
+        right = self.question.answer
+        if answer == right:
+            points = FIRST_TRY_POINTS if self.attempts == 0 else SECOND_TRY_POINTS
+            self.score += points
+            self._advance()
+            return Outcome(True, points, False, right)
+        if self.attempts == 0:
+            self.attempts += 1
+            return Outcome(False, 0, True, None)
+        self._advance()
+        return Outcome(False, 0, False, right)
+
+    def grade(self):
+        return grade_for(self.score)
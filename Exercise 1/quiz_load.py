@@ -0,0 +1,191 @@
+"""
+Load generator for quiz_server.py.
+
+Opens --sessions connections at once, then has every one of them play
+--games full quizzes concurrently, answering with a quiz_sim answer
+model, and reports the latency of each answer (request sent to reply
+read) over WebSocket, or over keep-alive HTTP with --http.
+
+Usage:
+    python quiz_load.py [--sessions 1000] [--games 1] [--level 2] [--http]
+                        [--think-ms 0] [--server 127.0.0.1:8765]
+
+With no think time every player answers the moment it gets a reply, so
+the server is saturated and latency is mostly queueing; --think-ms gives
+players an exponentially distributed pause before each answer, as real
+learners have.
+
+Without --server a quiz server is started on a free local port for the
+run. Client and server share the machine, so on a small box the numbers
+include the clients' own scheduling.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from quiz_engine import LEVELS, Question
+from quiz_server import CLOSE, TEXT, encode_frame, open_websocket, read_frame
+from quiz_sim import parse_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONNECTING = 200        # connections opened at a time
+
+
+def parse_question(text):
+    num1, operation, num2 = text.split()
+    return Question(int(num1), operation, int(num2))
+
+
+class WebSocketClient:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+
+    async def connect(self):
+        self.reader, self.writer = await open_websocket(self.host, self.port)
+
+    async def call(self, message):
+        self.writer.write(encode_frame(TEXT, json.dumps(message).encode("utf-8"), mask=True))
+        await self.writer.drain()
+        while True:
+            opcode, data = await read_frame(self.reader)
+            if opcode == TEXT:
+                return json.loads(data)
+            if opcode == CLOSE:
+                raise ConnectionError("server closed the WebSocket")
+
+    async def start(self, level, seed):
+        return await self.call({"op": "start", "level": level, "seed": seed})
+
+    async def answer(self, sid, value):
+        return await self.call({"op": "answer", "answer": value})
+
+    async def close(self):
+        self.writer.write(encode_frame(CLOSE, b"\x03\xe8", mask=True))
+        self.writer.close()
+
+
+class HttpClient:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def call(self, method, path, message=None):
+        body = b"" if message is None else json.dumps(message).encode("utf-8")
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+                          .encode("ascii") + body)
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        data = await self.reader.readexactly(length)
+        if not head.startswith(b"HTTP/1.1 2"):
+            raise ConnectionError(f"{method} {path}: {head.splitlines()[0]!r} {data!r}")
+        return json.loads(data) if data else None
+
+    async def start(self, level, seed):
+        return await self.call("POST", "/sessions", {"level": level, "seed": seed})
+
+    async def answer(self, sid, value):
+        return await self.call("POST", f"/sessions/{sid}/answer", {"answer": value})
+
+    async def close(self):
+        self.writer.close()
+
+
+async def player(client, games, level, model, rng, latencies, go, think):
+    await go.wait()
+    for _ in range(games):
+        st = await client.start(level, rng.randrange(1 << 30))
+        while not st["finished"]:
+            value = model(rng, level, parse_question(st["question"]), st["attempts"])
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+            t0 = time.perf_counter()
+            st = await client.answer(st["session"], value)
+            latencies.append(time.perf_counter() - t0)
+    await client.close()
+
+
+async def run(host, port, args):
+    kind = HttpClient if args.http else WebSocketClient
+    clients = [kind(host, port) for _ in range(args.sessions)]
+    t0 = time.perf_counter()
+    for i in range(0, len(clients), CONNECTING):
+        await asyncio.gather(*(c.connect() for c in clients[i:i + CONNECTING]))
+    connected = time.perf_counter() - t0
+
+    model = parse_model(args.model)
+    latencies = []
+    go = asyncio.Event()
+    tasks = [asyncio.ensure_future(player(c, args.games, args.level, model,
+                                          random.Random(args.seed * 1_000_003 + i), latencies, go,
+                                          args.think_ms / 1000))
+             for i, c in enumerate(clients)]
+    t0 = time.perf_counter()
+    go.set()
+    await asyncio.gather(*tasks)
+    return connected, time.perf_counter() - t0, latencies
+
+
+def start_server():
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "quiz_server.py"), "--port", "0"],
+                            stdout=subprocess.PIPE, text=True, cwd=HERE)
+    line = proc.stdout.readline()
+    if not line:
+        proc.kill()
+        raise RuntimeError("quiz server did not start")
+    host, port = line.split("http://", 1)[1].split()[0].rsplit(":", 1)
+    return proc, host, int(port)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=1000)
+    ap.add_argument("--games", type=int, default=1)
+    ap.add_argument("--level", type=int, choices=sorted(LEVELS), default=2)
+    ap.add_argument("--model", default="retry:0.6,0.9")
+    ap.add_argument("--http", action="store_true", help="use HTTP requests instead of WebSocket")
+    ap.add_argument("--think-ms", type=float, default=0, help="mean pause before each answer")
+    ap.add_argument("--server", help="host:port of a running server")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    proc = None
+    if args.server:
+        host, port = args.server.rsplit(":", 1)
+        port = int(port)
+    else:
+        proc, host, port = start_server()
+    try:
+        connected, seconds, latencies = asyncio.run(run(host, port, args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    latencies.sort()
+    n = len(latencies)
+
+    def pct(q):
+        return 1000 * latencies[min(n - 1, int(q * n))]
+
+    print(f"{args.sessions} concurrent {'HTTP' if args.http else 'WebSocket'} sessions, "
+          f"{args.games} game(s) each, {args.think_ms:g} ms think time, connected in {connected:.2f} s")
+    print(f"{n:,} answers in {seconds:.2f} s: {n / seconds:,.0f} answers/s")
+    print(f"answer latency ms: p50 {pct(0.5):.2f}, p90 {pct(0.9):.2f}, p99 {pct(0.99):.2f}, "
+          f"max {1000 * latencies[-1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+The quiz's screens, built once and raised in turn.
+
+Each screen is a Frame that fills the window; all of them are stacked in
+the same place and showing one is a tkraise(). Moving to the next
+question only re-configures the labels of the problem screen, instead of
+destroying every widget and creating a fresh set (and fresh Tcl commands)
+each time.
+"""
+
+import tkinter as tk
+
+# Color Scheme
+BG_COLOR = "#ff76bd"  # Light Neon Pink
+HEADER_COLOR = "#003bfc"  # Bright Blue
+BUTTON_COLOR = "#5cb85c"  # Success Green
+BUTTON_HOVER = "#4cae4c"  # Darker Green
+DANGER_COLOR = "#d9534f"  # Red
+TEXT_COLOR = "#2c3e50"  # Dark Blue-Gray
+LIGHT_TEXT = "#ffffff"  # White
+
+# Feedback banner colours
+GOOD_COLOR = "#27ae60"  # Green
+BAD_COLOR = "#c0392b"  # Dark Red
+WARN_COLOR = "#e67e22"  # Orange
+
+
+def blend(color, other, t):
+    """The colour t of the way from color to other (both "#rrggbb")"""
+    a = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(other[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * t):02x}" for x, y in zip(a, b))
+
+
+class Screen(tk.Frame):
+    def __init__(self, root, **kw):
+        super().__init__(root, bg=BG_COLOR, **kw)
+        self.place(relx=0, rely=0, relwidth=1, relheight=1)
+
+    def show(self):
+        self.tkraise()
+        # a screen left below keeps the focus otherwise, and its key
+        # bindings with it
+        self.focus_set()
+
+    def hide(self):
+        """Called when another screen is raised over this one"""
+
+
+class Banner(tk.Label):
+    """
+    A strip across the top of the window for answer feedback. It does not
+    take focus or block input; after `ms` it fades into the background
+    and hides itself. `text` is what it is showing, "" once it is gone.
+    """
+
+    FADE_STEPS = 8
+    FADE_MS = 30
+
+    def __init__(self, root):
+        super().__init__(root, font=("Arial", 13, "bold"), fg=LIGHT_TEXT,
+                         pady=10, wraplength=480)
+        self.text = ""
+        self.color = BG_COLOR
+        self.after_id = None
+
+    @property
+    def visible(self):
+        return bool(self.text)
+
+    def show(self, text, color, ms):
+        self._cancel()
+        self.text, self.color = text, color
+        self.config(text=text, bg=color, fg=LIGHT_TEXT)
+        self.place(relx=0, rely=0, relwidth=1)
+        self.lift()
+        self.after_id = self.after(ms, self._fade, 1)
+
+    def _fade(self, step):
+        if step > self.FADE_STEPS:
+            self.hide()
+            return
+        t = step / self.FADE_STEPS
+        self.config(bg=blend(self.color, BG_COLOR, t), fg=blend(LIGHT_TEXT, BG_COLOR, t))
+        self.after_id = self.after(self.FADE_MS, self._fade, step + 1)
+
+    def hide(self):
+        self._cancel()
+        self.text = ""
+        self.place_forget()
+
+    def _cancel(self):
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+
+
+class StartScreen(Screen):
+    def __init__(self, root, on_start):
+        super().__init__(root)
+
+        self.gif_label = tk.Label(self, bg="black")
+        self.gif_label.pack(fill=tk.BOTH, expand=True)
+
+        # ⭐ UPDATED START BUTTON (correct location + correct text)
+        start_btn = tk.Button(
+            self,
+            text="Start",
+            font=("Comic Sans MS", 12, "bold"),
+            bg="#ff00ff",
+            fg="white",
+            width=8,
+            height=1,
+            command=on_start
+        )
+
+        # ⭐ Position aligned to the "start" area in your GIF
+        start_btn.place(relx=0.5, rely=0.75, anchor="center")
+
+
+class MenuScreen(Screen):
+    def __init__(self, root, on_level, on_quit):
+        super().__init__(root)
+
+        header = tk.Label(self, text="🎯 ARITHMETIC MATHS QUIZ GAME 🎯",
+                          font=("Comic Sans MS", 22, "bold"),
+                          bg=HEADER_COLOR, fg=LIGHT_TEXT, pady=15)
+        header.pack(fill=tk.X)
+
+        tk.Label(self, text="Choose Your Mode That You Want To Play On",
+                 font=("Arial", 16, "italic"),
+                 bg=BG_COLOR, fg=TEXT_COLOR).pack(pady=20)
+
+        # Difficulty buttons
+        btn_easy = tk.Button(self, text="😊 Mode Easy (1-digit numbers)",
+                             font=("Arial", 14, "bold"),
+                             width=30, height=2,
+                             bg="#90EE90", fg=TEXT_COLOR,
+                             activebackground="#7CDB7C",
+                             command=lambda: on_level(1))
+        btn_easy.pack(pady=8)
+
+        btn_moderate = tk.Button(self, text="🤔 Mode Moderate (2-digit numbers)",
+                                 font=("Arial", 14, "bold"),
+                                 width=30, height=2,
+                                 bg="#FFD700", fg=TEXT_COLOR,
+                                 activebackground="#FFC700",
+                                 command=lambda: on_level(2))
+        btn_moderate.pack(pady=8)
+
+        btn_advanced = tk.Button(self, text="🔥 Mode Advanced (4-digit numbers)",
+                                 font=("Arial", 14, "bold"),
+                                 width=30, height=2,
+                                 bg="#FF6B6B", fg=LIGHT_TEXT,
+                                 activebackground="#FF5252",
+                                 command=lambda: on_level(3))
+        btn_advanced.pack(pady=8)
+
+        btn_quit = tk.Button(self, text="❌ Quit",
+                             font=("Arial", 12),
+                             width=30, height=2,
+                             bg="#95a5a6", fg=LIGHT_TEXT,
+                             activebackground="#7f8c8d",
+                             command=on_quit)
+        btn_quit.pack(pady=20)
+
+
+class ProblemScreen(Screen):
+    def __init__(self, root, on_submit):
+        super().__init__(root)
+
+        self.header = tk.Label(self, font=("Comic Sans MS", 18, "bold"),
+                               bg=HEADER_COLOR, fg=LIGHT_TEXT, pady=12)
+        self.header.pack(fill=tk.X)
+
+        self.score_label = tk.Label(self, font=("Arial", 14, "bold"),
+                                    bg=BG_COLOR, fg="#27ae60")
+        self.score_label.pack(pady=15)
+
+        problem_frame = tk.Frame(self, bg="#ff76bd", relief=tk.RAISED, borderwidth=3)
+        problem_frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
+
+        self.problem_label = tk.Label(problem_frame, font=("Arial", 32, "bold"),
+                                      bg="#ff76bd", fg=HEADER_COLOR,
+                                      pady=30)
+        self.problem_label.pack()
+
+        tk.Label(self, text="Enter your answer:",
+                 font=("Arial", 12),
+                 bg=BG_COLOR, fg=TEXT_COLOR).pack(pady=5)
+
+        self.answer_entry = tk.Entry(self, font=("Arial", 20),
+                                     width=15, justify='center',
+                                     relief=tk.SOLID, borderwidth=2)
+        self.answer_entry.pack(pady=10)
+        self.answer_entry.bind('<Return>', lambda event: on_submit())
+
+        submit_btn = tk.Button(self, text="✓ Submit Answer",
+                               font=("Arial", 14, "bold"),
+                               bg=BUTTON_COLOR, fg=LIGHT_TEXT,
+                               activebackground=BUTTON_HOVER,
+                               width=20, height=2,
+                               command=on_submit)
+        submit_btn.pack(pady=15)
+
+    def set_question(self, number, score, problem):
+        self.header.config(text=f"📝 Question {number}/10")
+        self.score_label.config(text=f"Current Score: {score}/100")
+        self.problem_label.config(text=f"{problem} = ?")
+        self.answer_entry.delete(0, tk.END)
+
+    def show(self):
+        super().show()
+        self.answer_entry.focus()
+
+    def hide(self):
+        self.answer_entry.delete(0, tk.END)
+
+
+class ResultsScreen(Screen):
+    def __init__(self, root, on_again, on_quit):
+        super().__init__(root)
+
+        header = tk.Label(self, text="🏆 QUIZ COMPLETED! 🏆",
+                          font=("Comic Sans MS", 22, "bold"),
+                          bg=HEADER_COLOR, fg=LIGHT_TEXT, pady=15)
+        header.pack(fill=tk.X)
+
+        results_frame = tk.Frame(self, bg="#ff76bd", relief=tk.RAISED, borderwidth=3)
+        results_frame.pack(pady=15, padx=40, fill=tk.BOTH, expand=True)
+
+        tk.Label(results_frame, text="Your Final Result Is:",
+                 font=("Arial", 16),
+                 bg="#ff76bd", fg=TEXT_COLOR,
+                 pady=10).pack()
+
+        self.score_label = tk.Label(results_frame, font=("Arial", 48, "bold"),
+                                    bg="#ff76bd", fg="#27ae60",
+                                    pady=5)
+        self.score_label.pack()
+
+        self.grade_label = tk.Label(results_frame, font=("Arial", 28, "bold"),
+                                    bg="#ff76bd",
+                                    pady=5)
+        self.grade_label.pack()
+
+        # where this score stands among every stored quiz of the level
+        self.rank_label = tk.Label(results_frame, font=("Arial", 12, "bold"),
+                                   bg="#ff76bd", fg=TEXT_COLOR)
+        self.rank_label.pack()
+
+        self.board_label = tk.Label(results_frame, font=("Courier", 10),
+                                    bg="#ff76bd", fg=TEXT_COLOR,
+                                    justify=tk.LEFT, pady=5)
+        self.board_label.pack()
+
+        btn_again = tk.Button(self, text="🔄 Play Again",
+                              font=("Arial", 14, "bold"),
+                              bg=BUTTON_COLOR, fg=LIGHT_TEXT,
+                              activebackground=BUTTON_HOVER,
+                              width=20, height=2,
+                              command=on_again)
+        btn_again.pack(pady=5)
+
+        btn_quit = tk.Button(self, text="❌ Quit",
+                             font=("Arial", 14, "bold"),
+                             bg=DANGER_COLOR, fg=LIGHT_TEXT,
+                             activebackground="#c9302c",
+                             width=20, height=2,
+                             command=on_quit)
+        btn_quit.pack(pady=5)
+
+    def set_result(self, score, grade, grade_color, emoji):
+        self.score_label.config(text=f"{score}/100")
+        self.grade_label.config(text=f"{emoji} Grade: {grade} {emoji}", fg=grade_color)
+
+    def set_standing(self, rank_text, board):
+        """rank_text under the grade, then the leaderboard lines (or none)"""
+        self.rank_label.config(text=rank_text)
+        self.board_label.config(text="\n".join(board))
@@ -0,0 +1,391 @@
+"""
+Host many maths quiz sessions in one process, over HTTP and WebSocket.
+
+Every session is its own QuizEngine, so the rules and scoring are the
+same as in the Tk app; sessions share nothing but the process. Only the
+standard library is used: a small HTTP/1.1 server (keep-alive, JSON
+bodies) and just enough WebSocket (RFC 6455) for short JSON text
+messages, on asyncio.
+
+HTTP:
+    POST   /sessions              {"level": 2, "seed": 7}  -> state
+    GET    /sessions/<id>                                  -> state
+    POST   /sessions/<id>/answer  {"answer": 42}           -> outcome and state
+    DELETE /sessions/<id>
+
+WebSocket at /ws, one session per connection, closed with it:
+    {"op": "start", "level": 2, "seed": 7}  -> state
+    {"op": "answer", "answer": 42}          -> outcome and state
+    {"op": "state"}                         -> state
+
+A state is {"session", "level", "number", "score", "attempts",
+"question", "finished", "grade"}; an outcome adds "correct", "points",
+"retry" and "answer". Errors come back as {"error": "..."}.
+
+Usage:
+    python quiz_server.py [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import secrets
+import struct
+import time
+
+from quiz_engine import LEVELS, QuizEngine
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 64 * 1024            # bytes in a request body or WebSocket message
+SESSION_TTL = 30 * 60           # seconds an idle HTTP session is kept
+MAX_SESSIONS = 100_000
+
+# WebSocket opcodes
+TEXT, CLOSE, PING, PONG = 0x1, 0x8, 0x9, 0xA
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class RequestError(Exception):
+    """A request the server answers with an error status instead of a result."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------------------------------------------------------
+# Sessions
+# ----------------------------------------------------------
+
+class Sessions:
+    def __init__(self, ttl=SESSION_TTL, limit=MAX_SESSIONS):
+        self.ttl = ttl
+        self.limit = limit
+        self.engines = {}
+        self.used = {}          # session id -> time.monotonic() of last use
+        self.bound = set()      # sessions held by an open WebSocket: never swept
+
+    def __len__(self):
+        return len(self.engines)
+
+    def create(self, level, seed=None, bound=False):
+        if level not in LEVELS:
+            raise RequestError(400, f"level must be one of {sorted(LEVELS)}")
+        if len(self.engines) >= self.limit:
+            raise RequestError(503, "too many sessions")
+        sid = secrets.token_hex(8)
+        engine = QuizEngine(random.Random(seed))
+        engine.start(level)
+        self.engines[sid] = engine
+        self.used[sid] = time.monotonic()
+        if bound:
+            self.bound.add(sid)
+        return sid, engine
+
+    def get(self, sid):
+        engine = self.engines.get(sid)
+        if engine is None:
+            raise RequestError(404, "no such session")
+        self.used[sid] = time.monotonic()
+        return engine
+
+    def drop(self, sid):
+        self.engines.pop(sid, None)
+        self.used.pop(sid, None)
+        self.bound.discard(sid)
+
+    def sweep(self):
+        cutoff = time.monotonic() - self.ttl
+        for sid in [sid for sid, t in self.used.items() if t < cutoff and sid not in self.bound]:
+            self.drop(sid)
+
+
+def state(sid, engine):
+    finished = engine.finished
+    return {"session": sid, "level": engine.level, "number": engine.question_number,
+            "score": engine.score, "attempts": engine.attempts,
+            "question": None if finished else str(engine.question),
+            "finished": finished, "grade": engine.grade() if finished else None}
+
+
+def submit(sid, engine, message):
+    value = message.get("answer")
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise RequestError(400, "answer must be an integer")
+    if engine.finished:
+        raise RequestError(400, "the quiz is finished")
+    outcome = engine.submit(value)
+    return {**state(sid, engine), **outcome._asdict()}
+
+
+def _level_and_seed(message):
+    level, seed = message.get("level", 1), message.get("seed")
+    if not isinstance(level, int) or not (seed is None or isinstance(seed, int)):
+        raise RequestError(400, "level and seed must be integers")
+    return level, seed
+
+
+# ----------------------------------------------------------
+# WebSocket framing
+# ----------------------------------------------------------
+
+def _mask(data, key):
+    n = len(data)
+    if not n:
+        return data
+    keys = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(keys, "big")).to_bytes(n, "big")
+
+
+def encode_frame(opcode, data, mask=False):
+    """One unfragmented frame; clients must mask what they send, servers must not"""
+    n = len(data)
+    bit = 0x80 if mask else 0
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, bit | n)
+    elif n < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, bit | 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, bit | 127, n)
+    if mask:
+        key = os.urandom(4)
+        return head + key + _mask(data, key)
+    return head + data
+
+
+async def read_frame(reader, masked=False):
+    """Return (opcode, payload) of the next frame. Messages here are small
+    JSON texts, so fragmented messages are not reassembled. With masked,
+    the frame must be masked, as every frame from a client is."""
+    first, second = await reader.readexactly(2)
+    if masked and not second & 0x80:
+        raise RequestError(400, "client frames must be masked")
+    n = second & 0x7F
+    if n == 126:
+        n, = struct.unpack("!H", await reader.readexactly(2))
+    elif n == 127:
+        n, = struct.unpack("!Q", await reader.readexactly(8))
+    if n > MAX_BODY:
+        raise RequestError(413, "message too large")
+    key = await reader.readexactly(4) if second & 0x80 else None
+    data = await reader.readexactly(n)
+    return first & 0x0F, _mask(data, key) if key else data
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+async def open_websocket(host, port, path="/ws"):
+    """Client side of the handshake; returns (reader, writer) ready for frames"""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                  f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                  f"Sec-WebSocket-Version: 13\r\n\r\n").encode("ascii"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    if not head.startswith(b"HTTP/1.1 101") or accept_key(key).encode("ascii") not in head:
+        writer.close()
+        raise ConnectionError(f"WebSocket handshake refused: {head.splitlines()[0]!r}")
+    return reader, writer
+
+
+# ----------------------------------------------------------
+# Server
+# ----------------------------------------------------------
+
+async def read_request(reader):
+    """(method, path, headers, body) of the next request, or None at EOF"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "bad request line") from None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(400, "bad Content-Length") from None
+    if length < 0:
+        raise RequestError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def encode_response(status, payload=None, keep_alive=True):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+def parse_json(body):
+    if not body:
+        return {}
+    try:
+        message = json.loads(body)
+    except ValueError:
+        raise RequestError(400, "body is not JSON") from None
+    if not isinstance(message, dict):
+        raise RequestError(400, "body must be a JSON object")
+    return message
+
+
+class QuizServer:
+    def __init__(self, sessions=None):
+        self.sessions = sessions or Sessions()
+        self.server = None
+        self._sweeper = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        # a deep backlog: load tests open a thousand connections at once
+        self.server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        self._sweeper = asyncio.ensure_future(self._sweep())
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self._sweeper.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(60)
+            self.sessions.sweep()
+
+    def route(self, method, path, body):
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        if parts[:1] != ["sessions"] or len(parts) > 3:
+            raise RequestError(404, "not found")
+        if len(parts) == 1:
+            if method != "POST":
+                raise RequestError(405, "use POST to start a session")
+            sid, engine = self.sessions.create(*_level_and_seed(parse_json(body)))
+            return 201, state(sid, engine)
+        sid = parts[1]
+        if len(parts) == 3:
+            if parts[2] != "answer" or method != "POST":
+                raise RequestError(404, "not found")
+            return 200, submit(sid, self.sessions.get(sid), parse_json(body))
+        if method == "GET":
+            return 200, state(sid, self.sessions.get(sid))
+        if method == "DELETE":
+            self.sessions.get(sid)
+            self.sessions.drop(sid)
+            return 204, None
+        raise RequestError(405, "use GET or DELETE")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    if headers.get("upgrade", "").lower() == "websocket" and path == "/ws":
+                        await self.websocket(reader, writer, headers)
+                        break
+                    status, payload = self.route(method, path, body)
+                except RequestError as e:
+                    writer.write(encode_response(e.status, {"error": str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass    # the client went away or sent garbage; nothing to answer
+        finally:
+            writer.close()
+
+    async def websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            raise RequestError(400, "missing Sec-WebSocket-Key")
+        writer.write((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept_key(key)}\r\n\r\n")
+                     .encode("ascii"))
+        sid = None
+        try:
+            while True:
+                try:
+                    opcode, data = await read_frame(reader, masked=True)
+                except RequestError as e:
+                    # 1009: message too big, 1002: protocol error
+                    writer.write(encode_frame(CLOSE, struct.pack("!H", 1009 if e.status == 413 else 1002)))
+                    break
+                if opcode == CLOSE:
+                    writer.write(encode_frame(CLOSE, data[:2]))
+                    break
+                if opcode == PING:
+                    writer.write(encode_frame(PONG, data))
+                    continue
+                if opcode != TEXT:
+                    continue
+                try:
+                    sid, reply = self.ws_message(sid, parse_json(data))
+                except RequestError as e:
+                    reply = {"error": str(e)}
+                writer.write(encode_frame(TEXT, json.dumps(reply).encode("utf-8")))
+                await writer.drain()
+        finally:
+            if sid is not None:
+                self.sessions.drop(sid)
+
+    def ws_message(self, sid, message):
+        op = message.get("op")
+        if op == "start":
+            if sid is not None:
+                self.sessions.drop(sid)
+            sid, engine = self.sessions.create(*_level_and_seed(message), bound=True)
+            return sid, state(sid, engine)
+        if sid is None:
+            raise RequestError(400, "send a start message first")
+        if op == "answer":
+            return sid, submit(sid, self.sessions.get(sid), message)
+        if op == "state":
+            return sid, state(sid, self.sessions.get(sid))
+        raise RequestError(400, f"unknown op {op!r}")
+
+
+async def serve(host, port):
+    server = QuizServer()
+    host, port = await server.start(host, port)
+    # quiz_load.py reads the port from this line when it starts the server
+    print(f"quiz server on http://{host}:{port} (WebSocket at /ws)", flush=True)
+    await server.server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve maths quiz sessions over HTTP and WebSocket")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Play the maths quiz headlessly, many times over, and report the scores.
+
+Every session is a real QuizEngine game; the player is an answer model
+that gets each question right with some probability. Models are given as
+a string:
+
+    fixed:0.8               80% right, first try and second
+    retry:0.6,0.9           60% right first time, 90% on the second try
+    level:0.95,0.8,0.5      by level: easy, moderate, advanced
+
+Usage:
+    python quiz_sim.py --sessions 1000000 --level 2 --model retry:0.6,0.9 [--workers 4] [--seed 1]
+
+Sessions are split across worker processes; with a seed the report is
+the same for any number of workers.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz_engine import GRADES, LEVELS, MAX_SCORE, QUESTIONS, QuizEngine, grade_for
+
+CHUNK = 50_000      # sessions per job handed to a worker
+
+
+class AnswerModel:
+    """
+    A player who answers correctly with probability first[level] on a
+    first try and second[level] on a second one, and is otherwise off by
+    1 to 10.
+    """
+
+    def __init__(self, first, second=None):
+        self.first = first if isinstance(first, dict) else dict.fromkeys(LEVELS, first)
+        second = self.first if second is None else second
+        self.second = second if isinstance(second, dict) else dict.fromkeys(LEVELS, second)
+
+    def __call__(self, rng, level, question, attempt):
+        p = (self.first if attempt == 0 else self.second)[level]
+        r = rng.random()
+        if r < p:
+            return question.answer
+        # reuse the miss's own randomness to pick an error of +-1..10
+        miss = int((r - p) / (1 - p) * 20)
+        return question.answer + (miss - 10 if miss < 10 else miss - 9)
+
+
+def parse_model(text):
+    """Build an AnswerModel from 'kind:p[,p...]'; raises ValueError"""
+    kind, _, args = text.partition(":")
+    try:
+        probs = [float(p) for p in args.split(",")]
+    except ValueError:
+        raise ValueError(f"bad probabilities in model {text!r}") from None
+    if not all(0 <= p <= 1 for p in probs):
+        raise ValueError(f"probabilities must be between 0 and 1: {text!r}")
+    if kind == "fixed" and len(probs) == 1:
+        return AnswerModel(probs[0])
+    if kind == "retry" and len(probs) == 2:
+        return AnswerModel(probs[0], probs[1])
+    if kind == "level" and len(probs) == len(LEVELS):
+        return AnswerModel(dict(zip(sorted(LEVELS), probs)))
+    raise ValueError(f"unknown answer model {text!r}")
+
+
+def play(sessions, level, model, seed=None):
+    """Play `sessions` games; returns (Counter of final scores, answers given)"""
+    rng = random.Random(seed)
+    engine = QuizEngine(rng)
+    scores = Counter()
+    answers = 0
+    for _ in range(sessions):
+        engine.start(level)
+        while not engine.finished:
+            engine.submit(model(rng, level, engine.question, engine.attempts))
+            answers += 1
+        scores[engine.score] += 1
+    return scores, answers
+
+
+def _job(args):
+    sessions, level, model_text, seed = args
+    return play(sessions, level, parse_model(model_text), seed)
+
+
+def simulate(sessions, level, model_text, workers=1, seed=None):
+    """play() split into CHUNK-sized jobs over `workers` processes"""
+    jobs = []
+    for i, start in enumerate(range(0, sessions, CHUNK)):
+        job_seed = None if seed is None else seed * 1_000_003 + i
+        jobs.append((min(CHUNK, sessions - start), level, model_text, job_seed))
+    scores, answers = Counter(), 0
+    if workers <= 1:
+        results = map(_job, jobs)
+    else:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(_job, jobs)
+    for part, n in results:
+        scores.update(part)
+        answers += n
+    if workers > 1:
+        pool.shutdown()
+    return scores, answers
+
+
+def percentile(scores, total, q):
+    """Lowest score that at least a fraction q of the sessions did not beat"""
+    seen = 0
+    for score in sorted(scores):
+        seen += scores[score]
+        if seen >= q * total:
+            return score
+    return MAX_SCORE
+
+
+def report(scores, answers, seconds, out=sys.stdout):
+    total = sum(scores.values())
+    mean = sum(s * n for s, n in scores.items()) / total
+    sd = math.sqrt(sum(n * (s - mean) ** 2 for s, n in scores.items()) / total)
+    print(f"{total:,} sessions, {answers:,} answers in {seconds:.2f} s: "
+          f"{total / seconds:,.0f} sessions/s, {answers / seconds:,.0f} answers/s", file=out)
+    print(f"score mean {mean:.1f}, sd {sd:.1f}, p10 {percentile(scores, total, 0.1)}, "
+          f"median {percentile(scores, total, 0.5)}, p90 {percentile(scores, total, 0.9)}", file=out)
+
+    grades = Counter()
+    for s, n in scores.items():
+        grades[grade_for(s)] += n
+    print("grades: " + ", ".join(f"{g} {100 * grades[g] / total:.1f}%"
+                                 for g in [g for _, g in GRADES] + ["F"]), file=out)
+
+    top = max(scores.values())
+    for s in range(0, MAX_SCORE + 1, 5):
+        n = scores.get(s, 0)
+        bar = "#" * round(40 * n / top)
+        print(f"{s:>4} {100 * n / total:>6.2f}% {bar}", file=out)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=1_000_000)
+    ap.add_argument("--level", type=int, choices=sorted(LEVELS), default=2)
+    ap.add_argument("--model", default="retry:0.6,0.9")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args(argv)
+    try:
+        parse_model(args.model)
+    except ValueError as e:
+        ap.error(str(e))
+
+    print(f"level {args.level}, model {args.model}, {QUESTIONS} questions a session, "
+          f"{args.workers} worker(s)")
+    t0 = time.perf_counter()
+    scores, answers = simulate(args.sessions, args.level, args.model, args.workers, args.seed)
+    report(scores, answers, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Per-question timing and accuracy events for the maths quiz.
+
+Telemetry records three kinds of event, each stamped with the session,
+level, operation and question number:
+
+    shown      a question went up on screen
+    attempt    the player answered it: the answer, whether it was right,
+               and ms since the question was shown
+    outcome    the question is settled: points won and total ms
+
+Recording only appends a tuple to an in-memory buffer; every `batch`
+events (and on flush() / close()) the buffer is written in one go to a
+sink: JSON lines, or an SQLite table for querying:
+
+    SELECT level, operation, avg(ms) FROM events WHERE kind = 'outcome'
+    GROUP BY level, operation;
+
+bench.py telemetry measures the cost per event against BUDGET_US.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import time
+
+FIELDS = ("time", "session", "kind", "level", "operation", "number", "question",
+          "attempt", "answer", "correct", "points", "ms")
+BATCH = 256
+BUDGET_US = 25      # what recording plus flushing may cost per event, on average
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, events):
+        self.file.write("".join(json.dumps(dict(zip(FIELDS, e))) + "\n" for e in events))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteSink:
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS events (time REAL, session TEXT, kind TEXT, "
+                        "level INTEGER, operation TEXT, number INTEGER, question TEXT, "
+                        "attempt INTEGER, answer INTEGER, correct INTEGER, points INTEGER, ms REAL)")
+        self.db.commit()
+
+    def write(self, events):
+        with self.db:
+            self.db.executemany(f"INSERT INTO events VALUES ({', '.join('?' * len(FIELDS))})", events)
+
+    def close(self):
+        self.db.close()
+
+
+def open_sink(path):
+    """A sink for path, chosen by extension: .jsonl, or .db / .sqlite"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return JsonlSink(path)
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return SqliteSink(path)
+    raise ValueError(f"no telemetry sink for {ext or path!r} files")
+
+
+class Telemetry:
+    def __init__(self, sink, batch=BATCH, clock=time.perf_counter):
+        self.sink = sink
+        self.batch = batch
+        self.clock = clock
+        self.buffer = []
+        self.recorded = 0
+        self.session = None
+        self.shown_at = None
+
+    def start(self):
+        """A new quiz: later events belong to a fresh session id"""
+        self.session = secrets.token_hex(6)
+
+    def shown(self, engine):
+        self.shown_at = self.clock()
+        q = engine.question
+        self._add("shown", engine.level, q.operation, engine.question_number, q,
+                  engine.attempts, None, None, None, 0.0)
+
+    def answered(self, level, number, question, attempt, value, outcome):
+        """
+        Record an answer. level, number, question and attempt are the
+        engine's state from before submit(); outcome is what it returned.
+        """
+        ms = 1000 * (self.clock() - self.shown_at) if self.shown_at is not None else None
+        self._add("attempt", level, question.operation, number, question, attempt,
+                  value, outcome.correct, outcome.points, ms)
+        if not outcome.retry:
+            self._add("outcome", level, question.operation, number, question, attempt,
+                      None, outcome.correct, outcome.points, ms)
+
+    def _add(self, kind, level, operation, number, question, attempt, value, correct, points, ms):
+        self.buffer.append((time.time(), self.session, kind, level, operation, number, str(question),
+                            attempt, value, correct, points, ms))
+        if len(self.buffer) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            events, self.buffer = self.buffer, []
+            self.sink.write(events)
+            self.recorded += len(events)
+
+    def close(self):
+        self.flush()
+        self.sink.close()
@@ -0,0 +1,134 @@
+"""
+Every finished quiz, kept in SQLite, with leaderboard and rank queries.
+
+Each session row holds the player, level, score, when it finished and
+the ms taken over each question. Two indexes keep the leaderboard and a
+player's best a short index walk away, and a small score_counts table,
+kept up to date by triggers, counts sessions per (level, score). Scores
+only come in steps of 5, so ranks and percentiles add up at most 21 rows
+however many sessions are stored.
+
+    history = ScoreHistory("scores.db")
+    history.record("sam", 2, 85, [4200, 3100, ...])
+    history.top(2)              # [(player, score, finished), ...]
+    history.rank(2, 85)         # (rank, out of)
+    history.percentile(2, 85)   # % of level-2 sessions scoring lower
+"""
+
+import os
+import sqlite3
+import time
+from array import array
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    timings BLOB
+);
+CREATE INDEX IF NOT EXISTS sessions_board ON sessions (level, score DESC, finished);
+CREATE INDEX IF NOT EXISTS sessions_player ON sessions (player, level, score DESC);
+
+CREATE TABLE IF NOT EXISTS score_counts (
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (level, score)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS sessions_count AFTER INSERT ON sessions BEGIN
+    INSERT INTO score_counts VALUES (NEW.level, NEW.score, 1)
+        ON CONFLICT (level, score) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_uncount AFTER DELETE ON sessions BEGIN
+    UPDATE score_counts SET n = n - 1 WHERE level = OLD.level AND score = OLD.score;
+END;
+"""
+
+
+def pack_timings(timings):
+    # ms per question as uint32: 40 bytes a quiz instead of a JSON string
+    return array("I", (min(int(t), 0xFFFFFFFF) for t in timings)).tobytes()
+
+
+def unpack_timings(blob):
+    timings = array("I")
+    if blob:
+        timings.frombytes(blob)
+    return timings.tolist()
+
+
+class ScoreHistory:
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        # a crash may lose the last quiz or so, but never corrupts the file
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, player, level, score, timings=(), finished=None):
+        """Store one finished quiz; returns its id"""
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO sessions (player, level, score, finished, timings) VALUES (?, ?, ?, ?, ?)",
+                (player, level, score, time.time() if finished is None else finished,
+                 pack_timings(timings)))
+        return cur.lastrowid
+
+    def record_many(self, rows):
+        """Store (player, level, score, timings, finished) rows in one transaction"""
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO sessions (player, level, score, timings, finished) VALUES (?, ?, ?, ?, ?)",
+                ((p, lv, s, pack_timings(t), f) for p, lv, s, t, f in rows))
+
+    def count(self, level):
+        row = self.db.execute("SELECT total(n) FROM score_counts WHERE level = ?", (level,)).fetchone()
+        return int(row[0])
+
+    def top(self, level, n=10):
+        """The n best sessions of a level, earliest first among equal scores"""
+        return self.db.execute(
+            "SELECT player, score, finished FROM sessions WHERE level = ? "
+            "ORDER BY score DESC, finished LIMIT ?", (level, n)).fetchall()
+
+    def rank(self, level, score):
+        """(rank, out of) for a score: 1 + the sessions that scored higher"""
+        higher, total = self.db.execute(
+            "SELECT total(CASE WHEN score > ? THEN n END), total(n) FROM score_counts "
+            "WHERE level = ?", (score, level)).fetchone()
+        return int(higher) + 1, int(total)
+
+    def percentile(self, level, score):
+        """Percentage of the level's sessions that scored lower than score"""
+        lower, total = self.db.execute(
+            "SELECT total(CASE WHEN score < ? THEN n END), total(n) FROM score_counts "
+            "WHERE level = ?", (score, level)).fetchone()
+        return 100 * lower / total if total else 0.0
+
+    def best(self, player, level):
+        row = self.db.execute("SELECT max(score) FROM sessions WHERE player = ? AND level = ?",
+                              (player, level)).fetchone()
+        return row[0]
+
+    def player_rank(self, player, level):
+        """Rank of the player's best score at level, or None if they have not played it"""
+        best = self.best(player, level)
+        return None if best is None else self.rank(level, best)
+
+    def history(self, player, limit=10):
+        """The player's latest sessions as (level, score, finished, timings), newest first"""
+        rows = self.db.execute(
+            "SELECT level, score, finished, timings FROM sessions WHERE player = ? "
+            "ORDER BY id DESC LIMIT ?", (player, limit)).fetchall()
+        return [(lv, s, f, unpack_timings(t)) for lv, s, f, t in rows]
@@ -0,0 +1,68 @@
+"""QuestionBank: reproducible seeds and streams, and the question rules."""
+
+import pytest
+
+import question_bank
+from question_bank import QuestionBank
+from quiz_engine import LEVELS, QUESTIONS
+
+
+@pytest.fixture(params=["numpy", "python"])
+def use_numpy(request):
+    if request.param == "numpy" and question_bank.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param == "numpy"
+
+
+def columns(drawn):
+    return [list(map(int, x)) for x in drawn]
+
+
+def test_same_seed_same_questions(use_numpy):
+    a = QuestionBank(seed=3, use_numpy=use_numpy)
+    b = QuestionBank(seed=3, use_numpy=use_numpy)
+    assert columns(a.generate(500, 2)) == columns(b.generate(500, 2))
+    assert columns(a.generate(500, 2)) != columns(QuestionBank(seed=4, use_numpy=use_numpy).generate(500, 2))
+    # each level and stream is a stream of its own
+    assert columns(a.generate(500, 1)) != columns(a.generate(500, 1, stream=(0, 1)))
+
+
+def test_sessions_replay_in_any_order(use_numpy):
+    bank = QuestionBank(seed=9, use_numpy=use_numpy)
+    first = [bank.session(2) for _ in range(5)]
+    assert bank.sessions == 5
+    again = QuestionBank(seed=9, use_numpy=use_numpy)
+    assert again.session(2, 3) == first[3]
+    assert [again.session(2, k) for k in range(5)] == first
+    assert first[0] != first[1]
+
+
+@pytest.mark.parametrize("level", sorted(LEVELS))
+def test_rules(use_numpy, level):
+    low, high = LEVELS[level]
+    bank = QuestionBank(seed=level, no_negative=True, use_numpy=use_numpy)
+    a, ops, b = columns(bank.generate(5000, level))
+    assert all(low <= x <= high for x in a + b)
+    assert set(ops) == {0, 1}
+    assert all(x >= y for x, op, y in zip(a, ops, b) if op)
+    for number in range(50):
+        session = bank.session(level, number)
+        assert len(session) == QUESTIONS == len(set(session))
+        assert all(q.answer >= 0 for q in session)
+
+
+def test_sessions_array_rows_are_unique():
+    if question_bank.np is None:
+        pytest.skip("numpy is not installed")
+    # level 1 has only 2 * 9 * 9 questions, so a row of 10 often repeats before the redraw
+    a, ops, b = QuestionBank(seed=1).sessions_array(2000, 1)
+    assert a.shape == ops.shape == b.shape == (2000, QUESTIONS)
+    for row in zip(a.tolist(), ops.tolist(), b.tolist()):
+        assert len(set(zip(*row))) == QUESTIONS
+
+
+def test_too_few_distinct_questions(use_numpy):
+    with pytest.raises(ValueError):
+        QuestionBank(seed=1, use_numpy=use_numpy).session(1, 0, questions=2 * 9 * 9 + 1)
+    with pytest.raises(ValueError):
+        QuestionBank(use_numpy=use_numpy).generate(10, 7)
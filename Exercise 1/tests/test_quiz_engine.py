@@ -0,0 +1,105 @@
+"""QuizEngine rules and scoring, and the headless simulator built on them."""
+
+import random
+
+import pytest
+
+from question_bank import QuestionBank
+from quiz_engine import (FIRST_TRY_POINTS, LEVELS, MAX_SCORE, QUESTIONS, SECOND_TRY_POINTS,
+                         QuizEngine, grade_for)
+from quiz_sim import AnswerModel
+
+
+def play(engine, answers):
+    """Answer every question with answers(question, attempt); returns the outcomes"""
+    outcomes = []
+    while not engine.finished:
+        outcomes.append(engine.submit(answers(engine.question, engine.attempts)))
+    return outcomes
+
+
+def test_perfect_quiz():
+    engine = QuizEngine(random.Random(1))
+    engine.start(2)
+    outcomes = play(engine, lambda q, attempt: q.answer)
+    assert len(outcomes) == QUESTIONS
+    assert all(o.correct and o.points == FIRST_TRY_POINTS and not o.retry for o in outcomes)
+    assert engine.score == MAX_SCORE and engine.grade() == "A"
+    assert engine.question is None
+
+
+def test_second_try_and_miss():
+    engine = QuizEngine(random.Random(2))
+    engine.start(1)
+    q = engine.question
+    wrong = engine.submit(q.answer + 1)
+    assert wrong == (False, 0, True, None) and engine.question is q and engine.attempts == 1
+    right = engine.submit(q.answer)
+    assert right.correct and right.points == SECOND_TRY_POINTS and engine.question_number == 2
+
+    q = engine.question
+    engine.submit(q.answer + 1)
+    missed = engine.submit(q.answer - 1)
+    # a second miss settles the question and reveals the answer
+    assert missed == (False, 0, False, q.answer) and engine.question_number == 3
+    assert engine.score == SECOND_TRY_POINTS
+
+
+def test_operands_fit_the_level():
+    for level, (low, high) in LEVELS.items():
+        engine = QuizEngine(random.Random(level))
+        for _ in range(200):
+            q = engine.start(level)
+            assert low <= q.num1 <= high and low <= q.num2 <= high
+            assert q.operation in "+-"
+
+
+def test_not_running():
+    engine = QuizEngine()
+    with pytest.raises(RuntimeError):
+        engine.submit(1)
+    with pytest.raises(ValueError):
+        engine.start(9)
+    engine.start(1)
+    play(engine, lambda q, attempt: q.answer)
+    with pytest.raises(RuntimeError):
+        engine.submit(1)
+
+
+def test_restart_resets_the_session():
+    engine = QuizEngine(random.Random(3))
+    engine.start(1)
+    engine.submit(engine.question.answer)
+    engine.start(3)
+    assert (engine.level, engine.score, engine.question_number, engine.attempts) == (3, 0, 1, 0)
+
+
+@pytest.mark.parametrize("score, grade", [(100, "A"), (90, "A"), (85, "B"), (70, "C"), (60, "D"),
+                                          (55, "F"), (0, "F")])
+def test_grades(score, grade):
+    assert grade_for(score) == grade
+
+
+def test_plays_the_banks_sessions():
+    bank = QuestionBank(seed=11)
+    engine = QuizEngine(bank=QuestionBank(seed=11))
+    for number in range(3):
+        asked = []
+        engine.start(2)
+        play(engine, lambda q, attempt: asked.append(q) or q.answer)
+        assert asked == bank.session(2, number)
+
+
+def test_answer_model_rates():
+    rng = random.Random(5)
+    engine = QuizEngine(random.Random(6))
+    model = AnswerModel(0.7, 0.9)
+    first = right = 0
+    for _ in range(300):
+        engine.start(2)
+        for o in play(engine, lambda q, attempt: model(rng, 2, q, attempt)):
+            first += o.points == FIRST_TRY_POINTS
+            right += o.correct
+    # 3000 questions: 70% right first time, 97% right in the end
+    assert abs(first / 3000 - 0.7) < 0.04
+    assert abs(right / 3000 - 0.97) < 0.02
@@ -0,0 +1,73 @@
+"""Answer feedback is a banner that fades, with the next question already up."""
+
+import random
+from tkinter import messagebox
+
+import pytest
+
+from quiz_app import QuizApp
+from quiz_driver import QuizDriver
+from quiz_engine import FIRST_TRY_POINTS, SECOND_TRY_POINTS, QuizEngine
+from quiz_sim import AnswerModel
+
+
+@pytest.fixture
+def driver(root):
+    driver = QuizDriver(QuizApp(root, engine=QuizEngine(random.Random(1)), feedback_ms=20))
+    driver.start(2)
+    return driver
+
+
+def test_right_first_time(driver):
+    step = driver.answer(driver.question.answer)
+    assert step.feedback == f"🎉 Excellent! You got it right! +{FIRST_TRY_POINTS} points"
+    # the next question went up under the banner
+    assert step.settled and step.problem == f"{driver.question} = ?"
+    assert driver.app.banner.visible and driver.app.engine.question_number == 2
+
+
+def test_retry_then_right(driver):
+    q = driver.question
+    step = driver.answer(q.answer + 1)
+    assert step.feedback == "❌ Oops! Wrong answer. Try once more!"
+    assert not step.settled and step.problem == f"{q} = ?"
+    assert driver.app.problem_screen.answer_entry.get() == ""
+    step = driver.answer(q.answer)
+    assert step.feedback == f"✓ Good job on second attempt! +{SECOND_TRY_POINTS} points" and step.settled
+
+
+def test_wrong_twice(driver):
+    q = driver.question
+    driver.answer(q.answer + 1)
+    step = driver.answer(q.answer + 2)
+    assert step.feedback == f"😔 Wrong again! {q} = {q.answer}"
+    assert step.settled and step.problem == f"{driver.question} = ?"
+
+
+def test_not_a_number(driver):
+    q = driver.question
+    step = driver.answer("twelve")
+    assert step.feedback == "⚠️ Please enter a valid number!"
+    assert not step.settled and driver.question is q and driver.app.engine.attempts == 0
+
+
+def test_banner_fades(driver):
+    banner = driver.app.banner
+    driver.answer(driver.question.answer)
+    driver.answer("x")
+    # the newer feedback replaced the older one, timer and all
+    assert banner.text == "⚠️ Please enter a valid number!"
+    assert driver.wait_for_banner(timeout=5)
+    assert banner.text == "" and not banner.winfo_manager()
+    assert driver.root.errors == []
+
+
+def test_a_whole_quiz_without_a_dialog(driver, monkeypatch):
+    shown = []
+    for box in ("showinfo", "showwarning", "showerror", "askyesno"):
+        monkeypatch.setattr(messagebox, box, lambda *a, box=box, **kw: shown.append(box))
+    steps = driver.play(AnswerModel(0.5, 0.5), random.Random(2))
+    assert steps[-1].finished and all(step.feedback for step in steps)
+    assert driver.app.screen is driver.app.results_screen and driver.app.banner.visible
+    assert driver.wait_for_banner(timeout=5)
+    assert shown == [] and driver.root.errors == []
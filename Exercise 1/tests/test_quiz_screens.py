@@ -0,0 +1,83 @@
+"""The quiz window reuses its screens: a whole quiz creates no widgets."""
+
+import random
+import tkinter as tk
+
+from quiz_app import QuizApp
+from quiz_driver import QuizDriver
+from quiz_engine import QUESTIONS, QuizEngine
+from quiz_sim import AnswerModel
+
+
+def widgets(parent):
+    """Every widget under parent, as (path name, widget) pairs"""
+    found = []
+    for child in parent.winfo_children():
+        found.append((str(child), child))
+        found += widgets(child)
+    return found
+
+
+def button(screen, text):
+    return next(w for _, w in widgets(screen) if isinstance(w, tk.Button) and w.cget("text") == text)
+
+
+def driver_for(root, seed=1):
+    return QuizDriver(QuizApp(root, engine=QuizEngine(random.Random(seed)), feedback_ms=20))
+
+
+def test_a_quiz_creates_no_widgets(root):
+    driver = driver_for(root)
+    app = driver.app
+    before = widgets(root)
+    screen, label = app.problem_screen, app.problem_screen.problem_label
+    driver.start(2)
+    assert app.screen is screen and driver.problem_text == f"{driver.question} = ?"
+    assert screen.header.cget("text") == "📝 Question 1/10"
+
+    steps = driver.play(AnswerModel(0.6, 0.5), random.Random(2))
+    assert sum(step.settled for step in steps) == QUESTIONS and steps[-1].finished
+    assert widgets(root) == before
+    assert app.problem_screen is screen and screen.problem_label is label
+    assert app.screen is app.results_screen
+    assert app.results_screen.score_label.cget("text") == f"{app.engine.score}/100"
+
+    # and again, from the results screen through the menu
+    button(app.results_screen, "🔄 Play Again").invoke()
+    assert app.screen is app.menu_screen
+    button(app.menu_screen, "😊 Mode Easy (1-digit numbers)").invoke()
+    assert app.screen is screen and screen.header.cget("text") == "📝 Question 1/10"
+    assert screen.score_label.cget("text") == "Current Score: 0/100"
+    driver.play(AnswerModel(1.0), random.Random(3))
+    assert widgets(root) == before and root.errors == []
+
+
+def test_submit_after_the_last_question(root):
+    driver = driver_for(root)
+    app = driver.app
+    driver.start(1)
+    entry = app.problem_screen.answer_entry
+    driver.play(AnswerModel(1.0), random.Random(4))
+    assert app.screen is app.results_screen
+    # leaving the problem screen emptied its entry and took the focus with it
+    root.update()
+    assert entry.get() == "" and root.focus_get() is not entry
+
+    # a stray Return or click on the hidden problem screen changes nothing
+    score = app.engine.score
+    entry.insert(0, "7")
+    button(app.problem_screen, "✓ Submit Answer").invoke()
+    app.check_answer()
+    assert root.errors == []
+    assert app.engine.score == score and app.screen is app.results_screen
+
+
+def test_moving_between_screens_clears_the_answer(root):
+    driver = driver_for(root)
+    app = driver.app
+    driver.start(3)
+    app.problem_screen.answer_entry.insert(0, "99")
+    app.displayMenu()
+    assert app.problem_screen.answer_entry.get() == ""
+    driver.start(3)
+    assert app.screen is app.problem_screen and app.engine.question_number == 1
@@ -0,0 +1,126 @@
+"""Request parsing, framing and routing of quiz_server, without a socket."""
+
+import asyncio
+import json
+import struct
+
+import pytest
+
+from quiz_server import (CLOSE, MAX_BODY, TEXT, QuizServer, RequestError, Sessions, encode_frame,
+                         parse_json, read_frame, read_request)
+
+
+def feed(data):
+    """Run coroutine(reader) over a StreamReader holding data"""
+    def run(coroutine):
+        async def go():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await coroutine(reader)
+        return asyncio.run(go())
+    return run
+
+
+def request(head, body=b""):
+    return feed(head.encode("latin-1") + body)(read_request)
+
+
+def status_of(head, body=b""):
+    with pytest.raises(RequestError) as e:
+        request(head, body)
+    return e.value.status
+
+
+def test_request_with_body():
+    body = b'{"level": 2}'
+    method, path, headers, got = request(
+        f"POST /sessions HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n", body + b"GET /next")
+    assert (method, path, got) == ("POST", "/sessions", body)
+    assert headers["content-length"] == str(len(body))
+    assert headers["connection"] == "close"
+
+
+def test_request_without_body():
+    assert request("GET /sessions/ab HTTP/1.1\r\n\r\n") == ("GET", "/sessions/ab", {}, b"")
+
+
+def test_eof_before_a_request():
+    assert request("") is None
+    assert request("GET / HTTP/1.1\r\n") is None
+
+
+@pytest.mark.parametrize("head, status", [
+    ("GARBAGE\r\n\r\n", 400),
+    ("POST / HTTP/1.1\r\nContent-Length: ten\r\n\r\n", 400),
+    ("POST / HTTP/1.1\r\nContent-Length: -5\r\n\r\n", 400),
+    (f"POST / HTTP/1.1\r\nContent-Length: {MAX_BODY + 1}\r\n\r\n", 413),
+])
+def test_bad_requests(head, status):
+    assert status_of(head) == status
+
+
+def test_parse_json():
+    assert parse_json(b"") == {}
+    assert parse_json(b'{"answer": 3}') == {"answer": 3}
+    for body in (b"{", b"[1, 2]", b'"text"'):
+        with pytest.raises(RequestError) as e:
+            parse_json(body)
+        assert e.value.status == 400
+
+
+def test_frames_round_trip():
+    for size in (0, 5, 125, 126, 300, 1 << 16):
+        data = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        opcode, got = feed(encode_frame(TEXT, data, mask=True))(lambda r: read_frame(r, masked=True))
+        assert (opcode, got) == (TEXT, data)
+        assert feed(encode_frame(CLOSE, data))(read_frame) == (CLOSE, data)
+
+
+def test_unmasked_client_frame_is_refused():
+    with pytest.raises(RequestError) as e:
+        feed(encode_frame(TEXT, b"{}"))(lambda r: read_frame(r, masked=True))
+    assert e.value.status == 400
+
+
+def test_oversized_frame_is_refused():
+    head = struct.pack("!BBQ", 0x80 | TEXT, 0x80 | 127, MAX_BODY + 1)
+    with pytest.raises(RequestError) as e:
+        feed(head)(lambda r: read_frame(r, masked=True))
+    assert e.value.status == 413
+
+
+def test_routes():
+    server = QuizServer()
+    status, st = server.route("POST", "/sessions", b'{"level": 1, "seed": 3}')
+    assert status == 201 and st["number"] == 1 and not st["finished"]
+    sid = st["session"]
+    assert server.route("GET", f"/sessions/{sid}", b"") == (200, st)
+
+    a, op, b = st["question"].split()
+    answer = int(a) + int(b) if op == "+" else int(a) - int(b)
+    status, out = server.route("POST", f"/sessions/{sid}/answer",
+                               json.dumps({"answer": answer}).encode())
+    assert status == 200 and out["correct"] and out["score"] == 10
+
+    assert server.route("DELETE", f"/sessions/{sid}", b"") == (204, None)
+    for method, path, body, expected in [
+            ("GET", f"/sessions/{sid}", b"", 404),
+            ("GET", "/elsewhere", b"", 404),
+            ("GET", "/sessions", b"", 405),
+            ("POST", "/sessions", b'{"level": 9}', 400),
+            ("POST", "/sessions", b'{"level": "2"}', 400)]:
+        with pytest.raises(RequestError) as e:
+            server.route(method, path, body)
+        assert e.value.status == expected
+
+
+def test_sweep_keeps_websocket_sessions():
+    sessions = Sessions(ttl=-1)
+    loose, _ = sessions.create(1)
+    bound, _ = sessions.create(1, bound=True)
+    sessions.sweep()
+    assert bound in sessions.engines and loose not in sessions.engines
+    sessions.drop(bound)
+    assert not sessions.bound and not len(sessions)
@@ -0,0 +1,114 @@
+"""Telemetry events, batching, and the JSON-lines and SQLite sinks."""
+
+import json
+import random
+import sqlite3
+
+import pytest
+
+from quiz_engine import QuizEngine
+from quiz_telemetry import FIELDS, JsonlSink, SqliteSink, Telemetry, open_sink
+
+
+class ListSink:
+    def __init__(self):
+        self.writes = []
+        self.closed = False
+
+    def write(self, events):
+        self.writes.append(list(events))
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def answer(telemetry, engine, value):
+    """Submit value the way quiz_app does, recording it"""
+    level, number, question, attempt = engine.level, engine.question_number, engine.question, engine.attempts
+    outcome = engine.submit(value)
+    telemetry.answered(level, number, question, attempt, value, outcome)
+    return outcome
+
+
+def test_events_of_a_question():
+    sink, clock = ListSink(), Clock()
+    telemetry = Telemetry(sink, batch=100, clock=clock)
+    engine = QuizEngine(random.Random(1))
+    telemetry.start()
+    engine.start(2)
+    q = engine.question
+    telemetry.shown(engine)
+    clock.now = 1.5
+    answer(telemetry, engine, q.answer + 1)
+    clock.now = 4.0
+    answer(telemetry, engine, q.answer)
+    telemetry.flush()
+
+    events = [dict(zip(FIELDS, e)) for e in sink.writes[0]]
+    assert [e["kind"] for e in events] == ["shown", "attempt", "attempt", "outcome"]
+    assert {e["session"] for e in events} == {telemetry.session}
+    assert all(e["question"] == str(q) and e["number"] == 1 and e["level"] == 2 for e in events)
+    first, second, outcome = events[1:]
+    assert (first["attempt"], first["answer"], first["correct"], first["ms"]) == (0, q.answer + 1, False, 1500)
+    assert (second["attempt"], second["correct"], second["points"], second["ms"]) == (1, True, 5, 4000)
+    assert (outcome["correct"], outcome["points"], outcome["ms"]) == (True, 5, 4000)
+
+
+def test_batches():
+    sink = ListSink()
+    telemetry = Telemetry(sink, batch=4, clock=Clock())
+    engine = QuizEngine(random.Random(2))
+    telemetry.start()
+    engine.start(1)
+    for _ in range(5):
+        telemetry.shown(engine)
+        answer(telemetry, engine, engine.question.answer)
+    # 15 events: three full batches written, three waiting
+    assert [len(w) for w in sink.writes] == [4, 4, 4] and len(telemetry.buffer) == 3
+    telemetry.close()
+    assert [len(w) for w in sink.writes] == [4, 4, 4, 3]
+    assert telemetry.recorded == 15 and sink.closed
+
+
+def sink_events(tmp_path, name):
+    sink = open_sink(str(tmp_path / "logs" / name))
+    telemetry = Telemetry(sink, batch=3, clock=Clock())
+    engine = QuizEngine(random.Random(3))
+    telemetry.start()
+    engine.start(3)
+    while not engine.finished:
+        telemetry.shown(engine)
+        answer(telemetry, engine, engine.question.answer)
+    telemetry.close()
+    return sink
+
+
+def test_jsonl_sink(tmp_path):
+    sink = sink_events(tmp_path, "events.jsonl")
+    assert isinstance(sink, JsonlSink)
+    with open(sink.path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    assert len(events) == 30 and set(events[0]) == set(FIELDS)
+    assert sum(e["points"] for e in events if e["kind"] == "outcome") == 100
+
+
+def test_sqlite_sink(tmp_path):
+    sink = sink_events(tmp_path, "events.db")
+    assert isinstance(sink, SqliteSink)
+    db = sqlite3.connect(sink.path)
+    rows = db.execute("SELECT kind, count(*), total(points) FROM events GROUP BY kind ORDER BY kind").fetchall()
+    db.close()
+    assert rows == [("attempt", 10, 100.0), ("outcome", 10, 100.0), ("shown", 10, 0.0)]
+
+
+def test_unknown_sink(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "events.csv"))
@@ -0,0 +1,74 @@
+"""ScoreHistory: leaderboard, rank and percentile queries against the raw rows."""
+
+import random
+
+import pytest
+
+from score_history import ScoreHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ScoreHistory(str(tmp_path / "db" / "scores.db"))
+    yield history
+    history.close()
+
+
+def fill(history, n=400, seed=1):
+    rng = random.Random(seed)
+    rows = [(f"p{rng.randrange(40)}", rng.randint(1, 3), 5 * rng.randrange(21),
+             [rng.randrange(100, 9000) for _ in range(10)], float(i)) for i in range(n)]
+    history.record_many(rows)
+    return rows
+
+
+def test_top(history):
+    rows = fill(history)
+    for level in (1, 2, 3):
+        mine = sorted((r for r in rows if r[1] == level), key=lambda r: (-r[2], r[4]))
+        assert history.top(level, 7) == [(p, s, f) for p, _, s, _, f in mine[:7]]
+
+
+def test_rank_and_percentile(history):
+    rows = fill(history)
+    for level in (1, 2, 3):
+        scores = [r[2] for r in rows if r[1] == level]
+        assert history.count(level) == len(scores)
+        for score in range(0, 105, 5):
+            higher = sum(s > score for s in scores)
+            lower = sum(s < score for s in scores)
+            assert history.rank(level, score) == (higher + 1, len(scores))
+            assert history.percentile(level, score) == pytest.approx(100 * lower / len(scores))
+    assert history.rank(7, 50) == (1, 0) and history.percentile(7, 50) == 0.0
+
+
+def test_players(history):
+    rows = fill(history)
+    best = max(s for p, lv, s, _, _ in rows if p == "p3" and lv == 2)
+    assert history.best("p3", 2) == best
+    assert history.player_rank("p3", 2) == history.rank(2, best)
+    assert history.best("nobody", 2) is None and history.player_rank("nobody", 2) is None
+    latest = [r for r in rows if r[0] == "p3"][::-1][:4]
+    assert history.history("p3", 4) == [(lv, s, f, t) for _, lv, s, t, f in latest]
+
+
+def test_record_and_reopen(tmp_path):
+    path = str(tmp_path / "scores.db")
+    history = ScoreHistory(path)
+    history.record("sam", 2, 85, [4200, 3100], finished=10.0)
+    history.record("ann", 2, 90, [1000] * 10, finished=11.0)
+    history.close()
+    history = ScoreHistory(path)
+    assert history.top(2) == [("ann", 90, 11.0), ("sam", 85, 10.0)]
+    assert history.history("sam") == [(2, 85, 10.0, [4200, 3100])]
+    assert history.rank(2, 85) == (2, 2)
+    history.close()
+
+
+def test_counts_follow_deletes(history):
+    fill(history, 100)
+    before = history.count(2)
+    with history.db:
+        gone = history.db.execute("DELETE FROM sessions WHERE level = 2 AND score >= 50").rowcount
+    assert history.count(2) == before - gone
+    assert history.rank(2, 50) == (1, before - gone)
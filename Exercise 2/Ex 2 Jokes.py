@@ -1,7 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
 import os
+import sys
+
+# background.py is shared by the exercises, from common/ at the top of the repo
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+from background import BackgroundTasks, Cancelled
+from joke_order import JokeOrder
+from joke_search import CATEGORIES, open_search
+from joke_store import open_store, source_stamp
 
 # Color Scheme
 BG_COLOR = "#f0f8ff"  # Alice Blue
@@ -12,66 +19,164 @@ QUIT_COLOR = "#f44336"  # Red
 TEXT_COLOR = "#2c3e50"  # Dark Blue-Gray
 LIGHT_TEXT = "#ffffff"  # White
 
+WATCH_MS = 1000  # how often to look for edits to randomJokes.txt
+SEARCH_DEBOUNCE_MS = 150
+ORDER_SAVE_MS = 5000  # randomJokes.order is written at most this often, and on quit
+
+def read_jokes(task, file_path):
+    """
+    Open randomJokes.txt (Format: Setup?Punchline) as a JokeStore: only
+    the byte offset of each joke is kept, and a joke is read when shown.
+    Runs on the background worker; the offsets are saved in randomJokes.idx
+    so the next start skips the scan.
+    """
+    return open_store(file_path, task=task)
+
+
+def read_search(task, jokes):
+    """
+    Open the search index saved in randomJokes.search, or build it if the
+    jokes have changed since. Runs on the background worker.
+    """
+    return open_search(jokes, task=task)
+
+
 class JokeTellingApp:
     def __init__(self, root):
         self.root = root
         self.root.title("🎭 Alexa - Joke Telling Assistant")
-        self.root.geometry("650x550")
+        self.root.geometry("650x700")
         self.root.configure(bg=BG_COLOR)
         self.root.resizable(False, False)
         
-        self.jokes = []
+        self.jokes = None   # a joke_store.JokeStore once loaded
+        self.order = None   # which joke comes next: every one once, shuffled
         self.current_joke = None
-        self.load_jokes()
-        
+        self.tasks = BackgroundTasks(root)
+        self.watching = None    # after() id of the next look at the joke file
+        self.reloading = False
+        self.search = None      # a joke_search.SearchIndex once built
+        self.search_timer = None
+        self.shown = []         # joke numbers in the results list
+        self.order_timer = None # after() id of the pending save of the order
+
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+        self.load_jokes()
     
     def load_jokes(self):
-        """Load jokes from randomJokes.txt file (Format: Setup?Punchline)"""
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(script_dir, "randomJokes.txt")
+        """Load jokes from randomJokes.txt on the background worker"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        file_path = os.path.join(script_dir, "randomJokes.txt")
+        self.file_path = file_path
+        self.order_path = os.path.join(script_dir, "randomJokes.order")
+        self.alexa_button.config(state=tk.DISABLED, text="⏳ Loading jokes...")
+        self.tasks.submit(read_jokes, file_path,
+                          on_done=self.jokes_loaded, on_error=self.load_failed)
 
-            with open(file_path, "r", encoding="utf-8") as file:
-                lines = file.readlines()
+    def jokes_loaded(self, jokes):
+        self.jokes = jokes
+        if not self.jokes:
+            messagebox.showerror(
+                "Error",
+                "No valid jokes found in randomJokes.txt.\n\n"
+                "Required format:\nSetup?Punchline"
+            )
+            self.root.quit()
+            return
+        # carries on the saved order from the last run if the jokes still match
+        self.order = JokeOrder(len(self.jokes), self.order_path)
+        self.alexa_button.config(state=tk.NORMAL, text="🎤 Alexa tell me a Joke")
+        self.watching = self.root.after(WATCH_MS, self.watch_jokes)
+        self.build_search()
+
+    def build_search(self):
+        """Open or build the search index on the background worker"""
+        if self.search is not None:
+            self.search.close()
+            self.search = None
+        self.search_entry.config(state=tk.DISABLED)
+        self.search_count.config(text="Indexing jokes...")
+        self.tasks.submit(read_search, self.jokes,
+                          on_done=self.search_ready, on_error=self.search_failed)
+
+    def search_ready(self, search):
+        self.search = search
+        self.search_entry.config(state=tk.NORMAL)
+        self.run_search()
 
-                for line in lines:
-                    line = line.strip()
+    def search_failed(self, error):
+        # telling jokes still works without it
+        if not isinstance(error, Cancelled):
+            self.search_count.config(text="Search unavailable")
 
-                    # Skip empty lines
-                    if not line:
-                        continue
+    def watch_jokes(self):
+        """Re-index randomJokes.txt when it changes, on the background worker"""
+        self.watching = self.root.after(WATCH_MS, self.watch_jokes)
+        if self.reloading:
+            return
+        try:
+            changed = source_stamp(self.file_path) != self.jokes.source
+        except OSError:
+            return      # mid-save, or moved away: look again later
+        if changed:
+            self.reloading = True
+            self.tasks.submit(self.jokes.changes,
+                              on_done=self.jokes_changed, on_error=self.reload_failed)
 
-                    # Must contain at least one question mark
-                    if "?" not in line:
-                        continue
+    def read_joke(self, i):
+        """Joke i, or None if the file changed since the last look: then
+        it is re-indexed straight away rather than at the next look"""
+        joke = self.jokes[i]
+        if joke is None:
+            if self.watching is not None:
+                self.root.after_cancel(self.watching)
+            self.watch_jokes()
+        return joke
 
-                    # Split into setup + punchline
-                    setup, punchline = line.split("?", 1)
-                    setup = setup.strip() + "?"
-                    punchline = punchline.strip()
+    def jokes_changed(self, change):
+        # only the lines that changed were scanned again; the joke on
+        # screen is already read, so it stays as it is
+        self.reloading = False
+        if change is not None:
+            kept = self.jokes.apply(change)
+            self.order.resize(len(self.jokes))
+            self.order_changed()
+            self.update_search(kept)
 
-                    self.jokes.append({"setup": setup, "punchline": punchline})
+    def update_search(self, kept):
+        """Bring the search index up to date after the first kept jokes changed"""
+        if self.search is None:
+            return      # still being built
+        if kept >= self.search.jokes:
+            # only jokes past the saved index changed: index just those
+            self.tasks.submit(self.search.index_tail, kept,
+                              on_done=self.search_tail_ready, on_error=self.search_failed)
+        else:
+            self.build_search()
 
-            if not self.jokes:
-                messagebox.showerror(
-                    "Error",
-                    "No valid jokes found in randomJokes.txt.\n\n"
-                    "Required format:\nSetup?Punchline"
-                )
-                self.root.quit()
-        
-        except FileNotFoundError:
+    def search_tail_ready(self, tail):
+        if self.search is None:
+            return
+        if self.search.add_tail(tail):
+            self.run_search()
+        else:
+            self.build_search()
+
+    def reload_failed(self, error):
+        # keep the jokes as they were and try again on the next look
+        self.reloading = False
+
+    def load_failed(self, error):
+        if isinstance(error, FileNotFoundError):
             messagebox.showerror(
                 "Error",
                 "randomJokes.txt file not found!\n\n"
                 "Make sure the file is in the SAME folder as this Python program."
             )
-            self.root.quit()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading jokes: {str(e)}")
-            self.root.quit()
+        elif not isinstance(error, Cancelled):
+            messagebox.showerror("Error", f"Error loading jokes: {str(error)}")
+        self.root.quit()
 
     def create_widgets(self):
         """Create all GUI widgets"""
@@ -85,6 +190,59 @@ class JokeTellingApp:
             pady=20
         )
         header.pack(fill=tk.X)
+
+        self.search_frame = tk.Frame(self.root, bg=BG_COLOR)
+        self.search_frame.pack(pady=(10, 0), padx=20, fill=tk.X)
+
+        tk.Label(
+            self.search_frame,
+            text="🔍 Search:",
+            font=("Arial", 11),
+            bg=BG_COLOR,
+            fg=TEXT_COLOR
+        ).pack(side=tk.LEFT)
+
+        # debounced so fast typing searches once
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', self.schedule_search)
+        self.search_entry = tk.Entry(
+            self.search_frame,
+            textvariable=self.search_var,
+            font=("Arial", 11),
+            width=25,
+            state=tk.DISABLED
+        )
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+
+        self.category_var = tk.StringVar(value="All")
+        category_menu = tk.OptionMenu(
+            self.search_frame,
+            self.category_var,
+            "All", *[name.title() for name in CATEGORIES],
+            command=lambda _: self.schedule_search()
+        )
+        category_menu.config(font=("Arial", 10), bg=BG_COLOR, highlightthickness=0)
+        category_menu.pack(side=tk.LEFT)
+
+        self.search_count = tk.Label(
+            self.search_frame,
+            text="",
+            font=("Arial", 10, "italic"),
+            bg=BG_COLOR,
+            fg=TEXT_COLOR
+        )
+        self.search_count.pack(side=tk.LEFT, padx=10)
+
+        # shown under the search box while there is something to search for
+        self.results_list = tk.Listbox(
+            self.root,
+            font=("Arial", 10),
+            height=6,
+            selectmode=tk.SINGLE,
+            selectbackground="#9b59b6",
+            activestyle="none"
+        )
+        self.results_list.bind("<<ListboxSelect>>", self.show_result)
         
         self.content_frame = tk.Frame(self.root, bg=BG_COLOR)
         self.content_frame.pack(pady=30, padx=20, fill=tk.BOTH, expand=True)
@@ -195,12 +353,69 @@ class JokeTellingApp:
         )
         quit_button.pack(pady=5)
     
+    def schedule_search(self, *args):
+        if self.search_timer is not None:
+            self.root.after_cancel(self.search_timer)
+        self.search_timer = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        """List the jokes matching the search box and category"""
+        self.search_timer = None
+        if self.search is None:
+            return
+        text = self.search_var.get()
+        category = self.category_var.get()
+        category = None if category == "All" else category.lower()
+        if not text.strip() and category is None:
+            self.shown = []
+            self.results_list.pack_forget()
+            self.search_count.config(text="")
+            return
+        found = self.search.search(text, category)
+        self.shown = found.jokes
+        self.results_list.delete(0, tk.END)
+        jokes = [self.read_joke(i) for i in found.jokes]
+        if None in jokes:
+            return      # the reload searches again once the jokes are re-indexed
+        if jokes:
+            self.results_list.insert(tk.END, *[joke["setup"] for joke in jokes])
+        if found.count is None:
+            self.search_count.config(text=f"{len(found.jokes)}+ jokes")
+        elif found.count == 1:
+            self.search_count.config(text="1 joke")
+        else:
+            self.search_count.config(text=f"{found.count:,} jokes")
+        self.results_list.pack(after=self.search_frame, pady=(5, 0), padx=20, fill=tk.X)
+
+    def show_result(self, event):
+        selection = self.results_list.curselection()
+        if selection:
+            joke = self.read_joke(self.shown[selection[0]])
+            if joke is not None:
+                self.show_joke(joke)
+
     def show_joke_setup(self):
         if not self.jokes:
             messagebox.showwarning("No Jokes", "No jokes available!")
             return
         
-        self.current_joke = random.choice(self.jokes)
+        joke = self.read_joke(self.order.next())
+        self.order_changed()
+        if joke is not None:
+            self.show_joke(joke)
+
+    def order_changed(self):
+        # saved on a timer rather than per click: a crash loses at most the
+        # last few seconds of the order, which only means a few repeats
+        if self.order_timer is None:
+            self.order_timer = self.root.after(ORDER_SAVE_MS, self.save_order)
+
+    def save_order(self):
+        self.order_timer = None
+        self.order.save()
+
+    def show_joke(self, joke):
+        self.current_joke = joke
         
         self.initial_label.pack_forget()
         self.punchline_label.pack_forget()
@@ -223,6 +438,18 @@ class JokeTellingApp:
     
     def quit_app(self):
         if messagebox.askyesno("Quit", "Thanks for laughing with me! 😊\n\nDo you want to quit?"):
+            self.tasks.shutdown()
+            if self.watching is not None:
+                self.root.after_cancel(self.watching)
+            if self.search_timer is not None:
+                self.root.after_cancel(self.search_timer)
+            if self.order_timer is not None:
+                self.root.after_cancel(self.order_timer)
+                self.save_order()
+            if self.search is not None:
+                self.search.close()
+            if self.jokes is not None:
+                self.jokes.close()
             self.root.destroy()
 
 
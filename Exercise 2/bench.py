@@ -0,0 +1,442 @@
+"""
+Benchmarks for the Exercise 2 joke app.
+
+Usage:
+    python bench.py startup [--sizes 10000,1000000,10000000] [--legacy-max 1000000]
+    python bench.py order [--sizes 1000,1000000,10000000] [--picks 200000]
+    python bench.py reload [--size 10000000]
+    python bench.py search [--sizes 100000,1000000,5000000] [--runs 200]
+    python bench.py dedupe [--sizes 100000,1000000,10000000]
+
+Each measurement runs in a fresh subprocess so that its memory is not
+polluted by earlier runs. Memory is split into private pages, which the
+process owns, and pages of memory-mapped files, which are page cache the
+OS can drop and share. Synthetic joke files are written to the temp
+folder and kept there for later runs.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from joke_dedupe import dedupe
+from joke_order import JokeOrder
+from joke_search import load_search, open_search, search_path_for
+from joke_store import index_path_for, open_store, parse_joke
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def sample_jokes():
+    with open(os.path.join(HERE, "randomJokes.txt"), encoding="utf-8") as f:
+        return [joke for joke in map(parse_joke, f) if joke]
+
+
+def make_corpus(path, n, seed=1):
+    """Write n lines of jokes; about 1 in 20 is blank or has no "?" and is skipped"""
+    rnd = random.Random(seed)
+    jokes = sample_jokes()
+    with open(path, "w", encoding="utf-8") as f:
+        batch = []
+        for i in range(n):
+            r = rnd.random()
+            if r < 0.03:
+                batch.append("\n")
+            elif r < 0.05:
+                batch.append(f"Not a joke, line {i}\n")
+            else:
+                joke = rnd.choice(jokes)
+                batch.append(f"{joke['setup']}{joke['punchline']} #{i}\n")
+            if len(batch) >= 65536:
+                f.write("".join(batch))
+                batch = []
+        f.write("".join(batch))
+    return path
+
+
+def corpus_file(n):
+    path = os.path.join(tempfile.gettempdir(), f"randomJokes_{n}.txt")
+    if not os.path.exists(path):
+        make_corpus(path, n)
+    return path
+
+
+COMMON = ("the", "a", "to", "of", "and", "you", "did", "is", "it", "in", "my", "his", "her", "on")
+QUESTIONS = ("Why", "What", "How", "Who", "Where", "When", "What's", "Did")
+
+
+def make_dupe_corpus(path, n, exact=0.1, near=0.1, seed=1):
+    """
+    Write n lines: jokes of random words, and copies of recent ones, a
+    share `exact` with case, spacing and punctuation changed and a share
+    `near` with one word swapped; about 1 in 20 lines is not a joke.
+    Returns the number of copies of each kind.
+    """
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["".join(rnd.choice(letters) for _ in range(rnd.randint(3, 9))) for _ in range(20000)]
+
+    def word():
+        return rnd.choice(COMMON) if rnd.random() < 0.3 else rnd.choice(vocab)
+
+    recent = []
+    copies = {"exact": 0, "near": 0}
+    with open(path, "w", encoding="utf-8") as f:
+        batch = []
+        for i in range(n):
+            r = rnd.random()
+            if r < 0.05:
+                batch.append("\n" if r < 0.03 else f"Not a joke, line {i}\n")
+                continue
+            if recent and r < 0.05 + exact:
+                setup, punchline = rnd.choice(recent)
+                setup = " ".join(w.upper() if rnd.random() < 0.2 else w for w in setup)
+                batch.append(f"  {setup} ?  {punchline.lower().replace(' ', '  ')}!!\n")
+                copies["exact"] += 1
+            elif recent and r < 0.05 + exact + near:
+                setup, punchline = rnd.choice(recent)
+                words = punchline.split()
+                words[rnd.randrange(len(words))] = word()
+                batch.append(f"{' '.join(setup)}?{' '.join(words)}\n")
+                copies["near"] += 1
+            else:
+                setup = [rnd.choice(QUESTIONS)] + [word() for _ in range(rnd.randint(4, 8))]
+                punchline = " ".join(word() for _ in range(rnd.randint(5, 8))).capitalize() + "."
+                if len(recent) < 100_000:
+                    recent.append((setup, punchline))
+                else:
+                    recent[rnd.randrange(len(recent))] = (setup, punchline)
+                batch.append(f"{' '.join(setup)}?{punchline}\n")
+            if len(batch) >= 65536:
+                f.write("".join(batch))
+                batch = []
+        f.write("".join(batch))
+    return copies
+
+
+def dupe_corpus_file(n):
+    """A cached make_dupe_corpus() file and its copy counts"""
+    path = os.path.join(tempfile.gettempdir(), f"randomJokes_dupes_{n}.txt")
+    counts = path + ".json"
+    if not (os.path.exists(path) and os.path.exists(counts)):
+        copies = make_dupe_corpus(path, n)
+        with open(counts, "w") as f:
+            json.dump(copies, f)
+    with open(counts) as f:
+        return path, json.load(f)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def rss_mb():
+    """(private, file-backed) resident MB; mapped file pages are page cache the OS can drop"""
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["RssAnon"].split()[0]) / 1024, int(fields["RssFile"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return peak_rss_mb(), 0.0
+
+
+def run_child(*argv):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "_child", *argv],
+                         check=True, capture_output=True, text=True, cwd=HERE)
+    return json.loads(out.stdout)
+
+
+def legacy_read(path):
+    # the original loader: every valid line parsed into a dict up front
+    jokes = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if "?" not in line:
+                continue
+            setup, punchline = line.split("?", 1)
+            jokes.append({"setup": setup.strip() + "?", "punchline": punchline.strip()})
+    return jokes
+
+
+def child(task, path):
+    if task == "dedupe":
+        base = peak_rss_mb()
+        with tempfile.TemporaryDirectory() as tmp:
+            report = dedupe(path, os.path.join(tmp, "clean.txt"))
+        print(json.dumps({**report._asdict(), "peak_mb": peak_rss_mb() - base}))
+        return
+    if task == "search":
+        # building the search index, on its own for a clean peak memory
+        store = open_store(path)
+        base = peak_rss_mb()
+        t0 = time.perf_counter()
+        open_search(store).close()
+        print(json.dumps({"built_s": time.perf_counter() - t0, "peak_mb": peak_rss_mb() - base}))
+        return
+    base = rss_mb()
+    t0 = time.perf_counter()
+    if task == "legacy":
+        jokes = legacy_read(path)
+    elif task in ("scan", "indexed"):
+        jokes = open_store(path)
+    else:
+        raise SystemExit(f"unknown child task {task}")
+    random.choice(jokes)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(10_000):
+        random.choice(jokes)
+    per_joke = (time.perf_counter() - t0) / 10_000
+    private, mapped = rss_mb()
+    print(json.dumps({"count": len(jokes), "first_s": first, "per_joke_us": 1e6 * per_joke,
+                      "private_mb": private - base[0], "mapped_mb": mapped - base[1]}))
+
+
+def bench_startup(args):
+    print(f"{'lines':>10} {'loader':>8} {'jokes':>10} {'first joke s':>13} {'next joke us':>13} "
+          f"{'private MB':>11} {'mapped MB':>10}")
+    for n in args.sizes:
+        path = corpus_file(n)
+        index = index_path_for(path)
+        if os.path.exists(index):
+            os.remove(index)
+        # scan builds and saves the index; indexed then opens from it
+        tasks = (["legacy"] if n <= args.legacy_max else []) + ["scan", "indexed"]
+        for task in tasks:
+            r = run_child(task, path)
+            print(f"{n:>10} {task:>8} {r['count']:>10,} {r['first_s']:>13.4f} {r['per_joke_us']:>13.2f} "
+                  f"{r['private_mb']:>11.1f} {r['mapped_mb']:>10.1f}")
+
+
+def bench_order(args):
+    print(f"{'jokes':>10} {'chooser':>9} {'setup s':>8} {'pick us':>8} {'memory MB':>10} "
+          f"{'repeats':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            picks = min(n, args.picks)
+            rng = random.Random(1)
+
+            def choice(indices=range(n)):
+                # the old random.choice(self.jokes), over n stand-in jokes
+                return lambda: rng.choice(indices)
+
+            def shuffled():
+                order = list(range(n))
+                rng.shuffle(order)
+                return iter(order).__next__
+
+            def scheduler():
+                return JokeOrder(n, os.path.join(tmp, "jokes.order"), rng=random.Random(1)).next
+
+            for label, make in (("choice", choice), ("shuffle", shuffled), ("order", scheduler)):
+                # built twice: tracemalloc slows down what it watches
+                tracemalloc.start()
+                kept = make()
+                memory = tracemalloc.get_traced_memory()[0] / 2**20
+                tracemalloc.stop()
+                del kept
+                t0 = time.perf_counter()
+                pick = make()
+                setup = time.perf_counter() - t0
+                seen = bytearray(n)
+                repeats = 0
+                t0 = time.perf_counter()
+                for _ in range(picks):
+                    i = pick()
+                    repeats += seen[i]
+                    seen[i] = 1
+                per = (time.perf_counter() - t0) / picks
+                print(f"{n:>10} {label:>9} {setup:>8.3f} {1e6 * per:>8.2f} {memory:>10.2f} "
+                      f"{repeats:>8,}")
+                del pick
+
+            order = JokeOrder(n, os.path.join(tmp, "jokes.order"))
+            t0 = time.perf_counter()
+            for _ in range(1000):
+                order.next()
+                order.save()
+            print(f"{'':>10} {'+ save':>9} {'':>8} {1000 * (time.perf_counter() - t0):>8.2f}")
+
+
+def bench_reload(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "randomJokes.txt")
+        shutil.copyfile(corpus_file(args.size), path)
+        t0 = time.perf_counter()
+        open_store(path).close()
+        full = time.perf_counter() - t0
+        store = open_store(path)
+        print(f"{len(store):,} jokes, {os.path.getsize(path) / 1e6:.0f} MB; "
+              f"full scan and index {full:.2f} s")
+
+        def append(lines):
+            def edit():
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"Why append {i}?Because {i}\n" for i in range(lines)))
+            return edit
+
+        def overwrite(where):
+            # same-length edit of the line at a fraction of the file
+            def edit():
+                with open(path, "r+b") as f:
+                    f.seek(int(os.path.getsize(path) * where))
+                    f.readline()
+                    f.write(b"X")
+            return edit
+
+        def insert(where, lines):
+            # new lines in the middle: everything after them moves
+            def edit():
+                with open(path, "rb") as f:
+                    data = f.read()
+                at = data.index(b"\n", int(len(data) * where)) + 1
+                new = "".join(f"Why insert {i}?Because {i}\n" for i in range(lines)).encode()
+                with open(path, "wb") as f:
+                    f.write(data[:at])
+                    f.write(new)
+                    f.write(data[at:])
+            return edit
+
+        cases = (("append 10 lines", append(10)),
+                 ("append 10,000 lines", append(10_000)),
+                 ("append 1,000,000 lines", append(1_000_000)),
+                 ("edit at 99%", overwrite(0.99)),
+                 ("edit at 50%", overwrite(0.5)),
+                 ("edit at 1%", overwrite(0.01)),
+                 ("insert 10 lines at 50%", insert(0.5, 10)),
+                 ("insert 10,000 at 50%", insert(0.5, 10_000)))
+        print(f"{'change':>24} {'rescanned MB':>13} {'changes s':>10} {'apply s':>8} {'jokes':>11}")
+        for label, edit in cases:
+            old = os.path.getsize(path)
+            edit()
+            t0 = time.perf_counter()
+            change = store.changes()
+            found = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            store.apply(change)
+            applied = time.perf_counter() - t0
+            stop = change.stop + change.source[0] - old
+            rescanned = (stop - change.cut) / 1e6
+            print(f"{label:>24} {rescanned:>13.1f} {found:>10.4f} {applied:>8.4f} {len(store):>11,}")
+        store.close()
+
+
+def bench_search(args):
+    # every synthetic joke ends in its line number, so numbers are a
+    # vocabulary as large as the corpus next to the few words the jokes share
+    queries = (("common word", "chicken ", None),
+               ("two words", "chicken road ", None),
+               ("rare word", "4242 ", None),
+               ("prefix", "chick", None),
+               ("short prefix", "c", None),
+               ("number prefix", "42", None),
+               ("word + prefix", "the ro", None),
+               ("category", "", "how"),
+               ("word + category", "cross ", "why"),
+               ("no match", "zebra ", None))
+    for n in args.sizes:
+        path = corpus_file(n)
+        open_store(path).close()
+        search = search_path_for(path)
+        if os.path.exists(search):
+            os.remove(search)
+        built = run_child("search", path)
+        store = open_store(path)
+        t0 = time.perf_counter()
+        index = load_search(search, store)
+        loaded = time.perf_counter() - t0
+        print(f"{len(store):,} jokes: built in {built['built_s']:.1f} s using {built['peak_mb']:.0f} MB, "
+              f"{os.path.getsize(search) / 1e6:.0f} MB on disk with {index.terms:,} terms, "
+              f"opened in {1000 * loaded:.2f} ms")
+        print(f"{'query':>16} {'matches':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for label, text, category in queries:
+            times = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                found = index.search(text, category)
+                times.append(1000 * (time.perf_counter() - t0))
+            times.sort()
+            count = f"{found.count:,}" if found.count is not None else f"{len(found.jokes)}+"
+            print(f"{label:>16} {count:>10} {times[len(times) // 2]:>8.3f} "
+                  f"{times[int(len(times) * 0.99)]:>8.3f} {times[-1]:>8.3f}")
+        # every keystroke of a query, as the search box sends them
+        typed = "why did the chicken cross"
+        t0 = time.perf_counter()
+        for i in range(1, len(typed) + 1):
+            index.search(typed[:i])
+        print(f"{'typing':>16} {'':>10} {1000 * (time.perf_counter() - t0) / len(typed):>8.3f} "
+              f"per keystroke")
+        index.close()
+        store.close()
+
+
+def bench_dedupe(args):
+    print(f"{'lines':>10} {'seconds':>8} {'hash/near/write s':>18} {'lines/s':>9} {'MB/s':>6} "
+          f"{'peak MB':>8} {'exact':>17} {'near':>17} {'kept':>10}")
+    for n in args.sizes:
+        path, copies = dupe_corpus_file(n)
+        r = run_child("dedupe", path)
+        # found / put in: near copies are found if they are alike enough,
+        # and random jokes that happen to be alike are found too
+        exact = f"{r['exact_duplicates']:,}/{copies['exact']:,}"
+        near = f"{r['near_duplicates']:,}/{copies['near']:,}"
+        stages = "/".join(f"{r['stages'][k]:.1f}" for k in ("hash", "near", "write"))
+        print(f"{n:>10} {r['seconds']:>8.1f} {stages:>18} {n / r['seconds']:>9,.0f} "
+              f"{r['bytes_in'] / 1e6 / r['seconds']:>6.1f} {r['peak_mb']:>8.0f} "
+              f"{exact:>17} {near:>17} {r['kept']:>10,}")
+
+
+def sizes(text):
+    return [int(x) for x in text.split(",")]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_child":
+        child(*sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("startup", help="time to the first joke and memory, parsed vs indexed")
+    p.add_argument("--sizes", type=sizes, default=[10_000, 1_000_000, 10_000_000])
+    p.add_argument("--legacy-max", type=int, default=1_000_000,
+                   help="largest file to also load the old way (it keeps every joke in memory)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("order", help="picking the next joke: random.choice vs a shuffled pass")
+    p.add_argument("--sizes", type=sizes, default=[1_000, 1_000_000, 10_000_000])
+    p.add_argument("--picks", type=int, default=200_000, help="jokes picked per run, at most one pass")
+    p.set_defaults(func=bench_order)
+
+    p = sub.add_parser("reload", help="re-indexing cost after appends and edits of a large joke file")
+    p.add_argument("--size", type=int, default=10_000_000)
+    p.set_defaults(func=bench_reload)
+
+    p = sub.add_parser("search", help="building the search index and query latency")
+    p.add_argument("--sizes", type=sizes, default=[100_000, 1_000_000, 5_000_000])
+    p.add_argument("--runs", type=int, default=200, help="times each query is run")
+    p.set_defaults(func=bench_search)
+
+    p = sub.add_parser("dedupe", help="throughput and memory of the duplicate-dropping pass")
+    p.add_argument("--sizes", type=sizes, default=[100_000, 1_000_000, 10_000_000])
+    p.set_defaults(func=bench_dedupe)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+Clean up a joke file before the app loads it: drop the lines that are not
+jokes, jokes that are already in the file, and jokes that are nearly the
+same as one before them, and write the rest out compacted, one
+"Setup?Punchline" per line with the spacing tidied.
+
+    python joke_dedupe.py randomJokes.txt               # -> randomJokes.clean.txt
+    python joke_dedupe.py randomJokes.txt --in-place    # the app reloads it
+
+The first copy of a joke is the one kept. Two jokes are the same if
+their words match once case, spacing and punctuation are set aside: a
+hash of those words goes into a hash set. They are nearly the same if
+the word pairs (bigrams) of the two are at least THRESHOLD alike
+(Jaccard similarity). That is found with MinHash: HASHES hash functions
+each keep their smallest value over a joke's bigrams, and jokes with
+similar bigrams agree on about that share of them. Grouped into BANDS of
+ROWS, a band that agrees in full makes the jokes candidates, and each
+candidate is then checked against the text of the earlier joke.
+
+Memory does not grow with the text: about 25 bytes per distinct joke,
+for the hash set, where the joke starts and whether it was dropped, and
+8 per candidate pair of one spill file at a time. The band keys, BANDS
+per joke, are spilled to temporary files split by key, and each file is
+then sorted on its own. The file is read from start to end twice, a
+batch of lines at a time: once to hash the jokes and once to write out
+the ones kept. In between, the jokes in candidate pairs are read back
+from where they start. A report of what was dropped, with some
+examples, is written next to the output as JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import zlib
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+THRESHOLD = 0.6     # bigram Jaccard similarity from which jokes are near duplicates
+BANDS = 16
+ROWS = 4
+HASHES = BANDS * ROWS
+PARTITION_BITS = 6  # band keys spill into 64 files
+BATCH = 1 << 20     # bytes of lines handled at a time
+EXAMPLES = 20       # near duplicates quoted in the report
+# ASCII that is not part of a word becomes a space (str.translate is much
+# quicker than a regex); anything else that is not goes by NOT_WORDS
+BLANKS = {c: " " for c in range(128) if not (chr(c).isalnum() or chr(c) in "_?\x00\n")}
+NOT_WORDS = re.compile(r"[^\w?\x00\n ]+")
+MIX = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+PAIR = 0x9E3779B1   # odd 32-bit constant (2**32 / golden ratio) mixing a word pair
+
+Report = namedtuple("Report", [
+    "source", "output", "lines", "jokes", "skipped", "exact_duplicates", "near_duplicates",
+    "kept", "bytes_in", "bytes_out", "seconds", "stages", "examples"])
+
+
+def _hash_functions(seed=1):
+    # multiply-shift hashing: the top 32 bits of (a * x + b) % 2**64, a odd
+    rnd = random.Random(seed)
+    return ([rnd.getrandbits(64) | 1 for _ in range(HASHES)],
+            [rnd.getrandbits(64) for _ in range(HASHES)])
+
+
+A, B = _hash_functions()
+
+
+def normalize(text):
+    """
+    Each line of text as jokes are compared: casefolded words, one space
+    between, and "\\x00" for the "?" after the setup. Returns a list.
+    """
+    text = text.casefold().translate(BLANKS)
+    if not text.isascii():
+        text = NOT_WORDS.sub(" ", text)
+    return [" ".join(line.replace("?", " \x00 ", 1).replace("?", " ").split())
+            for line in text.split("\n")]
+
+
+def clean_line(text):
+    """The joke line as it is written out: "Setup?Punchline", spacing tidied"""
+    setup, _, punchline = text.strip().partition("?")
+    return " ".join(setup.split()) + "?" + " ".join(punchline.split()) + "\n"
+
+
+def _marked(texts):
+    # normalized jokes as bytes, each between "^" and "$" (never words) so
+    # that its first and last words make pairs too, even in short jokes
+    return ("^ " + " $\n^ ".join(texts) + " $").encode()
+
+
+def bigrams(text):
+    """32-bit hashes of the word pairs of a normalized joke"""
+    hashes = list(map(zlib.crc32, _marked([text]).split()))
+    return [(a * PAIR + b) & 0xFFFFFFFF for a, b in zip(hashes, hashes[1:])]
+
+
+def similarity(a, b):
+    """Jaccard similarity of two normalized jokes' bigrams"""
+    a, b = set(bigrams(a)), set(bigrams(b))
+    return len(a & b) / len(a | b)
+
+
+# Seen hashes
+
+class HashSet:
+    """
+    64-bit hashes in an open-addressing table, a numpy array with 0 for
+    an empty slot, probed a whole batch at a time.
+    """
+
+    def __init__(self, bits=16):
+        self.table = np.zeros(1 << bits, np.uint64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        size = 2 * len(self.table)
+        old = self.table[self.table != 0]
+        self.table = None   # let it go before the bigger one is made
+        self.table = np.zeros(size, np.uint64)
+        self.size = 0
+        # a slice at a time, as _insert makes a few arrays the size of its input
+        for start in range(0, len(old), 1 << 16):
+            self._insert(old[start:start + (1 << 16)])
+
+    def _insert(self, hashes):
+        """Put distinct hashes in; a mask of those that were not in yet"""
+        while 10 * (self.size + len(hashes)) > 7 * len(self.table):
+            self._grow()
+        new = np.zeros(len(hashes), bool)
+        mask = np.uint64(len(self.table) - 1)
+        pending = np.arange(len(hashes))
+        slots = hashes & mask
+        while len(pending):
+            keys = hashes[pending]
+            there = self.table[slots]
+            empty = there == 0
+            # where two keys want one empty slot, one of them gets it
+            self.table[slots[empty]] = keys[empty]
+            won = empty & (self.table[slots] == keys)
+            new[pending[won]] = True
+            self.size += int(won.sum())
+            left = ~won & (there != keys)
+            pending, slots = pending[left], (slots[left] + np.uint64(1)) & mask
+        return new
+
+    def add(self, hashes):
+        """Add a batch of hashes; a mask of those not seen before, earlier copies first"""
+        hashes = np.asarray(hashes, np.uint64).copy()
+        hashes[hashes == 0] = 1
+        order = np.argsort(hashes, kind="stable")
+        ranked = hashes[order]
+        first = np.ones(len(hashes), bool)
+        first[1:] = ranked[1:] != ranked[:-1]
+        firsts = order[first]
+        new = np.zeros(len(hashes), bool)
+        new[firsts] = self._insert(hashes[firsts])
+        return new
+
+
+class _PySet:
+    # the same as HashSet, without numpy
+    def __init__(self):
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, hashes):
+        new = []
+        for h in hashes:
+            new.append(h not in self.seen)
+            self.seen.add(h)
+        return new
+
+
+# MinHash
+
+def band_keys(texts):
+    """
+    The BANDS band keys of each normalized joke in texts, as one flat
+    sequence, joke by joke.
+    """
+    if np is None:
+        keys = []
+        for text in texts:
+            pairs = bigrams(text)
+            sig = [min(((a * x + b) & MASK64) >> 32 for x in pairs) for a, b in zip(A, B)]
+            for band in range(BANDS):
+                keys.append(_band_key(band, sig[band * ROWS:(band + 1) * ROWS]))
+        return keys
+    if not texts:
+        return np.zeros(0, np.uint64)
+    # all the word hashes of the batch in a row, then each with the next,
+    # leaving out the pairs where one joke ends and the next starts
+    lengths = np.fromiter((t.count(" ") + 3 if t else 2 for t in texts), np.int64, len(texts))
+    flat = np.fromiter(map(zlib.crc32, _marked(texts).split()), np.uint64, int(lengths.sum()))
+    inside = np.ones(len(flat) - 1, bool)
+    inside[np.cumsum(lengths)[:-1] - 1] = False
+    x = (flat[:-1][inside] * np.uint64(PAIR) + flat[1:][inside]) & np.uint64(0xFFFFFFFF)
+    starts = np.concatenate(([0], np.cumsum(lengths - 1)[:-1]))
+    sig = np.empty((HASHES, len(texts)), np.uint64)
+    h = np.empty_like(x)
+    for k in range(HASHES):
+        np.multiply(x, np.uint64(A[k]), out=h)
+        h += np.uint64(B[k])
+        h >>= np.uint64(32)
+        np.minimum.reduceat(h, starts, out=sig[k])
+    keys = np.empty((len(texts), BANDS), np.uint64)
+    for band in range(BANDS):
+        key = np.full(len(texts), band + 1, np.uint64)
+        for row in sig[band * ROWS:(band + 1) * ROWS]:
+            key = (key * np.uint64(MIX)) ^ row
+        key ^= key >> np.uint64(29)
+        key *= np.uint64(MIX)
+        keys[:, band] = key ^ (key >> np.uint64(32))
+    return keys.ravel()
+
+
+def _band_key(band, rows):
+    key = band + 1
+    for row in rows:
+        key = ((key * MIX) & MASK64) ^ row
+    key ^= key >> 29
+    key = (key * MIX) & MASK64
+    return key ^ (key >> 32)
+
+
+# Spilling band keys
+
+class _Spill:
+    """(band key, joke) records in temporary files, one per range of keys"""
+
+    def __init__(self, folder):
+        self.paths = [os.path.join(folder, f"bands{p:02d}") for p in range(1 << PARTITION_BITS)]
+        self.files = [open(path + ".keys", "wb") for path in self.paths]
+        self.jokes = [open(path + ".jokes", "wb") for path in self.paths]
+        self.records = 0
+
+    def write(self, keys, jokes):
+        self.records += len(keys)
+        if np is None:
+            parts = [(array("Q"), array("I")) for _ in self.paths]
+            for key, joke in zip(keys, jokes):
+                part_keys, part_jokes = parts[key >> (64 - PARTITION_BITS)]
+                part_keys.append(key)
+                part_jokes.append(joke)
+            for (part_keys, part_jokes), f, g in zip(parts, self.files, self.jokes):
+                part_keys.tofile(f)
+                part_jokes.tofile(g)
+            return
+        part = (keys >> np.uint64(64 - PARTITION_BITS)).astype(np.uint8)
+        order = np.argsort(part, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(part, minlength=len(self.paths)))))
+        keys, jokes = keys[order], jokes[order]
+        for p in np.flatnonzero(np.diff(bounds)):
+            keys[bounds[p]:bounds[p + 1]].tofile(self.files[p])
+            jokes[bounds[p]:bounds[p + 1]].tofile(self.jokes[p])
+
+    def candidates(self):
+        """
+        (joke, earlier joke) pairs that share a band key, the earlier one
+        being the first joke with that key; yields one array per file
+        """
+        for f in self.files + self.jokes:
+            f.close()
+        for path in self.paths:
+            if np is None:
+                keys, jokes = array("Q"), array("I")
+                with open(path + ".keys", "rb") as f:
+                    keys.frombytes(f.read())
+                with open(path + ".jokes", "rb") as f:
+                    jokes.frombytes(f.read())
+                first = {}
+                pairs = []
+                for key, joke in zip(keys, jokes):
+                    if first.setdefault(key, joke) != joke:
+                        pairs.append((joke << 32) | first[key])
+                yield pairs
+            else:
+                keys = np.fromfile(path + ".keys", np.uint64)
+                jokes = np.fromfile(path + ".jokes", np.uint32)
+                # jokes were written in order, so a stable sort keeps
+                # each key's first joke first
+                order = np.argsort(keys, kind="stable")
+                keys, jokes = keys[order], jokes[order]
+                head = np.ones(len(keys), bool)
+                head[1:] = keys[1:] != keys[:-1]
+                firsts = jokes[np.flatnonzero(head)][np.cumsum(head) - 1]
+                later = ~head
+                yield (jokes[later].astype(np.uint64) << np.uint64(32)) | firsts[later]
+            os.remove(path + ".keys")
+            os.remove(path + ".jokes")
+
+
+# The pipeline
+
+def _lines(path, task=None):
+    """(offset, line) of each line of path, a batch at a time"""
+    total = os.path.getsize(path)
+    pos = 0
+    with open(path, "rb") as f:
+        while True:
+            batch = f.readlines(BATCH)
+            if not batch:
+                return
+            offsets = []
+            for line in batch:
+                offsets.append(pos)
+                pos += len(line)
+            yield offsets, batch
+            if task is not None:
+                task.progress(pos, total)
+
+
+def dedupe(source, output, report_path=None, threshold=THRESHOLD, task=None, folder=None):
+    """Write the distinct jokes of source to output; returns a Report"""
+    t0 = time.perf_counter()
+    seen = HashSet() if np is not None else _PySet()
+    lines = jokes = 0
+    with tempfile.TemporaryDirectory(dir=folder) as tmp:
+        spill = _Spill(tmp)
+        offsets = array("Q")    # where each distinct joke starts in source
+        for batch_offsets, batch in _lines(source, task):
+            lines += len(batch)
+            starts = [o for o, line in zip(batch_offsets, batch) if b"?" in line]
+            if not starts:
+                continue
+            text = b"\n".join(line.rstrip(b"\n") for line in batch if b"?" in line)
+            texts = normalize(text.decode("utf-8", errors="replace"))
+            jokes += len(texts)
+            new = seen.add([hash(t) & MASK64 for t in texts])
+            first = len(offsets)
+            offsets.extend(o for o, n in zip(starts, new) if n)
+            texts = [t for t, n in zip(texts, new) if n]
+            if np is not None:
+                numbers = np.repeat(np.arange(first, len(offsets), dtype=np.uint32), BANDS)
+            else:
+                numbers = [n for n in range(first, len(offsets)) for _ in range(BANDS)]
+            spill.write(band_keys(texts), numbers)
+        distinct = len(offsets)
+        del seen
+        stages = {"hash": time.perf_counter() - t0}
+
+        dropped = bytearray(distinct)
+        examples = []
+        near = 0
+        with open(source, "rb") as f:
+            def joke(i):
+                f.seek(offsets[i])
+                return f.readline().rstrip(b"\n").decode("utf-8", errors="replace")
+
+            # a joke is dropped if it is like any earlier one, so the pairs
+            # can be checked a file at a time, in any order
+            for pairs in spill.candidates():
+                if np is not None:
+                    pairs.sort()
+                    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))] if len(pairs) else pairs
+                else:
+                    pairs = sorted(set(pairs))
+                for pair in pairs:
+                    later, earlier = int(pair) >> 32, int(pair) & 0xFFFFFFFF
+                    if dropped[later]:
+                        continue
+                    a, b = joke(later), joke(earlier)
+                    if similarity(*normalize(a + "\n" + b)) >= threshold:
+                        dropped[later] = 1
+                        near += 1
+                        if len(examples) < EXAMPLES:
+                            examples.append({"dropped": a.strip(), "like": b.strip()})
+        stages["near"] = time.perf_counter() - t0 - stages["hash"]
+
+        # the distinct jokes are in the order of their offsets, so one more
+        # pass over the lines picks out the ones kept
+        tmp_out = output + ".tmp"
+        i = 0
+        with open(tmp_out, "w", encoding="utf-8", newline="\n") as out:
+            for batch_offsets, batch in _lines(source):
+                kept = []
+                for offset, line in zip(batch_offsets, batch):
+                    if i < distinct and offsets[i] == offset:
+                        if not dropped[i]:
+                            kept.append(clean_line(line.decode("utf-8", errors="replace")))
+                        i += 1
+                out.write("".join(kept))
+    os.replace(tmp_out, output)
+    seconds = time.perf_counter() - t0
+    stages["write"] = seconds - stages["hash"] - stages["near"]
+
+    report = Report(source, output, lines, jokes, lines - jokes, jokes - distinct, near,
+                    distinct - near, os.path.getsize(source), os.path.getsize(output),
+                    round(seconds, 3), {k: round(v, 3) for k, v in stages.items()}, examples)
+    if report_path is not None:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report._asdict(), f, indent=2)
+    return report
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", default=os.path.join(here, "randomJokes.txt"))
+    parser.add_argument("-o", "--output", help="where to write the clean jokes (default: SOURCE.clean.txt)")
+    parser.add_argument("--in-place", action="store_true", help="replace the source with the clean jokes")
+    parser.add_argument("--report", help="where to write the JSON report (default: SOURCE.dedupe.json)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="bigram similarity from which jokes count as near duplicates")
+    parser.add_argument("--temp", help="folder for the spilled band keys (default: the system temp folder)")
+    args = parser.parse_args()
+
+    base = os.path.splitext(args.source)[0]
+    output = args.source if args.in_place else args.output or base + ".clean.txt"
+    report = dedupe(args.source, output, args.report or base + ".dedupe.json",
+                    args.threshold, folder=args.temp)
+    print(f"{report.lines:,} lines, {report.jokes:,} jokes: {report.exact_duplicates:,} duplicates "
+          f"and {report.near_duplicates:,} near duplicates dropped, {report.kept:,} kept "
+          f"in {report.output} ({report.seconds:.1f} s)")
+    for example in report.examples[:5]:
+        print(f"  dropped {example['dropped']!r}\n     like {example['like']!r}")
+
+
+if __name__ == "__main__":
+    main()
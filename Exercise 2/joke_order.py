@@ -0,0 +1,124 @@
+"""
+Hand out every joke once, in a shuffled order, before any joke repeats.
+
+Shuffling a list of indices would cost memory in proportion to the
+corpus. JokeOrder instead computes the k-th joke of a pass from k
+itself, through a keyed permutation of 0..count-1: a small Feistel
+network over the next even number of bits, walking the cycle until it
+lands back inside the range. Its whole state is the count, a seed and a
+position, so memory is constant and the state fits in a few bytes of
+JSON, saved next to the jokes (randomJokes.order) so the order carries
+on after a restart.
+
+    order = JokeOrder(len(store), "randomJokes.order")
+    store[order.next()]
+    order.save()
+
+When a pass runs out, the next one starts with a fresh seed. If the
+corpus changes size mid-pass (resize()), the pass carries on: jokes that
+are gone are skipped and new ones join the next pass.
+"""
+
+import json
+import os
+import random
+
+ROUNDS = 4
+MIX = 0x9E3779B97F4A7C15    # odd 64-bit constant (2**64 / golden ratio)
+MASK64 = (1 << 64) - 1
+
+
+class JokeOrder:
+    def __init__(self, count, state_path=None, seed=None, rng=None):
+        self.count = count      # jokes in the current pass
+        self.jokes = count      # jokes there are now
+        self.state_path = state_path
+        self.rng = rng or random.Random()
+        self.position = 0
+        self.passes = 0
+        state = self._load() if seed is None else None
+        # a saved order is only good for the corpus size it was made for
+        if state is not None and state.get("jokes", state.get("count")) == count:
+            self.count = state["count"]
+            self.position = state["position"]
+            self.passes = state.get("passes", 0)
+            seed = state["seed"]
+        self._reseed(self.rng.getrandbits(63) if seed is None else seed)
+
+    def _reseed(self, seed):
+        self.seed = seed
+        keys = random.Random(seed)
+        self.keys = [keys.getrandbits(64) for _ in range(ROUNDS)]
+        bits = max(1, (self.count - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.half_mask = (1 << self.half) - 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        """The joke index at position k of the current pass"""
+        if not 0 <= k < self.count:
+            raise IndexError("position out of range")
+        half, mask = self.half, self.half_mask
+        x = k
+        while True:
+            left, right = x >> half, x & mask
+            for key in self.keys:
+                f = ((right ^ key) * MIX) & MASK64
+                left, right = right, left ^ ((f ^ (f >> 29)) & mask)
+            x = (left << half) | right
+            # at most 4x the count, so on average under 4 steps
+            if x < self.count:
+                return x
+
+    def next(self):
+        """The next joke index; a new shuffled pass begins once all have been seen"""
+        if not self.jokes:
+            raise IndexError("no jokes to choose from")
+        while True:
+            if self.position >= self.count:
+                self.count = self.jokes
+                self.position = 0
+                self.passes += 1
+                self._reseed(self.rng.getrandbits(63))
+            i = self[self.position]
+            self.position += 1
+            if i < self.jokes:
+                return i
+
+    def resize(self, jokes):
+        """The corpus now holds this many jokes"""
+        self.jokes = jokes
+        if not self.position:
+            self.count = jokes
+            self._reseed(self.seed)
+
+    @property
+    def remaining(self):
+        """Positions left in the current pass (some may be jokes that are gone)"""
+        return self.count - self.position
+
+    def _load(self):
+        if self.state_path is None:
+            return None
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            int(state["seed"]), int(state["position"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return state
+
+    def save(self):
+        """Write the seed and position, atomically, if there is a state file"""
+        if self.state_path is None:
+            return
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"count": self.count, "jokes": self.jokes, "seed": self.seed,
+                           "position": self.position, "passes": self.passes}, f)
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass    # a read-only folder: the order starts afresh next run
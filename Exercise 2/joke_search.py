@@ -0,0 +1,452 @@
+"""
+Keyword, prefix and category search over a JokeStore.
+
+An inverted index maps each word to the sorted numbers of the jokes it
+appears in, setup or punchline. Words are runs of ASCII letters and
+digits, lowercased. A joke's category is the question word its setup
+starts with (why, what, how, ...; "other" for the rest), indexed as the
+term "#why" and so on. The index is saved next to the jokes, in
+randomJokes.search (little-endian), and memory-mapped when it is loaded:
+
+    header        magic, version, term count, posting count, term heap
+                  size, joke count, and the size / mtime_ns of the text
+                  file it was built from
+    term starts   (term count + 1) x uint64, into the term heap
+    term heap     the terms, sorted, back to back
+    post starts   (term count + 1) x uint64, into the postings
+    postings      posting count x uint32 joke numbers
+
+Every section starts on an 8-byte boundary. A query's words must all
+match; the last one is a prefix unless the query ends in a space, so the
+results follow the typing:
+
+    index = open_search(store)
+    index.search("chicken cro")           # Matches(jokes=[0, ...], count=12)
+    index.search("", category="why")
+
+Jokes appended while the app runs (joke_store hot reload) are indexed in
+memory by index_tail() and merged in by add_tail(); any other change
+needs a rebuild.
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"JKSR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQQQQQ")
+ALIGN = 8
+WORD = re.compile(rb"[a-z0-9]+")
+# for building: bytes.translate() lowercases the words and blanks out the
+# rest but newlines, so that split() gives what WORD finds
+FOLD = bytes(c + 32 if 65 <= c <= 90 else c if 48 <= c <= 57 or 97 <= c <= 122 or c == 10 else 32
+             for c in range(256))
+BATCH = 1 << 16      # jokes tokenized at a time when building with numpy
+CATEGORIES = ("why", "what", "how", "who", "where", "when", "other")
+LIMIT = 50           # jokes returned per search
+EXACT_MAX = 1 << 16  # matches of the rarest word counted in full; past that only the first are found
+UNION_MAX = 1 << 18  # postings a prefix may expand to before jokes are read instead
+
+# the first `limit` matching joke numbers, and how many match in all
+# (None when finding out would take too long: at least len(jokes))
+Matches = namedtuple("Matches", ["jokes", "count"])
+
+
+class SearchIndexError(ValueError):
+    """A search index that is truncated, corrupt, of another version or stale."""
+
+
+def words(text):
+    """The index terms of a str or bytes: lowercase ASCII words"""
+    if isinstance(text, str):
+        text = text.encode("utf-8", errors="replace")
+    return WORD.findall(text.lower())
+
+
+def category_of(terms):
+    """The category term of a joke from its words, setup first"""
+    first = terms[0].decode() if terms else ""
+    return b"#" + (first if first in CATEGORIES else "other").encode()
+
+
+def search_path_for(path):
+    return os.path.splitext(path)[0] + ".search"
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def _layout(terms, postings, heap):
+    """(name, byte offset, byte length) of every section after the header"""
+    sizes = [("term_starts", 8 * (terms + 1)), ("heap", heap),
+             ("post_starts", 8 * (terms + 1)), ("postings", 4 * postings)]
+    offset = HEADER.size + _pad(HEADER.size)
+    out = []
+    for name, size in sizes:
+        out.append((name, offset, size))
+        offset += size + _pad(size)
+    return out, offset
+
+
+def _little(values):
+    if np is not None and isinstance(values, np.ndarray):
+        return memoryview(values.astype(values.dtype.newbyteorder("<"), copy=False).view(np.uint8))
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast("B")
+
+
+# Building
+
+def _index_lines(lines, task=None, total=0):
+    """
+    The terms of each joke line: (vocabulary dict of term -> id, term ids
+    of every joke one after the other, terms per joke).
+    """
+    vocab = {}
+    ids = array("I")
+    counts = array("I")
+    for n, line in enumerate(lines, start=1):
+        terms = WORD.findall(line.lower())
+        joke = {vocab.setdefault(t, len(vocab)) for t in terms}
+        joke.add(vocab.setdefault(category_of(terms), len(vocab)))
+        ids.extend(joke)
+        counts.append(len(joke))
+        if task is not None and not n % 65536:
+            task.progress(n, total)
+    return vocab, ids, counts
+
+
+def _postings(vocab, ids, counts):
+    """Sorted terms and, for each, the sorted joke numbers it appears in"""
+    terms = sorted(vocab)
+    lists = [array("I") for _ in terms]
+    order = {vocab[t]: lists[i] for i, t in enumerate(terms)}
+    pos = 0
+    for joke, count in enumerate(counts):
+        for term in ids[pos:pos + count]:
+            order[term].append(joke)
+        pos += count
+    starts = array("Q", [0])
+    postings = array("I")
+    for docs in lists:
+        postings.extend(docs)
+        starts.append(len(postings))
+    return terms, starts, postings
+
+
+def _build_numpy(store, task=None):
+    # a batch of jokes at a time, joined by newlines and split into words
+    # in one go: the "|" put in for the newlines count off the jokes. Each
+    # (term, joke) pair is then packed into a uint64, term above joke, so
+    # that one sort groups the pairs by term, in joke order, and puts a
+    # joke's repeated words side by side
+    vocab = {b"|": 0}
+    for name in CATEGORIES:
+        vocab[b"#" + name.encode()] = len(vocab)
+    other = vocab[b"#other"]
+    batches = []
+    for first in range(0, len(store), BATCH):
+        last = min(first + BATCH, len(store))
+        text = b"\n".join(map(store.line, range(first, last))).translate(FOLD)
+        tokens = text.replace(b"\n", b" | ").split()
+        for term in set(tokens).difference(vocab):
+            vocab[term] = len(vocab)
+        ids = np.fromiter(map(vocab.__getitem__, tokens), np.uint32, len(tokens))
+        newline = ids == 0
+        jokes = np.cumsum(newline, dtype=np.uint32)
+        jokes += first
+        # the category of each joke, from the first word of its line
+        category = np.full(len(vocab), other, np.uint32)
+        for name in CATEGORIES[:-1]:
+            if name.encode() in vocab:
+                category[vocab[name.encode()]] = vocab[b"#" + name.encode()]
+        lead = np.append(ids, 0)[np.concatenate(([0], np.flatnonzero(newline) + 1))]
+        batches.append((np.concatenate((ids[~newline], category[lead])),
+                        np.concatenate((jokes[~newline], np.arange(first, last, dtype=np.uint32)))))
+        if task is not None:
+            task.progress(last, len(store))
+    del vocab[b"|"]
+    terms = sorted(vocab)
+    rank = np.zeros(len(vocab) + 1, np.uint64)
+    rank[np.fromiter(map(vocab.__getitem__, terms), np.int64, len(terms))] = np.arange(len(terms))
+    del vocab
+    keys = np.empty(sum(len(ids) for ids, _ in batches), np.uint64)
+    pos = 0
+    while batches:
+        ids, jokes = batches.pop(0)
+        part = keys[pos:pos + len(ids)]
+        np.left_shift(rank[ids], 32, out=part)
+        part |= jokes
+        pos += len(ids)
+    keys.sort()
+    if len(keys):
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    starts = np.searchsorted(keys, np.arange(len(terms) + 1, dtype=np.uint64) << np.uint64(32))
+    return terms, starts.astype(np.uint64), keys.astype(np.uint32)
+
+
+def build_search(store, path, task=None):
+    """Index every joke of store and save the index to path; returns a SearchIndex"""
+    if np is not None:
+        terms, starts, postings = _build_numpy(store, task)
+    else:
+        lines = (store.line(i) for i in range(len(store)))
+        vocab, ids, counts = _index_lines(lines, task, len(store))
+        terms, starts, postings = _postings(vocab, ids, counts)
+    write_search(path, terms, starts, postings, len(store), store.source)
+    return load_search(path, store)
+
+
+def write_search(path, terms, starts, postings, jokes, source):
+    heap = b"".join(terms)
+    term_starts = array("Q", [0])
+    for t in terms:
+        term_starts.append(term_starts[-1] + len(t))
+    sections, end = _layout(len(terms), len(postings), len(heap))
+    parts = {"term_starts": _little(term_starts), "heap": heap,
+             "post_starts": _little(starts), "postings": _little(postings)}
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(terms), len(postings), len(heap), jokes, *source))
+        for name, offset, size in sections:
+            f.write(bytes(offset - f.tell()))
+            f.write(parts[name])
+        f.write(bytes(end - f.tell()))
+    os.replace(tmp, path)
+
+
+def load_search(path, store):
+    """Open a saved index for store; raises SearchIndexError if it does not match it"""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise SearchIndexError("truncated header")
+        magic, version, _, terms, postings, heap, jokes, size, mtime = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise SearchIndexError("not a joke search index")
+        if version != VERSION:
+            raise SearchIndexError(f"unsupported search index version {version}")
+        if (size, mtime) != tuple(store.source) or jokes != len(store):
+            raise SearchIndexError("search index is older than the jokes")
+        sections, end = _layout(terms, postings, heap)
+        if os.fstat(f.fileno()).st_size < end:
+            raise SearchIndexError("truncated search index")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    parts = {}
+    for name, offset, length in sections:
+        part = view[offset:offset + length]
+        if name == "heap":
+            parts[name] = part
+        elif sys.byteorder != "little":
+            col = array("I" if name == "postings" else "Q")
+            col.frombytes(part)
+            col.byteswap()
+            parts[name] = col
+        else:
+            parts[name] = part.cast("I" if name == "postings" else "Q")
+    return SearchIndex(store, parts, jokes, mm, view)
+
+
+def open_search(store, path=None, task=None):
+    """The saved search index of store if it is current, or a freshly built and saved one"""
+    path = path or search_path_for(store.path)
+    try:
+        return load_search(path, store)
+    except (OSError, SearchIndexError):
+        return build_search(store, path, task)
+
+
+# Set operations on sorted joke numbers
+
+def _intersect(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    if np is not None:
+        a, b = np.asarray(a, np.uint32), np.asarray(b, np.uint32)
+        if not len(a) or not len(b):
+            return a[:0]
+        at = np.minimum(np.searchsorted(b, a), len(b) - 1)
+        return a[b[at] == a]
+    out = []
+    lo = 0
+    for x in a:
+        lo = bisect_left(b, x, lo)
+        if lo == len(b):
+            break
+        if b[lo] == x:
+            out.append(x)
+    return out
+
+
+def _between(docs, first, last):
+    """The part of sorted docs from first to last"""
+    return docs[bisect_left(docs, first):bisect_right(docs, last)]
+
+
+def _union(parts):
+    """Sorted joke numbers in any of parts"""
+    if np is None:
+        return sorted(set().union(*parts))
+    out = np.sort(np.concatenate([np.asarray(p, np.uint32) for p in parts])) if parts \
+        else np.zeros(0, np.uint32)
+    return out[np.concatenate(([True], out[1:] != out[:-1]))] if len(out) else out
+
+
+class SearchIndex:
+    def __init__(self, store, parts, jokes, mapping=None, view=None):
+        self.store = store
+        self.term_starts = parts["term_starts"]
+        self.heap = parts["heap"]
+        self.post_starts = parts["post_starts"]
+        self.postings = parts["postings"]
+        self.terms = len(self.term_starts) - 1
+        self.jokes = jokes          # jokes covered by the saved index
+        self.tail = {}              # term -> joke numbers of jokes appended since
+        self.tail_jokes = jokes     # jokes covered including the tail
+        self.mapping = mapping
+        self._view = view
+
+    def close(self):
+        for part in (self.term_starts, self.heap, self.post_starts, self.postings, self._view):
+            if isinstance(part, memoryview):
+                part.release()
+        if self.mapping is not None:
+            self.mapping.close()
+
+    def term(self, i):
+        return bytes(self.heap[self.term_starts[i]:self.term_starts[i + 1]])
+
+    def _find(self, word):
+        """Index of the first term >= word"""
+        lo, hi = 0, self.terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _docs(self, i):
+        return self.postings[self.post_starts[i]:self.post_starts[i + 1]]
+
+    def docs(self, word):
+        """Sorted numbers of the jokes containing word"""
+        i = self._find(word)
+        base = self._docs(i) if i < self.terms and self.term(i) == word else self.postings[:0]
+        extra = self.tail.get(word)
+        if not extra:
+            return base
+        # appended jokes all come after the saved ones, so this stays sorted
+        return list(base) + list(extra) if np is None else np.concatenate(
+            (np.asarray(base, np.uint32), np.asarray(extra, np.uint32)))
+
+    def prefix_docs(self, prefix):
+        """
+        The joke numbers of the terms starting with prefix, in parts to be
+        merged by _union(): the terms are sorted, so in the saved index
+        their postings are all one slice.
+        """
+        lo, hi = self._find(prefix), self._find(prefix + b"\xff")
+        parts = [self.postings[self.post_starts[lo]:self.post_starts[hi]]] if lo < hi else []
+        parts += [docs for t, docs in self.tail.items() if t.startswith(prefix)]
+        return parts
+
+    def search(self, text, category=None, limit=LIMIT):
+        """Matches for every word of text, the last as a prefix, within category if given"""
+        terms = words(text)
+        # the last word is a prefix only while it is being typed: the query
+        # ends inside it, i.e. its last character is part of a term ("é" is not)
+        prefix = terms.pop() if terms and words(text[-1:]) else None
+        sets = [self.docs(t) for t in terms]
+        if category:
+            sets.append(self.docs(b"#" + category.encode()))
+        if prefix is not None:
+            parts = self.prefix_docs(prefix)
+            if sum(len(p) for p in parts) <= UNION_MAX:
+                sets.append(_union(parts))
+                prefix = None
+        if not sets:
+            if prefix is None:
+                return Matches([], 0)
+            # a prefix this common matches a good share of all the jokes
+            sets.append(range(len(self.store)))
+        sets.sort(key=len)
+        if len(sets) == 1 and prefix is None:
+            return Matches([int(j) for j in sets[0][:limit]], len(sets[0]))
+        return self._match(sets, prefix, limit)
+
+    def _match(self, sets, prefix, limit):
+        # through the smallest set a window at a time, against the part of
+        # each other set between the window's first and last joke: once
+        # there are enough matches the rest is left, and so is the count.
+        # A prefix too common to merge is checked in the jokes' text
+        lead = sets[0]
+        size = len(lead) if len(lead) <= EXACT_MAX and prefix is None else 4 * limit
+        found = []
+        total = done = 0
+        while done < len(lead) and total < limit:
+            head = lead[done:done + size]
+            done += len(head)
+            hits = head
+            for other in sets[1:]:
+                hits = _intersect(hits, _between(other, head[0], head[-1]))
+                if not len(hits):
+                    break
+            if prefix is not None:
+                hits = [j for j in hits if self._has_prefix(int(j), prefix)]
+            found.append(hits)
+            total += len(hits)
+            size *= 4
+        jokes = [int(j) for hits in found for j in hits[:limit]][:limit]
+        return Matches(jokes, total if done >= len(lead) else None)
+
+    def _has_prefix(self, joke, prefix):
+        return any(w.startswith(prefix) for w in words(self.store.line(joke)))
+
+    # Jokes appended by a hot reload
+
+    def index_tail(self, task, first):
+        """
+        Term -> joke numbers for the store's jokes from first on. Only reads,
+        so it can run on a worker; add_tail() then merges the result.
+        """
+        store = self.store
+        lines = (store.line(i) for i in range(first, len(store)))
+        vocab, ids, counts = _index_lines(lines, task, len(store) - first)
+        tail = {}
+        pos = 0
+        terms = {i: t for t, i in vocab.items()}
+        for joke, count in enumerate(counts, start=first):
+            for term in ids[pos:pos + count]:
+                tail.setdefault(terms[term], array("I")).append(joke)
+            pos += count
+        return first, len(store), tail
+
+    def add_tail(self, result):
+        """Merge an index_tail() result; False if it no longer lines up with the index"""
+        first, end, tail = result
+        if first < self.jokes or first > self.tail_jokes:
+            return False
+        for docs in self.tail.values():
+            while len(docs) and docs[-1] >= first:
+                docs.pop()
+        for term, docs in tail.items():
+            self.tail.setdefault(term, array("I")).extend(docs)
+        self.tail_jokes = end
+        return True
@@ -0,0 +1,461 @@
+"""
+Random access to the jokes in randomJokes.txt without loading them all.
+
+A joke file can hold millions of lines, so instead of parsing every one
+into a dict, JokeStore keeps the byte offset of each valid "Setup?Punchline"
+line and reads a joke only when it is asked for, with one positioned read
+of the text file. The file is not memory-mapped: it can be rewritten at
+any moment, and touching a mapped page past its new end kills the
+process, where a read just comes back short. The offsets are saved next
+to the file, in
+randomJokes.idx (little-endian):
+
+    header    magic, version, log2 of the block size, joke count, the
+              size / mtime_ns of the text file they were taken from, and
+              the block count
+    offsets   joke count x uint64, where each joke's line starts
+    crcs      block count x uint32, crc32 of each 64 KiB block of the text
+
+Once the index exists and matches the text file, opening the store is a
+header read and a memory map whatever the file size.
+
+    store = open_store("randomJokes.txt")
+    len(store), store[0]        # 37, {"setup": "Why did ...?", "punchline": ...}
+    random.choice(store)
+
+A joke read after the file changed and before changes() / apply() have
+caught up can come back as None: the offset no longer starts a joke.
+
+When the text file changes, changes() works out what to re-index. The
+block checksums, compared from the start, find the first byte that
+differs; compared from the end, shifted by the change in size, they find
+where the text is as it was again. Only the lines in between are scanned
+again, and the jokes after them keep their offsets, moved along by the
+change in size. An append is recognised by checking just the block the
+old file ended in, so its cost follows the size of the append; any other
+edit costs a crc32 pass over the file (far cheaper than a scan) plus a
+scan of the lines that changed. apply() then swaps the new offsets in
+and updates the index file in place.
+
+    change = store.changes()    # on a worker thread
+    store.apply(change)         # on the thread that reads jokes
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"JKIX"
+VERSION = 2
+HEADER = struct.Struct("<4sHHQQQQ")
+BLOCK_BITS = 16
+BLOCK = 1 << BLOCK_BITS     # bytes per checksummed block of the text file
+CHUNK = 1 << 23             # bytes scanned at a time with numpy
+LINE_READ = 512             # bytes read at a time for one joke
+
+# what changed in the text file: the jokes from byte `cut` up to old
+# byte `stop` are to be replaced by `offsets`, and the checksums of
+# blocks block:crc_stop (None: to the end) by `crcs`
+Change = namedtuple("Change", ["source", "cut", "stop", "offsets", "block", "crc_stop", "crcs"])
+
+
+class JokeIndexError(ValueError):
+    """An index file that is truncated, corrupt or of another version."""
+
+
+def parse_joke(line):
+    """A "Setup?Punchline" line as a joke dict, or None if it is not one"""
+    line = line.strip()
+    # Must contain at least one question mark
+    if "?" not in line:
+        return None
+    setup, punchline = line.split("?", 1)
+    return {"setup": setup.strip() + "?", "punchline": punchline.strip()}
+
+
+def index_path_for(path):
+    return os.path.splitext(path)[0] + ".idx"
+
+
+def source_stamp(path):
+    """(size, mtime_ns) of the joke file, used to tell if an index is stale"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def scan_offsets(path, task=None, start=0, end=None):
+    """
+    Offsets of the lines of path that hold a joke, for the lines that
+    start from byte start (a line start) up to byte end; task gets
+    progress reports.
+    """
+    if end is None:
+        end = os.path.getsize(path)
+    if np is not None:
+        return _scan_numpy(path, task, start, end)
+    offsets = array("Q")
+    pos = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for n, line in enumerate(f, start=1):
+            if pos >= end:
+                break
+            # a line with a "?" in it is never blank, so this is the whole test
+            if b"?" in line:
+                offsets.append(pos)
+            pos += len(line)
+            if task is not None and not n % 65536:
+                task.progress(pos - start, end - start)
+    return offsets
+
+
+def _scan_numpy(path, task, start, end):
+    # whole lines at a time: the line of each "?" is the number of
+    # newlines before it, and a joke line starts after the newline ending
+    # the line before
+    offsets = array("Q")
+    base = start
+    tail = b""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while True:
+            block = f.read(min(CHUNK, end - base - len(tail)))
+            data = tail + block
+            if block:
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            buf = np.frombuffer(data, np.uint8)
+            ends = np.flatnonzero(buf == 10)
+            lines = np.searchsorted(ends, np.flatnonzero(buf == 63))
+            if len(lines):
+                lines = lines[np.concatenate(([True], lines[1:] != lines[:-1]))]
+                starts = np.concatenate(([0], ends + 1))[lines] + base
+                offsets.frombytes(starts.astype(np.uint64).tobytes())
+            base += len(data)
+            if task is not None:
+                task.progress(base - start, end - start)
+            if not block:
+                return offsets
+
+
+def block_crcs(f, first, end):
+    """crc32 of each BLOCK of the open file f from block number first up to byte end"""
+    crcs = array("I")
+    f.seek(first * BLOCK)
+    for pos in range(first * BLOCK, end, BLOCK):
+        crcs.append(zlib.crc32(f.read(min(BLOCK, end - pos))))
+    return crcs
+
+
+def _little(values):
+    # index sections are little-endian whatever the machine
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast("B")
+
+
+def write_index(path, offsets, crcs, source):
+    """Write offsets and block checksums to path atomically; source is the joke file's stamp"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BLOCK_BITS, len(offsets), *source, len(crcs)))
+        f.write(_little(offsets))
+        f.write(_little(crcs))
+    os.replace(tmp, path)
+
+
+def update_index(path, offsets, first, crcs, source, last=None):
+    """
+    Rewrite an index in place: only offsets[first:last] (to the end if
+    last is None; the count must not have changed otherwise), the
+    checksums and the header are written.
+    """
+    with open(path, "r+b") as f:
+        # a zero stamp never matches, so a crash halfway leaves a stale index
+        f.write(HEADER.pack(MAGIC, VERSION, BLOCK_BITS, 0, 0, 0, 0))
+        f.seek(HEADER.size + 8 * first)
+        f.write(_little(offsets[first:last]))
+        f.seek(HEADER.size + 8 * len(offsets))
+        f.truncate()
+        f.write(_little(crcs))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, BLOCK_BITS, len(offsets), *source, len(crcs)))
+
+
+def read_index(path, source=None):
+    """
+    The offsets saved in path as a read-only uint64 view of a memory map,
+    the block checksums, and the map (or None if nothing is mapped).
+    Raises JokeIndexError if the file is damaged, or stale for the given
+    source stamp.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise JokeIndexError("truncated header")
+        magic, version, bits, count, size, mtime, blocks = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise JokeIndexError("not a joke index")
+        if version != VERSION or bits != BLOCK_BITS:
+            raise JokeIndexError(f"unsupported index version {version}")
+        if source is not None and (size, mtime) != tuple(source):
+            raise JokeIndexError("index is older than the joke file")
+        if os.fstat(f.fileno()).st_size < HEADER.size + 8 * count + 4 * blocks:
+            raise JokeIndexError("truncated index")
+        f.seek(HEADER.size + 8 * count)
+        crcs = array("I")
+        crcs.frombytes(f.read(4 * blocks))
+        if sys.byteorder != "little":
+            crcs.byteswap()
+        if not count:
+            return array("Q"), crcs, None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _random_access(mm)
+    view = memoryview(mm)[HEADER.size:HEADER.size + 8 * count]
+    if sys.byteorder != "little":
+        offsets = array("Q", view.tobytes())
+        offsets.byteswap()
+        view.release()
+        mm.close()
+        return offsets, crcs, None
+    return view.cast("Q"), crcs, mm
+
+
+def _random_access(mm):
+    # jokes are read one at a time from anywhere in the file, so reading
+    # ahead of each page fault only fills memory with jokes nobody asked for
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+        mm.madvise(mmap.MADV_RANDOM)
+
+
+def _line_end(f, pos):
+    """Where the line holding byte pos of the open file f ends, past its newline"""
+    f.seek(pos)
+    while True:
+        data = f.read(4096)
+        newline = data.find(b"\n")
+        if newline >= 0:
+            return pos + newline + 1
+        if not data:
+            return pos
+        pos += len(data)
+
+
+def _shift(offsets, start, delta):
+    """Move offsets[start:] of a uint64 array along by delta, in place"""
+    if np is not None:
+        values = np.frombuffer(offsets, np.uint64)[start:]
+        if delta > 0:
+            values += np.uint64(delta)
+        else:
+            values -= np.uint64(-delta)
+        del values      # the array cannot be resized while numpy holds it
+    else:
+        for i in range(start, len(offsets)):
+            offsets[i] += delta
+
+
+def _line_start(f, pos):
+    """Where the line holding byte pos of the open file f begins"""
+    while pos > 0:
+        start = max(0, pos - 4096)
+        f.seek(start)
+        newline = f.read(pos - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        pos = start
+    return 0
+
+
+class JokeStore:
+    def __init__(self, path, offsets, crcs, source, index_path=None, index_map=None):
+        self.path = path
+        self.offsets = offsets
+        self.crcs = crcs
+        self.source = source        # (size, mtime_ns) of the text the offsets match
+        self.index_path = index_path
+        self.index_map = index_map
+        self._open_text()
+
+    def _open_text(self):
+        self.file = open(self.path, "rb", buffering=0)
+        self.lock = threading.Lock()
+
+    def _close_text(self):
+        self.file.close()
+
+    def _read_at(self, pos, n):
+        if hasattr(os, "pread"):
+            return os.pread(self.file.fileno(), n, pos)
+        # no pread (Windows): the search index reads jokes on the worker
+        # while the app reads them on the Tk thread, so seek and read as one
+        with self.lock:
+            self.file.seek(pos)
+            return self.file.read(n)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def line(self, i):
+        """The raw bytes of joke i's line, without its newline (short or
+        empty if the file has changed since it was indexed)"""
+        pos = self.offsets[i]
+        parts = []
+        while True:
+            data = self._read_at(pos, LINE_READ)
+            end = data.find(b"\n")
+            if end >= 0:
+                parts.append(data[:end])
+                break
+            parts.append(data)
+            if len(data) < LINE_READ:
+                break
+            pos += len(data)
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def __getitem__(self, i):
+        """Joke i as a dict, or None if the file changed and its line is no longer a joke"""
+        return parse_joke(self.line(i).decode("utf-8", errors="replace"))
+
+    def changes(self, task=None):
+        """
+        What has changed in the text file since it was indexed, as a
+        Change, or None if nothing has. Only reads: safe to run on a
+        worker while jokes are being read, as long as apply() is not.
+        """
+        source = source_stamp(self.path)
+        if source == self.source:
+            return None
+        old, new = self.source[0], source[0]
+        delta = new - old
+        with open(self.path, "rb") as f:
+            first, same = self._changed_range(f, old, new)
+            cut = _line_start(f, min(first, new))
+            if same < old:
+                # rescan to the end of the line the unchanged text starts in:
+                # every line after it is as it was, only moved by delta
+                end = _line_end(f, same + delta)
+                stop = end - delta
+            else:
+                end, stop = new, old
+            offsets = scan_offsets(self.path, task, cut, end)
+            block = cut // BLOCK
+            if delta:
+                crc_stop = None
+                crcs = block_crcs(f, block, new)
+            else:
+                crc_stop = min(-(-end // BLOCK), len(self.crcs))
+                crcs = block_crcs(f, block, min(crc_stop * BLOCK, new))
+        return Change(source, cut, stop, offsets, block, crc_stop, crcs)
+
+    def _changed_range(self, f, old, new):
+        """
+        (first, same): the old file's bytes before first are unchanged, and
+        so are those from same on, found delta = new - old bytes later.
+        Both are block boundaries (or old itself).
+        """
+        crcs = self.crcs
+        delta = new - old
+        # the block the old file ended in is checked first: if it is as it
+        # was and the file has grown, the change is taken to be an append
+        if crcs and new > old:
+            last = (len(crcs) - 1) * BLOCK
+            f.seek(last)
+            if zlib.crc32(f.read(old - last)) == crcs[-1]:
+                return old, old
+        first = old
+        f.seek(0)
+        for i, crc in enumerate(crcs):
+            end = min((i + 1) * BLOCK, old)
+            if end > new or zlib.crc32(f.read(end - i * BLOCK)) != crc:
+                first = i * BLOCK
+                break
+        same = old
+        for i in range(len(crcs) - 1, first // BLOCK - 1, -1):
+            start, end = i * BLOCK, min((i + 1) * BLOCK, old)
+            if start < first or start + delta < first:
+                break
+            f.seek(start + delta)
+            if zlib.crc32(f.read(end - start)) != crcs[i]:
+                break
+            same = start
+        return first, same
+
+    def apply(self, change):
+        """
+        Swap in a Change from changes(). Jokes before its cut keep their
+        numbers; returns how many of them there are.
+        """
+        keep = bisect_left(self.offsets, change.cut)
+        tail = bisect_left(self.offsets, change.stop)
+        delta = change.source[0] - self.source[0]
+        if isinstance(self.offsets, memoryview):
+            # the first change copies the mapped offsets; later ones edit the copy
+            offsets = array("Q")
+            offsets.frombytes(self.offsets.cast("B"))
+            self.offsets.release()
+            self.index_map.close()
+            self.index_map = None
+            self.offsets = offsets
+        offsets = self.offsets
+        offsets[keep:tail] = change.offsets
+        moved = keep + len(change.offsets)
+        if delta and moved < len(offsets):
+            _shift(offsets, moved, delta)
+        self.crcs[change.block:change.crc_stop] = change.crcs
+        self.source = change.source
+        # with nothing moved, only the rescanned offsets need writing
+        last = moved if not delta and moved == tail else None
+
+        # the file may have been replaced rather than rewritten: open it afresh
+        self._close_text()
+        self._open_text()
+
+        if self.index_path is not None:
+            try:
+                update_index(self.index_path, self.offsets, keep, self.crcs, self.source, last)
+            except OSError:
+                try:
+                    write_index(self.index_path, self.offsets, self.crcs, self.source)
+                except OSError:
+                    pass
+        return keep
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        if self.index_map is not None:
+            self.index_map.close()
+        self._close_text()
+
+
+def open_store(path, index_path=None, task=None):
+    """
+    Open the jokes in path, from its saved index if that is current, or
+    else by scanning the file and saving a fresh index for next time.
+    """
+    index_path = index_path or index_path_for(path)
+    source = source_stamp(path)
+    try:
+        offsets, crcs, index_map = read_index(index_path, source)
+    except (OSError, JokeIndexError):
+        offsets, index_map = scan_offsets(path, task, 0, source[0]), None
+        with open(path, "rb") as f:
+            crcs = block_crcs(f, 0, source[0])
+        try:
+            write_index(index_path, offsets, crcs, source)
+        except OSError:
+            index_path = None   # a read-only folder: scan again next time
+    return JokeStore(path, offsets, crcs, source, index_path, index_map)
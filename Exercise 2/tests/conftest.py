@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules under test sit in the exercise folder, one level up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
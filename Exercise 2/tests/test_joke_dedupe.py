@@ -0,0 +1,146 @@
+"""dedupe() against a pairwise check of every joke, and the text it compares."""
+
+import json
+import random
+import string
+
+import pytest
+
+import joke_dedupe
+from joke_dedupe import clean_line, dedupe, normalize, similarity
+
+
+@pytest.fixture(params=["numpy", "python"])
+def use_numpy(request, monkeypatch):
+    if request.param == "numpy" and joke_dedupe.np is None:
+        pytest.skip("numpy is not installed")
+    if request.param == "python":
+        monkeypatch.setattr(joke_dedupe, "np", None)
+    return request.param == "numpy"
+
+
+def word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+
+
+def mangle(rng, line):
+    """The same joke once case, spacing and punctuation are set aside"""
+    out = []
+    for w in line.split(" "):
+        w = w.upper() if rng.random() < 0.2 else w
+        out.append(w + rng.choice(["", "", ",", "!", " "]))
+    return "  ".join(out)
+
+
+def corpus(seed, n=400):
+    # long jokes from a wide vocabulary: a one-word change keeps a joke
+    # about 0.9 alike, while different jokes share next to no word pairs
+    rng = random.Random(seed)
+    lines, jokes = [], []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.05:
+            lines.append(" ".join(word(rng) for _ in range(6)))     # not a joke
+        elif r < 0.4 or not jokes:
+            joke = " ".join(word(rng) for _ in range(15)) + "?" + " ".join(word(rng) for _ in range(15))
+            jokes.append(joke)
+            lines.append(joke)
+        elif r < 0.7:
+            lines.append(mangle(rng, rng.choice(jokes)))
+        else:
+            words = rng.choice(jokes).split(" ")
+            words[rng.randrange(len(words))] = word(rng)
+            lines.append(" ".join(words))
+    return lines
+
+
+def expected(lines, threshold=joke_dedupe.THRESHOLD):
+    """First copies kept, in order: every joke checked against all the distinct ones before it"""
+    seen, earlier, kept = set(), [], []
+    for line in lines:
+        if "?" not in line:
+            continue
+        text = normalize(line)[0]
+        if text in seen:
+            continue
+        seen.add(text)
+        if all(similarity(text, e) < threshold for e in earlier):
+            kept.append(clean_line(line))
+        earlier.append(text)
+    return kept
+
+
+def write(path, lines):
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.readlines()
+
+
+@pytest.mark.parametrize("batch", [joke_dedupe.BATCH, 700])
+def test_keeps_first_copies_in_order(tmp_path, monkeypatch, use_numpy, batch):
+    monkeypatch.setattr(joke_dedupe, "BATCH", batch)
+    lines = corpus(1)
+    source, output = str(tmp_path / "jokes.txt"), str(tmp_path / "clean.txt")
+    write(source, lines)
+    report = dedupe(source, output, str(tmp_path / "report.json"), folder=str(tmp_path))
+    kept = expected(lines)
+    assert read(output) == kept
+    jokes = sum("?" in line for line in lines)
+    assert (report.lines, report.jokes, report.skipped, report.kept) == (len(lines), jokes, len(lines) - jokes, len(kept))
+    assert report.exact_duplicates + report.near_duplicates == jokes - len(kept)
+    assert report.exact_duplicates > 0 and report.near_duplicates > 0
+    with open(str(tmp_path / "report.json"), encoding="utf-8") as f:
+        assert json.load(f)["kept"] == len(kept)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["clean.txt", "jokes.txt", "report.json"]
+
+
+def test_stable(tmp_path, use_numpy):
+    lines = corpus(2)
+    source = str(tmp_path / "jokes.txt")
+    write(source, lines)
+    first, second = str(tmp_path / "a.txt"), str(tmp_path / "b.txt")
+    dedupe(source, first)
+    dedupe(source, second)
+    assert read(first) == read(second)
+    # clean jokes stay as they are, in place too
+    report = dedupe(first, first)
+    assert read(first) == read(second)
+    assert report.exact_duplicates == report.near_duplicates == 0 and report.kept == len(read(second))
+
+
+def test_empty_and_jokeless(tmp_path, use_numpy):
+    source, output = str(tmp_path / "jokes.txt"), str(tmp_path / "clean.txt")
+    for lines in ([], ["no jokes", "in here"]):
+        write(source, lines)
+        report = dedupe(source, output)
+        assert read(output) == [] and report.kept == 0 and report.skipped == len(lines)
+
+
+def test_threshold(tmp_path, use_numpy):
+    base = " ".join(f"w{i}" for i in range(10))
+    lines = [base + "?end", base.replace("w5", "v5") + "?end", "a b c?d e f"]
+    source, output = str(tmp_path / "jokes.txt"), str(tmp_path / "clean.txt")
+    write(source, lines)
+    assert dedupe(source, output).near_duplicates == 1
+    assert read(output) == [lines[0] + "\n", lines[2] + "\n"]
+    assert dedupe(source, output, threshold=0.9).near_duplicates == 0
+
+
+def test_normalize():
+    assert normalize("Why did the  Chicken, cross?The ROAD!\nno joke here") == [
+        "why did the chicken cross \x00 the road", "no joke here"]
+    # only the first "?" parts setup from punchline; words need not be ASCII
+    assert normalize("Café? Olé!?x") == ["café \x00 olé x"]
+    assert normalize("WHY...?  because") == normalize("why?because")
+    assert clean_line("  Why  did   it?  Because \n") == "Why did it?Because\n"
+
+
+def test_similarity():
+    a, b = normalize("one two three four?five six")[0], normalize("one two three four?five seven")[0]
+    assert similarity(a, a) == 1.0
+    assert 0 < similarity(a, b) < 1
+    assert similarity(a, normalize("x y?z")[0]) == 0.0
@@ -0,0 +1,101 @@
+"""JokeOrder: every joke once per pass, across restarts and resizes."""
+
+import json
+import random
+
+import pytest
+
+from joke_order import JokeOrder
+
+
+def take(order, n):
+    return [order.next() for _ in range(n)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7, 16, 17, 255, 1000, 4097])
+def test_positions_cover_every_index_once(count):
+    for seed in range(5):
+        order = JokeOrder(count, seed=seed)
+        assert sorted(order[k] for k in range(count)) == list(range(count))
+        for k in (-1, count):
+            with pytest.raises(IndexError):
+                order[k]
+
+
+def test_seeds_shuffle_differently():
+    a, b = JokeOrder(1000, seed=1), JokeOrder(1000, seed=2)
+    assert [a[k] for k in range(1000)] != [b[k] for k in range(1000)]
+    assert [a[k] for k in range(1000)] == [JokeOrder(1000, seed=1)[k] for k in range(1000)]
+
+
+def test_passes():
+    order = JokeOrder(50, rng=random.Random(1))
+    first = take(order, 50)
+    assert sorted(first) == list(range(50)) and order.remaining == 0 and order.passes == 0
+    second = take(order, 50)
+    assert sorted(second) == list(range(50)) and order.passes == 1
+    assert second != first
+
+
+def test_no_jokes():
+    order = JokeOrder(0)
+    assert len(order) == 0
+    with pytest.raises(IndexError):
+        order.next()
+
+
+def test_save_and_resume(tmp_path):
+    path = str(tmp_path / "randomJokes.order")
+    order = JokeOrder(100, path, rng=random.Random(2))
+    seen = take(order, 30)
+    order.save()
+    rest = take(order, 70)
+    again = JokeOrder(100, path)
+    assert (again.position, again.remaining) == (30, 70)
+    assert take(again, 70) == rest
+    assert sorted(seen + rest) == list(range(100))
+
+
+def test_stale_or_broken_state_is_ignored(tmp_path):
+    path = str(tmp_path / "randomJokes.order")
+    order = JokeOrder(100, path, seed=5)
+    take(order, 30)
+    order.save()
+    # made for another corpus size
+    assert JokeOrder(101, path).position == 0
+    # an explicit seed starts afresh
+    assert JokeOrder(100, path, seed=5).position == 0
+    for text in ("not json", json.dumps({"seed": 1}), json.dumps({"seed": "x", "position": 0})):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        assert JokeOrder(100, path).position == 0
+    # no folder to save into
+    JokeOrder(5, str(tmp_path / "gone" / "randomJokes.order")).save()
+
+
+def test_shrink_mid_pass_skips_the_gone_jokes():
+    order, same = JokeOrder(100, seed=3), JokeOrder(100, seed=3)
+    seen = take(order, 40)
+    order.resize(60)
+    left = [i for i in (same[k] for k in range(40, 100)) if i < 60]
+    rest = take(order, len(left))
+    assert rest == left
+    assert sorted(set(seen + rest) & set(range(60))) == list(range(60))
+    assert order.passes == 0
+    # the next pass is over the jokes there are now
+    assert sorted(take(order, 60)) == list(range(60)) and order.passes == 1
+
+
+def test_grow_mid_pass_adds_to_the_next_pass():
+    order = JokeOrder(20, seed=4)
+    seen = take(order, 5)
+    order.resize(30)
+    assert order.remaining == 15
+    assert sorted(seen + take(order, 15)) == list(range(20))
+    assert sorted(take(order, 30)) == list(range(30))
+
+
+def test_resize_before_the_pass_starts():
+    order = JokeOrder(10, seed=6)
+    order.resize(25)
+    assert len(order) == 25 and sorted(take(order, 25)) == list(range(25))
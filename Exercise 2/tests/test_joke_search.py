@@ -0,0 +1,159 @@
+"""SearchIndex results against a scan of the jokes, built either way and after appends."""
+
+import os
+import random
+import re
+
+import pytest
+
+import joke_search
+from joke_search import CATEGORIES, SearchIndexError, build_search, category_of, load_search, words
+from joke_store import open_store
+
+VOCAB = ["chicken", "road", "cross", "crossed", "cow", "moo", "dog", "bark", "cat", "hat",
+         "42", "x9", "Café", "fish", "fishing", "fit"]
+
+
+def joke_line(rng):
+    lead = rng.choice(["Why", "what", "HOW", "Who", "Knock", "A"])
+    setup = " ".join(rng.choice(VOCAB) for _ in range(rng.randrange(1, 5)))
+    punch = " ".join(rng.choice(VOCAB) for _ in range(rng.randrange(0, 4)))
+    return f"{lead} {setup}?{punch}!"
+
+
+def write(path, lines):
+    """Write lines to path, moving its mtime on so the edit is always seen"""
+    old = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("".join(line + "\n" for line in lines))
+    st = os.stat(path)
+    if st.st_mtime_ns <= old:
+        os.utime(path, ns=(st.st_atime_ns, old + 1000))
+
+
+def scan(store, text, category=None):
+    """Every joke the search should find, by reading each one"""
+    terms = words(text)
+    prefix = terms.pop() if terms and re.search(r"[A-Za-z0-9]$", text) else None
+    if not terms and prefix is None and not category:
+        return []
+    found = []
+    for i in range(len(store)):
+        have = words(store.line(i))
+        if not set(terms) <= set(have):
+            continue
+        if prefix is not None and not any(w.startswith(prefix) for w in have):
+            continue
+        if category and category_of(have) != b"#" + category.encode():
+            continue
+        found.append(i)
+    return found
+
+
+QUERIES = [("chicken", None), ("chicken ", None), ("cro", None), ("cross ", None),
+           ("c", None), ("f", None), ("dog bark", None), ("dog ba", None), ("caf", None),
+           ("42", None), ("x", None), ("", "why"), ("", "other"), ("cow", "how"),
+           ("fi", "who"), ("zebra", None), ("road zeb", None), ("  ", None),
+           ("café", None), ("dog é", None), ("fish²", None)]
+
+
+def check(index, store, limit=7):
+    for text, category in QUERIES:
+        expected = scan(store, text, category)
+        got = index.search(text, category, limit=limit)
+        assert got.jokes == expected[:limit], (text, category)
+        assert got.count in (len(expected), None), (text, category)
+        if got.count is None:
+            assert len(expected) >= limit
+
+
+@pytest.fixture(params=["numpy", "python"])
+def build(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(joke_search, "np", None)
+    elif joke_search.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+@pytest.fixture
+def jokes(tmp_path):
+    rng = random.Random(7)
+    path = str(tmp_path / "jokes.txt")
+    lines = [joke_line(rng) for _ in range(1500)]
+    write(path, lines)
+    store = open_store(path)
+    yield store, lines, rng
+    store.close()
+
+
+def test_search_matches_a_scan(jokes, build):
+    store, _, _ = jokes
+    index = build_search(store, str(store.path) + ".search")
+    check(index, store)
+    check(index, store, limit=2000)
+    index.close()
+
+
+def test_windows_and_prefix_checks(jokes, build, monkeypatch):
+    # small limits, so counts stop early and common prefixes are read from the jokes
+    monkeypatch.setattr(joke_search, "EXACT_MAX", 16)
+    monkeypatch.setattr(joke_search, "UNION_MAX", 64)
+    store, _, _ = jokes
+    index = build_search(store, str(store.path) + ".search")
+    check(index, store, limit=3)
+    check(index, store, limit=40)
+    index.close()
+
+
+def postings(index):
+    """term -> joke numbers; the numpy build also keeps categories with no jokes"""
+    out = {index.term(i): list(index._docs(i)) for i in range(index.terms)}
+    return {t: docs for t, docs in out.items() if docs}
+
+
+def test_both_builds_index_the_same(jokes, monkeypatch):
+    if joke_search.np is None:
+        pytest.skip("numpy is not installed")
+    store, _, _ = jokes
+    fast = build_search(store, str(store.path) + ".numpy.search")
+    monkeypatch.setattr(joke_search, "np", None)
+    slow = build_search(store, str(store.path) + ".python.search")
+    assert postings(fast) == postings(slow)
+    fast.close()
+    slow.close()
+
+
+def test_appended_jokes_join_the_index(jokes, build):
+    store, lines, rng = jokes
+    index = build_search(store, str(store.path) + ".search")
+    for _ in range(3):
+        lines += [joke_line(rng) for _ in range(rng.randrange(1, 40))]
+        write(store.path, lines)
+        kept = store.apply(store.changes())
+        assert kept >= index.jokes
+        assert index.add_tail(index.index_tail(None, kept))
+        check(index, store)
+    index.close()
+
+
+def test_stale_index_is_refused(jokes, build):
+    store, lines, rng = jokes
+    path = str(store.path) + ".search"
+    build_search(store, path).close()
+    lines[3] = joke_line(rng) + " fresh"
+    write(store.path, lines)
+    store.apply(store.changes())
+    with pytest.raises(SearchIndexError):
+        load_search(path, store)
+    index = joke_search.open_search(store, path)
+    assert index.search("fresh ").jokes == [3]
+    index.close()
+
+
+def test_categories_cover_every_joke(jokes, build):
+    store, _, _ = jokes
+    index = build_search(store, str(store.path) + ".search")
+    total = sum(index.search("", name, limit=0).count for name in CATEGORIES)
+    assert total == len(store)
+    index.close()
@@ -0,0 +1,127 @@
+"""JokeStore: offsets, the saved index, and changes()/apply() after edits."""
+
+import os
+import random
+
+import pytest
+
+import joke_store
+from joke_store import open_store, parse_joke, read_index
+
+
+def write(path, lines):
+    """Write lines to path, moving its mtime on so the edit is always seen"""
+    old = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("".join(line + "\n" for line in lines))
+    st = os.stat(path)
+    if st.st_mtime_ns <= old:
+        os.utime(path, ns=(st.st_atime_ns, old + 1000))
+
+
+def jokes_in(lines):
+    return [j for j in map(parse_joke, lines) if j is not None]
+
+
+def check(store, lines):
+    assert [store[i] for i in range(len(store))] == jokes_in(lines)
+    # the index on disk matches what a fresh scan would give
+    offsets, crcs, mapping = read_index(store.index_path, store.source)
+    assert list(offsets) == list(store.offsets) and list(crcs) == list(store.crcs)
+    offsets.release()
+    mapping.close()
+
+
+@pytest.fixture(params=["numpy", "python"])
+def scan(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(joke_store, "np", None)
+    elif joke_store.np is None:
+        pytest.skip("numpy is not installed")
+    # small blocks, so edits land in different checksummed blocks
+    monkeypatch.setattr(joke_store, "BLOCK_BITS", 8)
+    monkeypatch.setattr(joke_store, "BLOCK", 1 << 8)
+
+
+def make_lines(rng, n):
+    lines = []
+    for i in range(n):
+        if rng.random() < 0.1:
+            lines.append(rng.choice(["", "no question here", "   "]))
+        else:
+            lines.append(f"Why did joke {i} {'x' * rng.randrange(40)}?Because {rng.random():.6f}")
+    return lines
+
+
+def test_open_and_reopen(tmp_path, scan):
+    path = str(tmp_path / "jokes.txt")
+    lines = make_lines(random.Random(1), 300)
+    write(path, lines)
+    store = open_store(path)
+    check(store, lines)
+    store.close()
+    # a second open comes from the saved index
+    store = open_store(path)
+    assert isinstance(store.offsets, memoryview)
+    assert store[5] == jokes_in(lines)[5]
+    store.close()
+
+
+def test_unchanged_file_has_no_changes(tmp_path, scan):
+    path = str(tmp_path / "jokes.txt")
+    write(path, make_lines(random.Random(2), 50))
+    store = open_store(path)
+    assert store.changes() is None
+    store.close()
+
+
+@pytest.mark.parametrize("edit", ["append", "insert", "delete", "replace", "same size", "truncate"])
+def test_changes_then_apply(tmp_path, scan, edit):
+    rng = random.Random(edit)
+    path = str(tmp_path / "jokes.txt")
+    lines = make_lines(rng, 400)
+    write(path, lines)
+    store = open_store(path)
+    for _ in range(5):
+        at = rng.randrange(len(lines))
+        if edit == "append":
+            lines += make_lines(rng, rng.randrange(1, 30))
+        elif edit == "insert":
+            lines[at:at] = make_lines(rng, rng.randrange(1, 10))
+        elif edit == "delete":
+            del lines[at:at + rng.randrange(1, 10)]
+        elif edit == "replace":
+            lines[at:at + 3] = make_lines(rng, rng.randrange(1, 6))
+        elif edit == "same size":
+            lines[at] = lines[at].swapcase()
+        else:
+            del lines[at:]
+        write(path, lines)
+        change = store.changes()
+        assert change is not None
+        keep = store.apply(change)
+        # the jokes before the edit keep their numbers
+        assert keep <= len(jokes_in(lines))
+        check(store, lines)
+        assert store.changes() is None
+    store.close()
+
+
+def test_reads_between_an_edit_and_apply(tmp_path, scan):
+    # the app only looks for edits once a second: reads in between must
+    # not crash, and a joke that is gone comes back as None
+    path = str(tmp_path / "jokes.txt")
+    lines = make_lines(random.Random(3), 2000)
+    write(path, lines)
+    store = open_store(path)
+    last = len(store) - 1
+    with open(path, "r+", encoding="utf-8", newline="\n") as f:
+        f.write("Why?In place\n")
+        f.truncate(200)
+    assert store[last] is None
+    assert store[0] == {"setup": "Why?", "punchline": "In place"}
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    store.apply(store.changes())
+    assert [store[i] for i in range(len(store))] == jokes_in(lines)
+    store.close()
@@ -0,0 +1,528 @@
+"""
+Benchmarks for the Student Manager data layer.
+
+Usage:
+    python bench.py loader [--sizes 10000,1000000,10000000] [--legacy]
+    python bench.py memory [--sizes 100000,1000000]
+    python bench.py stats [--size 1000000]
+    python bench.py index [--size 1000000]
+    python bench.py view [--sizes 100,10000,1000000]   (needs a display)
+    python bench.py journal [--sizes 1000,100000,1000000]
+    python bench.py sort [--size 1000000] [--top 50]
+    python bench.py coldstart [--sizes 10000,1000000,5000000]
+    python bench.py lag [--size 1000000]
+
+Each measurement runs in a fresh subprocess so that peak RSS is not
+polluted by earlier runs. Synthetic rosters are written to a temp folder.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# background.py and student_stats.py are shared by the exercises, from
+# common/ at the top of the repo
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+import student_stats
+from background import BackgroundTasks
+from student_index import StudentIndex
+from student_journal import Journal
+from student_roster import open_roster
+from student_snapshot import load_snapshot, source_stamp, write_snapshot
+from student_sort import SortEngine, parse_keys
+from student_store import StudentTable, iter_students, recalc, to_int, write_roster
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FIRST = ["Lee", "Gareth", "Jake", "Alan", "John", "Sam", "Matt", "Ron", "Jo", "Les", "Amy", "Priya"]
+LAST = ["Scott", "Southgate", "Hobbs", "Shearer", "Curry", "Sturtivant", "Thompson", "Herrema", "Hyde"]
+
+
+def make_roster(path, n, seed=1):
+    """Write a synthetic studentMarks.txt with n students"""
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{n}\n")
+        for i in range(n):
+            name = f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {i}"
+            f.write(f"{rnd.randint(1000, 9999)},{name},{rnd.randint(0, 20)},"
+                    f"{rnd.randint(0, 20)},{rnd.randint(0, 20)},{rnd.randint(0, 100)}\n")
+    return path
+
+
+def roster_file(n):
+    path = os.path.join(tempfile.gettempdir(), f"studentMarks_{n}.txt")
+    if not os.path.exists(path):
+        make_roster(path, n)
+    return path
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def run_child(*argv):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "_child", *argv],
+                         check=True, capture_output=True, text=True, cwd=HERE)
+    return json.loads(out.stdout)
+
+
+def legacy_load(path):
+    # the original readlines()-based loader, kept for comparison
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [ln.strip() for ln in f.readlines()]
+    students = []
+    for ln in lines[1:]:
+        if not ln: continue
+        parts = ln.split(",")
+        if len(parts) < 6: continue
+        s = {"code": to_int(parts[0], None), "name": parts[1], "m1": to_int(parts[2]),
+             "m2": to_int(parts[3]), "m3": to_int(parts[4]), "exam": to_int(parts[5])}
+        recalc(s)
+        students.append(s)
+    return len(students)
+
+
+def child(task, path):
+    base = peak_rss_mb()
+    t0 = time.perf_counter()
+    if task == "stream":
+        errors = []
+        count = sum(1 for _ in iter_students(path, errors))
+    elif task == "legacy":
+        count = legacy_load(path)
+    elif task in ("txt", "bin"):
+        # cold start: load, then read what the first screen shows
+        table = StudentTable.from_file(path, []) if task == "txt" else load_snapshot(path)
+        for pos in range(min(20, len(table))):
+            table[pos].as_dict()
+        count = len(table)
+    elif task in ("dicts", "table"):
+        base = current_rss_mb()
+        if task == "dicts":
+            roster = list(iter_students(path, []))
+        else:
+            roster = StudentTable.from_file(path, [])
+        elapsed = time.perf_counter() - t0
+        print(json.dumps({"count": len(roster), "seconds": elapsed,
+                          "resident_mb": current_rss_mb() - base}))
+        return
+    else:
+        raise SystemExit(f"unknown child task {task}")
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"count": count, "seconds": elapsed,
+                      "peak_rss_mb": peak_rss_mb(), "base_rss_mb": base}))
+
+
+def bench_loader(args):
+    tasks = ["stream"] + (["legacy"] if args.legacy else [])
+    print(f"{'rows':>10} {'loader':>8} {'seconds':>9} {'rows/s':>11} {'peak RSS MB':>12}")
+    for n in args.sizes:
+        path = roster_file(n)
+        for task in tasks:
+            r = run_child(task, path)
+            print(f"{n:>10} {task:>8} {r['seconds']:>9.2f} {r['count'] / r['seconds']:>11,.0f} "
+                  f"{r['peak_rss_mb']:>12.1f}")
+
+
+def bench_memory(args):
+    print(f"{'rows':>10} {'layout':>8} {'resident MB':>12} {'bytes/student':>14} {'load s':>8}")
+    for n in args.sizes:
+        path = roster_file(n)
+        results = {task: run_child(task, path) for task in ("dicts", "table")}
+        for task, r in results.items():
+            print(f"{n:>10} {task:>8} {r['resident_mb']:>12.1f} "
+                  f"{r['resident_mb'] * 1024 * 1024 / max(r['count'], 1):>14.0f} {r['seconds']:>8.2f}")
+        ratio = results["dicts"]["resident_mb"] / max(results["table"]["resident_mb"], 1e-9)
+        print(f"{'':>10} {'saving':>8} {ratio:>11.1f}x")
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_stats(args):
+    path = roster_file(args.size)
+    records = list(iter_students(path, []))
+    table = StudentTable.from_file(path, [])
+
+    def legacy():
+        # what highest(), lowest() and view_all() did between them
+        max(records, key=lambda x: x['percentage'])
+        min(records, key=lambda x: x['percentage'])
+        sum(s['percentage'] for s in records) / len(records)
+
+    def engine(use_numpy):
+        def run():
+            table._derived.clear()
+            student_stats.summarise(table, use_numpy=use_numpy)
+        return run
+
+    base = timed(legacy)
+    print(f"{args.size:,} students (engine also computes median, stddev, percentiles, grades)")
+    print(f"{'legacy 3 passes':>20} {base * 1000:>9.1f} ms")
+    runs = [("engine python", engine(False))]
+    if student_stats.np is not None:
+        runs.append(("engine numpy", engine(True)))
+    for label, fn in runs:
+        t = timed(fn)
+        print(f"{label:>20} {t * 1000:>9.1f} ms {base / t:>6.1f}x")
+
+
+def bench_sort(args):
+    path = roster_file(args.size)
+    records = list(iter_students(path, []))
+    table = StudentTable.from_file(path, [])
+    print(f"{args.size:,} students, top {args.top}")
+    print(f"{'sort':>32} {'legacy ms':>10} {'engine ms':>10} {'top-K ms':>9} {'cached ms':>10}")
+
+    for text in ("percentage d", "name", "grade, percentage d, name"):
+        keys = parse_keys(text)
+
+        def legacy():
+            # the old do_sort(): a full list.sort with a Python key per field
+            rows = list(records)
+            for field, desc in reversed(keys):
+                if field in ("name", "grade"):
+                    rows.sort(key=lambda x: x[field].lower(), reverse=desc)
+                else:
+                    rows.sort(key=lambda x: x[field], reverse=desc)
+
+        base = timed(legacy, repeat=1)
+        engines = [("python", SortEngine(table, use_numpy=False))]
+        if student_stats.np is not None:
+            engines.append(("numpy", SortEngine(table)))
+        for label, engine in engines:
+            def cold(run):
+                def go():
+                    table._derived.clear()
+                    run()
+                return go
+            full = timed(cold(lambda: engine.order(keys)), repeat=1)
+            top = timed(cold(lambda: engine.top(keys, args.top)), repeat=1)
+            engine.order(keys)
+            cached = timed(lambda: engine.order(keys), repeat=5)
+            print(f"{text + ' (' + label + ')':>32} {base * 1000:>10.0f} {full * 1000:>10.0f} "
+                  f"{top * 1000:>9.0f} {cached * 1000:>10.4f}")
+
+
+def bench_index(args):
+    path = roster_file(args.size)
+    records = list(iter_students(path, []))
+    table = StudentTable.from_file(path, [])
+    index = StudentIndex(table)
+    t0 = time.perf_counter()
+    index.build()
+    print(f"{args.size:,} students, index build {time.perf_counter() - t0:.2f} s")
+
+    def linear(key):
+        # the original find_matches(), as positions
+        key = key.lower().strip()
+        return [i for i, s in enumerate(records) if str(s['code']) == key or key in s['name'].lower()]
+
+    mid = records[len(records) // 2]
+    queries = [
+        ("code", str(mid['code'])),
+        ("full name", mid['name']),
+        ("name fragment", mid['name'].split()[-1] + "7"),
+        ("one letter", "a"),
+        ("two letters", "jo"),
+        ("common word", "john"),
+        ("digits", "99"),
+        ("no match", "nobody here"),
+    ]
+    # a page is what the search box shows; the full list is every match
+    print(f"{'query':>14} {'hits':>7} {'scan ms':>9} {'page ms':>9} {'all ms':>9}")
+    for label, key in queries:
+        hits = index.find(key)
+        assert hits == linear(key), label
+        scan = timed(lambda: linear(key), repeat=1)
+        page = timed(lambda: index.page(key), repeat=5)
+        full = timed(lambda: index.find(key), repeat=1)
+        print(f"{label:>14} {len(hits):>7} {scan * 1000:>9.1f} {page * 1000:>9.3f} {full * 1000:>9.1f}")
+
+    prefix = mid['name'][:9]
+    t = timed(lambda: index.prefix(prefix), repeat=5)
+    print(f"prefix {prefix!r}: {len(index.prefix(prefix))} hits in {t * 1000:.2f} ms")
+
+    row = table[len(records) // 2]
+    n = 1000
+    t0 = time.perf_counter()
+    for i in range(n):
+        new = table.append(1000 + i, f"Bench Student {i}", 1, 2, 3, 4)
+        table.update(new, name=f"Renamed Student {i}", code=2000 + i)
+        table.remove(new)
+    per_op = (time.perf_counter() - t0) / (3 * n)
+    assert index.find(row['name'])
+    print(f"incremental add/update/delete: {per_op * 1e6:.0f} us per mutation")
+
+
+def bench_view(args):
+    import tkinter as tk
+    from record_view import RecordView
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"skipped: no display for Tk ({e})")
+        return
+    root.geometry("900x600")
+    view = RecordView(root, lines_per_record=7)
+    view.pack(fill=tk.BOTH, expand=True)
+    text = tk.Text(root)
+
+    def fmt(s):
+        return (f"Name: {s['name']}\nStudent Number: {s['code']}\n"
+                f"Coursework (out of 60): {s['coursework']}\nExam (out of 100): {s['exam']}\n"
+                f"Total /160: {s['total']}\nPercentage: {s['percentage']:.2f}%  Grade: {s['grade']}")
+
+    print(f"{'rows':>10} {'virtual ms':>11} {'scroll ms':>10} {'old Text ms':>12}")
+    for n in args.sizes:
+        table = StudentTable.from_file(roster_file(n), [])
+        t0 = time.perf_counter()
+        view.set_source(len(table), lambda i: fmt(table[i]) + "\n" + "-"*40)
+        root.update()
+        opened = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        view.yview("moveto", "0.5")
+        root.update()
+        scrolled = time.perf_counter() - t0
+        old = "-"
+        if n <= args.legacy_max:
+            # the old view_all(): two inserts and a see() per student
+            t0 = time.perf_counter()
+            text.delete(1.0, tk.END)
+            for s in table:
+                text.insert(tk.END, fmt(s) + "\n")
+                text.see(tk.END)
+                text.insert(tk.END, "-"*40 + "\n")
+                text.see(tk.END)
+            root.update()
+            old = f"{(time.perf_counter() - t0) * 1000:.1f}"
+        print(f"{n:>10} {opened * 1000:>11.1f} {scrolled * 1000:>10.1f} {old:>12}")
+    root.destroy()
+
+
+def bench_journal(args):
+    print(f"{'rows':>10} {'journal ms/edit':>16} {'full rewrite ms/edit':>21} {'checkpoint s':>13}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "studentMarks.txt")
+            shutil.copy(roster_file(n), path)
+            table = StudentTable.from_file(path, [])
+            journal = Journal.open(path, table)
+            rnd = random.Random(n)
+
+            t0 = time.perf_counter()
+            for i in range(args.edits):
+                table.update(rnd.randrange(n), exam=i % 101)
+            per_edit = (time.perf_counter() - t0) / args.edits
+
+            # the old behaviour: rewrite the whole file after each edit
+            rewrites = max(1, min(args.edits, 20_000_000 // n))
+            t0 = time.perf_counter()
+            for i in range(rewrites):
+                table.update(rnd.randrange(n), exam=i % 101)
+                write_roster(table, path + ".old")
+            per_rewrite = (time.perf_counter() - t0) / rewrites
+
+            t0 = time.perf_counter()
+            journal.checkpoint()
+            checkpoint = time.perf_counter() - t0
+            journal.close()
+        print(f"{n:>10} {per_edit * 1000:>16.3f} {per_rewrite * 1000:>21.1f} {checkpoint:>13.2f}")
+
+
+def bench_coldstart(args):
+    print(f"{'rows':>10} {'format':>7} {'file MB':>8} {'load s':>8} {'peak RSS MB':>12}")
+    for n in args.sizes:
+        path = roster_file(n)
+        snapshot = os.path.splitext(path)[0] + ".bin"
+        if not os.path.exists(snapshot):
+            write_snapshot(StudentTable.from_file(path, []), snapshot, source_stamp(path))
+        results = {}
+        for task, file in (("txt", path), ("bin", snapshot)):
+            r = results[task] = run_child(task, file)
+            print(f"{n:>10} {task:>7} {os.path.getsize(file) / 1e6:>8.1f} {r['seconds']:>8.3f} "
+                  f"{r['peak_rss_mb'] - r['base_rss_mb']:>12.1f}")
+        print(f"{'':>10} {'speedup':>7} {'':>8} "
+              f"{results['txt']['seconds'] / max(results['bin']['seconds'], 1e-9):>7.0f}x")
+
+
+class TimerLoop:
+    """Stand-in for a Tk root (after/after_cancel/mainloop) when there is no display"""
+
+    def __init__(self):
+        self.timers = []
+        self.running = True
+
+    def after(self, ms, fn):
+        self.timers.append([time.monotonic() + ms / 1000, fn])
+        return self.timers[-1]
+
+    def after_cancel(self, timer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def quit(self):
+        self.running = False
+
+    def mainloop(self):
+        while self.running and self.timers:
+            self.timers.sort(key=lambda t: t[0])
+            due, fn = self.timers.pop(0)
+            time.sleep(max(0.0, due - time.monotonic()))
+            fn()
+
+
+def bench_lag(args):
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+        kind = "Tk"
+    except tk.TclError:
+        root = TimerLoop()
+        kind = "timer loop (no display)"
+    tick_ms = 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "studentMarks.txt")
+        shutil.copy(roster_file(args.size), path)
+        print(f"{args.size:,} students, event loop: {kind}, tick every {tick_ms} ms")
+        print(f"{'load':>12} {'seconds':>8} {'max lag ms':>11} {'p99 lag ms':>11} {'ticks':>6}")
+        for mode in ("blocking", "background"):
+            for name in os.listdir(tmp):
+                if name != "studentMarks.txt":
+                    os.remove(os.path.join(tmp, name))
+            lags = []
+            state = {"due": None, "t0": time.perf_counter()}
+
+            def tick():
+                now = time.monotonic()
+                if state["due"] is not None:
+                    lags.append(now - state["due"])
+                state["due"] = now + tick_ms / 1000
+                state["timer"] = root.after(tick_ms, tick)
+
+            def done(roster):
+                state["seconds"] = time.perf_counter() - state["t0"]
+                roster[1].close()
+                # a few more ticks so a blocked loop records its stall
+                root.after(tick_ms * 3, finish)
+
+            def finish():
+                root.after_cancel(state["timer"])
+                root.quit()
+
+            if mode == "blocking":
+                # what the app used to do: load on the event thread itself
+                def load():
+                    done(open_roster(_Inline(), path, None))
+                root.after(tick_ms * 5, load)
+            else:
+                tasks = BackgroundTasks(root)
+                tasks.submit(open_roster, path, None, on_done=done, on_progress=lambda *a: None)
+            tick()
+            if isinstance(root, TimerLoop):
+                root.running = True
+            root.mainloop()
+            if mode == "background":
+                tasks.shutdown()
+            lags.sort()
+            p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+            print(f"{mode:>12} {state['seconds']:>8.1f} {lags[-1] * 1000:>11.0f} "
+                  f"{p99 * 1000:>11.1f} {len(lags):>6}")
+    if not isinstance(root, TimerLoop):
+        root.destroy()
+
+
+class _Inline:
+    """Task stand-in for running a background function directly"""
+
+    def progress(self, done, total=None):
+        pass
+
+    def check(self):
+        pass
+
+
+def sizes(text):
+    return [int(x) for x in text.split(",")]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_child":
+        child(*sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("loader", help="streaming loader time and peak RSS")
+    p.add_argument("--sizes", type=sizes, default=[10_000, 1_000_000, 10_000_000])
+    p.add_argument("--legacy", action="store_true", help="also run the old readlines() loader")
+    p.set_defaults(func=bench_loader)
+
+    p = sub.add_parser("memory", help="resident memory of dict records vs StudentTable")
+    p.add_argument("--sizes", type=sizes, default=[100_000, 1_000_000])
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("stats", help="aggregate engine vs per-handler passes")
+    p.add_argument("--size", type=int, default=1_000_000)
+    p.set_defaults(func=bench_stats)
+
+    p = sub.add_parser("sort", help="sort engine (full, top-K, cached) vs list.sort")
+    p.add_argument("--size", type=int, default=1_000_000)
+    p.add_argument("--top", type=int, default=50)
+    p.set_defaults(func=bench_sort)
+
+    p = sub.add_parser("index", help="indexed lookups vs the linear find_matches scan")
+    p.add_argument("--size", type=int, default=1_000_000)
+    p.set_defaults(func=bench_index)
+
+    p = sub.add_parser("view", help="time to open the virtualized record view")
+    p.add_argument("--sizes", type=sizes, default=[100, 10_000, 1_000_000])
+    p.add_argument("--legacy-max", type=int, default=10_000,
+                   help="largest roster to also render the old way")
+    p.set_defaults(func=bench_view)
+
+    p = sub.add_parser("journal", help="per-edit latency of the journal vs full rewrites")
+    p.add_argument("--sizes", type=sizes, default=[1_000, 100_000, 1_000_000])
+    p.add_argument("--edits", type=int, default=200)
+    p.set_defaults(func=bench_journal)
+
+    p = sub.add_parser("coldstart", help="text roster parse vs memory-mapped snapshot")
+    p.add_argument("--sizes", type=sizes, default=[10_000, 1_000_000, 5_000_000])
+    p.set_defaults(func=bench_coldstart)
+
+    p = sub.add_parser("lag", help="event-loop lag while a roster loads, blocking vs background")
+    p.add_argument("--size", type=int, default=1_000_000)
+    p.set_defaults(func=bench_lag)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Lookup indexes over a StudentTable.
+
+- by_code: student code -> array of row positions
+- by_name: array of row positions sorted by lowercase name, for prefix
+  search with bisect
+- grams:   trigram of the lowercase name -> array of row positions, for
+  substring search. Names are padded with PAD at both ends, so every
+  character of a name sits in some trigram and 1-2 character keys are
+  served from the trigrams that contain them (`containing`).
+
+The indexes are built on first use and then kept up to date from the
+table's change events, so add/delete/update cost O(name length) instead
+of a rebuild. Trigram postings are append-only: entries left behind by a
+delete or rename are filtered out when a query verifies its candidates.
+
+Lookups return a page of matches at a time (page()), in table order.
+Candidates are verified in windows of positions, so a key that matches
+most of the roster costs about one page of work, and a page stops early
+once VERIFY_MAX candidates have been checked.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+GRAM = 3
+PAD = "\x00"        # never typed, so never part of a key
+PAGE = 200          # matches per page
+EXACT_MAX = 1024    # candidates verified in one go, without windows
+VERIFY_MAX = 1 << 15    # candidates checked per page at most
+
+# positions: matches in table order; next: the `after` of the following
+# page, or None when there are no more
+Page = namedtuple("Page", ["positions", "next"])
+
+
+def grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def name_grams(name):
+    return grams(PAD + name + PAD)
+
+
+class StudentIndex:
+    def __init__(self, table):
+        self.table = table
+        self.built = False
+        self.pool_text = ""     # the name pool lowercased, when it is ASCII
+        self.pooled = 0         # names in pool_text; later ones are decoded
+        table.subscribe(self.on_change)
+
+    def close(self):
+        self.table.unsubscribe(self.on_change)
+
+    # Building
+
+    def lower_name(self, pos):
+        nid = self.table.name_id[pos]
+        if nid < self.pooled:
+            offsets = self.table.names.offsets
+            return self.pool_text[offsets[nid]:offsets[nid + 1]]
+        return self.table.names[nid].lower()
+
+    def _name_key(self, pos):
+        return (self.lower_name(pos), pos)
+
+    def build(self):
+        table = self.table
+        names = table.names
+        by_code = self.by_code = {}
+        postings = self.grams = {}
+        self.unsorted = set()   # grams whose postings got a position out of order
+        lowered = [""] * table.size
+        text = names.ascii_text()
+        if text is not None:
+            # byte offsets are character offsets: lowercase the heap in one go
+            text, offsets = text.lower(), names.offsets
+            lower = lambda nid: text[offsets[nid]:offsets[nid + 1]]
+            self.pool_text, self.pooled = text, len(names)
+        else:
+            self.pool_text, self.pooled = "", 0
+            lower = lambda nid: names[nid].lower()
+        for pos in table.positions():
+            code = table.code[pos]
+            hits = by_code.get(code)
+            if hits is None:
+                hits = by_code[code] = array("I")
+            hits.append(pos)
+            name = lowered[pos] = lower(table.name_id[pos])
+            padded = PAD + name + PAD
+            for g in {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}:
+                hits = postings.get(g)
+                if hits is None:
+                    hits = postings[g] = array("I")
+                hits.append(pos)
+        # a stable sort of ascending positions orders ties by position,
+        # which gives every entry the unique key (name, pos)
+        self.by_name = array("I", sorted(table.positions(), key=lowered.__getitem__))
+        self.containing = {}
+        for g in postings:
+            self._contain(g)
+        self.built = True
+
+    def _contain(self, g):
+        for part in {g[i:j] for i in range(GRAM) for j in range(i + 1, GRAM + 1)}:
+            self.containing.setdefault(part, set()).add(g)
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    # Incremental maintenance
+
+    def on_change(self, event, pos, old):
+        if not self.built:
+            return
+        if event == "reset":
+            self.built = False
+        elif event == "add":
+            self._add_code(self.table.code[pos], pos)
+            self._add_name(self.lower_name(pos), pos)
+        elif event == "delete":
+            self._remove_code(self.table.code[pos], pos)
+            self._remove_name(self.lower_name(pos), pos)
+        elif event == "update":
+            if "code" in old:
+                self._remove_code(old["code"], pos)
+                self._add_code(self.table.code[pos], pos)
+            if "name" in old:
+                self._remove_name(old["name"].lower(), pos)
+                self._add_name(self.lower_name(pos), pos, skip=name_grams(old["name"].lower()))
+
+    def _add_code(self, code, pos):
+        insort(self.by_code.setdefault(code, array("I")), pos)
+
+    def _remove_code(self, code, pos):
+        postings = self.by_code.get(code)
+        if postings is not None and pos in postings:
+            postings.remove(pos)
+            if not postings:
+                del self.by_code[code]
+
+    def _add_name(self, name, pos, skip=()):
+        i = bisect_left(self.by_name, (name, pos), key=self._name_key)
+        self.by_name.insert(i, pos)
+        for g in name_grams(name):
+            if g in skip:
+                continue
+            hits = self.grams.get(g)
+            if hits is None:
+                hits = self.grams[g] = array("I")
+                self._contain(g)
+            elif hits[-1] > pos:
+                self.unsorted.add(g)
+            hits.append(pos)
+
+    def _remove_name(self, name, pos):
+        # on a rename the table already holds the new name, so pos must
+        # be keyed by its old one while we look for it
+        def key(p):
+            return (name, p) if p == pos else self._name_key(p)
+        i = bisect_left(self.by_name, (name, pos), key=key)
+        if i < len(self.by_name) and self.by_name[i] == pos:
+            del self.by_name[i]
+
+    def _postings(self, g):
+        """The postings of a trigram, sorted by position"""
+        if g in self.unsorted:
+            self.unsorted.discard(g)
+            self.grams[g] = array("I", sorted(set(self.grams[g])))
+        return self.grams[g]
+
+    # Queries (all return row positions in table order unless noted)
+
+    def code(self, code):
+        self.ensure_built()
+        return list(self.by_code.get(code, ()))
+
+    def prefix(self, text):
+        """Positions whose lowercase name starts with text, in name order"""
+        self.ensure_built()
+        text = text.lower()
+        lo = bisect_left(self.by_name, text, key=self.lower_name)
+        # every name with the prefix sorts before text + the highest code point
+        hi = bisect_right(self.by_name, text + "\U0010ffff", lo=lo, key=self.lower_name)
+        return list(self.by_name[lo:hi])
+
+    def page(self, key, after=-1, limit=PAGE):
+        """
+        Up to `limit` positions after `after` whose code equals key or whose
+        name contains it (case-insensitive), as a Page. A page cut short by
+        VERIFY_MAX can hold fewer than `limit` matches and still have a next.
+        """
+        self.ensure_built()
+        text = (key or "").lower().strip()
+        table = self.table
+        size = table.size
+        # isdigit() alone lets through digits int() refuses, such as "²"
+        is_code = text.isascii() and text.isdigit() and str(int(text)) == text
+        codes = self.code(int(text)) if is_code else []
+        # sorted postings: a name match is in all of them (whole keys) or
+        # in one of them (1-2 character keys)
+        every = len(text) >= GRAM
+        if every:
+            lists = [self._postings(g) for g in grams(text) if g in self.grams]
+            if len(lists) < len(grams(text)):
+                lists = []
+            lists.sort(key=len)
+            count = len(lists[0]) if lists else 0
+        elif text:
+            lists = [self._postings(g) for g in self.containing.get(text, ())]
+            count = sum(map(len, lists))
+        else:
+            lists, count = None, size   # every name contains ""
+        alive, name, code_hits = table.alive, self.lower_name, set(codes)
+
+        def matches(candidates):
+            return [p for p in candidates if alive[p] and (p in code_hits or text in name(p))]
+
+        def between(lo, hi):
+            """Candidate positions in (lo, hi], sorted"""
+            if lists is None:
+                return range(lo + 1, hi + 1)
+            candidates = set(c for c in codes if lo < c <= hi)
+            if every:
+                # start from the rarest trigram and intersect with the next
+                # rarest while that is cheaper than verifying directly
+                found = None
+                for hits in lists:
+                    i, j = bisect_right(hits, lo), bisect_right(hits, hi)
+                    if found is None:
+                        found = set(hits[i:j])
+                    elif len(found) < 32 or j - i > 16 * len(found):
+                        break
+                    else:
+                        found.intersection_update(hits[i:j])
+                candidates.update(found or ())
+            else:
+                for hits in lists:
+                    candidates.update(hits[bisect_right(hits, lo):bisect_right(hits, hi)])
+            return sorted(candidates)
+
+        if count + len(codes) <= EXACT_MAX:
+            found = matches(between(after, size - 1))
+            if len(found) > limit:
+                return Page(found[:limit], found[limit - 1])
+            return Page(found, None)
+
+        if count >= size // 2:
+            lists = None    # dense enough to check every row
+        # rows expected to hold two pages, then four times more each round
+        window = max(2 * limit, 2 * limit * size // max(count, 1))
+        found = []
+        checked = 0
+        lo = after
+        while len(found) <= limit and lo < size - 1 and checked < VERIFY_MAX:
+            window = min(window, max(limit, (VERIFY_MAX - checked) * size // max(count, 1)))
+            hi = min(lo + window, size - 1)
+            candidates = between(lo, hi)
+            checked += len(candidates)
+            found += matches(candidates)
+            lo = hi
+            window *= 4
+        if len(found) > limit:
+            return Page(found[:limit], found[limit - 1])
+        return Page(found, lo if lo < size - 1 else None)
+
+    def find(self, key):
+        """Every position whose code equals key or whose name contains it (case-insensitive)"""
+        found, after = [], -1
+        while after is not None:
+            positions, after = self.page(key, after, limit=1 << 16)
+            found += positions
+        return found
+
@@ -0,0 +1,187 @@
+"""
+Write-ahead journal for roster edits.
+
+Instead of rewriting studentMarks.txt on every add/delete/update, each
+edit is appended to studentMarks.txt.journal as one line and fsynced:
+
+    B,<roster size>,<roster mtime_ns>   header: the roster this journal extends
+    A,code,name,m1,m2,m3,exam           student appended
+    U,pos,code,name,m1,m2,m3,exam       student at table position pos replaced
+    D,pos                               student at table position pos removed
+
+Positions are table positions as loaded from the roster (removed rows
+keep theirs), so replaying the journal over a fresh load of the roster
+rebuilds the exact table. checkpoint() folds the journal back into the
+roster: it writes a temp file and os.replace()s it in, then starts an
+empty journal whose header names the new roster. If a crash lands
+between the two renames, the header no longer matches the roster and the
+stale journal is discarded rather than replayed twice.
+
+When a snapshot path is given, every checkpoint also rewrites the binary
+snapshot (see student_snapshot) so the next start can skip parsing.
+"""
+
+import os
+
+from student_snapshot import source_stamp, write_snapshot
+from student_store import RosterError, parse_row, write_roster
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return f"{st.st_size},{st.st_mtime_ns}"
+
+
+def _fsync_dir(path):
+    # make the rename itself durable where the platform allows it
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    def __init__(self, roster_path, table, snapshot_path=None):
+        self.roster_path = roster_path
+        self.path = roster_path + ".journal"
+        self.snapshot_path = snapshot_path
+        self.table = table
+        self.entries = 0
+        self.file = None
+        self._checkpointing = False
+
+    @classmethod
+    def open(cls, roster_path, table, errors=None, snapshot_path=None):
+        """
+        Replay any journal left by the last session onto table (freshly
+        loaded from roster_path), then start logging its changes.
+        Returns the journal; .replayed says how many edits were recovered.
+        """
+        journal = cls(roster_path, table, snapshot_path)
+        replay_errors = []
+        journal.replayed = journal.replay(replay_errors)
+        journal.file = open(journal.path, "a", encoding="utf-8")
+        if journal.file.tell() == 0:
+            journal._write(f"B,{_stat_key(roster_path)}")
+        table.subscribe(journal.on_change)
+        if replay_errors:
+            # entries past a damaged one can never be replayed: keep what
+            # was recovered and start a clean journal
+            journal.checkpoint()
+            if errors is not None:
+                errors.extend(replay_errors)
+        return journal
+
+    def close(self):
+        self.table.unsubscribe(self.on_change)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # Recovery
+
+    def replay(self, errors=None):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # a torn last write has no trailing newline: cut it off so new
+            # entries do not get glued onto it
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        lines = data[:end].decode("utf-8").split("\n")[:-1]
+        if not lines or lines[0] != f"B,{_stat_key(self.roster_path)}":
+            # journal belongs to another version of the roster (already
+            # checkpointed, or the file was edited by hand)
+            os.replace(self.path, self.path + ".stale")
+            return 0
+        applied = 0
+        for lineno, line in enumerate(lines[1:], start=2):
+            try:
+                self._apply(line, lineno)
+            except (RosterError, ValueError, IndexError) as e:
+                if errors is not None:
+                    errors.append(e if isinstance(e, RosterError) else
+                                  RosterError(lineno, line, f"bad journal entry ({e})"))
+                break
+            applied += 1
+        self.entries = applied
+        return applied
+
+    def _apply(self, line, lineno):
+        op, _, rest = line.partition(",")
+        table = self.table
+        if op == "A":
+            table.append(*parse_row(rest, lineno))
+        elif op == "U":
+            pos, _, rest = rest.partition(",")
+            code, name, m1, m2, m3, exam = parse_row(rest, lineno)
+            table.update(int(pos), code=code, name=name, m1=m1, m2=m2, m3=m3, exam=exam)
+        elif op == "D":
+            table.remove(int(rest))
+        else:
+            raise RosterError(lineno, line, "unknown journal entry")
+
+    # Logging
+
+    def _write(self, line):
+        self.file.write(line + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def on_change(self, event, pos, old):
+        if self._checkpointing:
+            return
+        if event == "reset":
+            # positions were renumbered: only a full checkpoint stays valid
+            self.checkpoint()
+            return
+        if event == "delete":
+            self._write(f"D,{pos}")
+        else:
+            code, name, m1, m2, m3, exam = (self.table.value(pos, k) for k in
+                                            ("code", "name", "m1", "m2", "m3", "exam"))
+            row = f"{code},{name},{m1},{m2},{m3},{exam}"
+            self._write(f"A,{row}" if event == "add" else f"U,{pos},{row}")
+        self.entries += 1
+
+    def checkpoint(self, progress=None):
+        """
+        Fold the journal into the roster file and start an empty journal.
+        progress is passed on to write_roster(); if it raises, the roster
+        and journal are left as they were.
+        """
+        self._checkpointing = True
+        try:
+            if self.snapshot_path:
+                # the table may be mapped from the snapshot we are about to
+                # replace, which Windows refuses while the map is open
+                self.table.detach()
+            write_roster(self.table, self.roster_path, progress)
+            # only now renumber positions to match the new roster: if the
+            # write fails, the journal still describes the table
+            self.table.compact()
+            if self.snapshot_path:
+                write_snapshot(self.table, self.snapshot_path, source_stamp(self.roster_path))
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f"B,{_stat_key(self.roster_path)}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            try:
+                os.replace(tmp, self.path)
+                _fsync_dir(self.path)
+                self.entries = 0
+            finally:
+                self.file = open(self.path, "a", encoding="utf-8")
+        finally:
+            self._checkpointing = False
@@ -0,0 +1,62 @@
+"""
+Opening and saving the roster as a whole.
+
+These run on the background worker (see background.py): each takes the
+Task first and reports progress / checks for cancellation through it.
+"""
+
+from background import Cancelled
+from student_index import StudentIndex
+from student_journal import Journal
+from student_snapshot import SnapshotError, is_current, load_snapshot, source_stamp, write_snapshot
+from student_store import StudentTable, ensure_roster
+
+
+def load_students(path, errors=None, snapshot=None, progress=None):
+    """Load the roster from its snapshot when that is current, else parse the text file"""
+    if ensure_roster(path):
+        return StudentTable()
+    if snapshot and is_current(snapshot, path):
+        try:
+            return load_snapshot(snapshot)
+        except (OSError, SnapshotError):
+            pass    # unreadable snapshot: fall back to the text roster
+    errors = errors if errors is not None else []
+    table = StudentTable.from_file(path, errors, progress)
+    if snapshot and not errors:
+        # lines with errors must be reported again next time, so only a
+        # clean roster gets a snapshot
+        try:
+            write_snapshot(table, snapshot, source_stamp(path))
+        except OSError:
+            pass
+    return table
+
+
+def open_roster(task, path, snapshot=None):
+    """
+    Load the roster, replay unsaved edits from the journal and index it.
+    Runs on the background worker; returns (students, journal, index, errors).
+    """
+    errors = []
+    students = load_students(path, errors, snapshot, progress=task.progress)
+    task.check()
+    journal = Journal.open(path, students, errors, snapshot_path=snapshot)
+    index = StudentIndex(students)
+    try:
+        task.check()
+        index.build()
+        task.check()
+    except Cancelled:
+        index.close()
+        journal.close()
+        raise
+    return students, journal, index, errors
+
+
+def save_roster(task, journal, index):
+    """Fold the journal into the roster file; runs on the background worker"""
+    journal.checkpoint(progress=task.progress)
+    # the checkpoint renumbered the rows: rebuild the index here rather
+    # than on the first search
+    index.ensure_built()
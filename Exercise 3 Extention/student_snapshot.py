@@ -0,0 +1,223 @@
+"""
+Binary snapshot of a StudentTable for fast cold starts.
+
+studentMarks.bin holds the table's columns exactly as they sit in memory,
+so loading it is a memory map plus a few memoryview casts instead of
+parsing every line of studentMarks.txt. Layout (little-endian):
+
+    header   magic, version, row count, crc32 of everything after the
+             header, name count, heap size, and the size / mtime_ns of the
+             text roster the snapshot was made from
+    code, m1, m2, m3, exam     row count x uint16 each
+    name_id                    row count x uint32
+    name offsets               (name count + 1) x uint32
+    name heap                  UTF-8 names back to back
+
+Every section starts on an 8-byte boundary. Only live rows are written,
+so positions in a snapshot match those of a fresh load of the text
+roster it was made from.
+
+Run as a script to convert between the two formats:
+
+    python student_snapshot.py to-bin studentMarks.txt [studentMarks.bin]
+    python student_snapshot.py to-txt studentMarks.bin [studentMarks.txt]
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from student_store import NamePool, StudentTable, write_roster
+
+MAGIC = b"STBS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIQQ")
+ALIGN = 8
+MARK_COLUMNS = ("code", "m1", "m2", "m3", "exam")
+TYPECODES = {"code": "H", "m1": "H", "m2": "H", "m3": "H", "exam": "H",
+             "name_id": "I", "offsets": "I"}
+
+
+class SnapshotError(ValueError):
+    """A snapshot file that is truncated, corrupt or of another version."""
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def source_stamp(path):
+    """(size, mtime_ns) of the text roster, used to tell if a snapshot is stale"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def read_header(path):
+    """Return the header fields as a dict, or raise SnapshotError"""
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    return _parse_header(data)
+
+
+def _parse_header(data):
+    if len(data) < HEADER.size:
+        raise SnapshotError("truncated header")
+    magic, version, _, count, crc, pool, heap, src_size, src_mtime = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a student snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    return {"count": count, "crc": crc, "pool": pool, "heap": heap,
+            "source": (src_size, src_mtime)}
+
+
+def is_current(path, source_path):
+    """True if path is a readable snapshot made from source_path as it is now"""
+    try:
+        return read_header(path)["source"] == source_stamp(source_path)
+    except (OSError, SnapshotError):
+        return False
+
+
+def _sections(count, pool, heap):
+    """(name, byte offset, byte length) of every section after the header"""
+    sizes = [(k, 2 * count) for k in MARK_COLUMNS]
+    sizes += [("name_id", 4 * count), ("offsets", 4 * (pool + 1)), ("heap", heap)]
+    offset = HEADER.size + _pad(HEADER.size)
+    out = []
+    for name, size in sizes:
+        out.append((name, offset, size))
+        offset += size + _pad(size)
+    return out, offset
+
+
+def write_snapshot(table, path, source=None):
+    """
+    Write the live rows of table to path atomically. source is the
+    (size, mtime_ns) stamp of the text roster the table matches.
+    """
+    columns = {k: getattr(table, k) for k in MARK_COLUMNS + ("name_id",)}
+    if table.live != table.size:
+        live = list(table.positions())
+        columns = {k: array(TYPECODES[k], map(col.__getitem__, live))
+                   for k, col in columns.items()}
+    names = table.names
+    columns["offsets"] = names.offsets
+    columns["heap"] = names.heap
+    if sys.byteorder != "little":
+        for k in MARK_COLUMNS + ("name_id", "offsets"):
+            col = array(TYPECODES[k], columns[k])
+            col.byteswap()
+            columns[k] = col
+
+    sections, end = _sections(table.live, len(names), len(names.heap))
+    body_start = HEADER.size + _pad(HEADER.size)
+    body = bytearray()
+    for name, offset, size in sections:
+        body += bytes(offset - body_start - len(body))
+        body += memoryview(columns[name]).cast("B")
+    body += bytes(end - body_start - len(body))
+    src_size, src_mtime = source or (0, 0)
+    crc = zlib.crc32(body)
+    header = HEADER.pack(MAGIC, VERSION, 0, table.live, crc, len(names), len(names.heap),
+                         src_size, src_mtime)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(bytes(_pad(HEADER.size)))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(path, verify=False):
+    """
+    Open a snapshot as a StudentTable whose columns are read-only views of
+    a memory map; the table copies them the first time it is edited.
+    verify=True checks the crc32 of the whole file first, which reads it
+    all and so costs most of what the mapping saves.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            raise SnapshotError("truncated header")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        table = _from_buffer(mm, verify)
+    except Exception:
+        mm.close()
+        raise
+    if sys.byteorder != "little":
+        # columns were copied and byte-swapped: nothing borrows the map
+        mm.close()
+    else:
+        table.mapping = mm
+    return table
+
+
+def _from_buffer(buf, verify):
+    info = _parse_header(buf[:HEADER.size])
+    count, pool, heap = info["count"], info["pool"], info["heap"]
+    sections, end = _sections(count, pool, heap)
+    if len(buf) < end:
+        raise SnapshotError("truncated snapshot")
+    body_start = HEADER.size + _pad(HEADER.size)
+    view = memoryview(buf)
+    if verify and zlib.crc32(view[body_start:end]) != info["crc"]:
+        view.release()
+        raise SnapshotError("checksum mismatch")
+
+    parts = {}
+    for name, offset, size in sections:
+        part = view[offset:offset + size]
+        if name == "heap":
+            parts[name] = part
+        elif sys.byteorder != "little":
+            col = array(TYPECODES[name])
+            col.frombytes(part)
+            col.byteswap()
+            parts[name] = col
+        else:
+            parts[name] = part.cast(TYPECODES[name])
+    if sys.byteorder != "little":
+        parts["heap"] = bytearray(parts["heap"])
+
+    table = StudentTable()
+    for k in MARK_COLUMNS + ("name_id",):
+        setattr(table, k, parts[k])
+    table.names = NamePool(parts["heap"], parts["offsets"])
+    table.alive = bytearray(b"\x01") * count
+    table.live = count
+    return table
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Convert between text and binary rosters")
+    ap.add_argument("direction", choices=("to-bin", "to-txt"))
+    ap.add_argument("src")
+    ap.add_argument("dst", nargs="?")
+    ap.add_argument("--verify", action="store_true", help="check the snapshot checksum")
+    args = ap.parse_args(argv)
+    base = os.path.splitext(args.src)[0]
+    if args.direction == "to-bin":
+        dst = args.dst or base + ".bin"
+        write_snapshot(StudentTable.from_file(args.src), dst, source_stamp(args.src))
+    else:
+        dst = args.dst or base + ".txt"
+        table = load_snapshot(args.src, verify=args.verify)
+        write_roster(table, dst)
+        table.detach()
+    print(f"wrote {dst}")
+
+
+if __name__ == "__main__":
+    main()
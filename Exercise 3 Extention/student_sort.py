@@ -0,0 +1,207 @@
+"""
+Sort engine for the Student Manager.
+
+Sorting never reorders the StudentTable: it returns a permutation of the
+live row positions, which the record view then walks. Permutations are
+cached on the table per sort key, so sorting an unchanged roster again is
+a dictionary lookup, and the roster keeps its original order. Top-K
+results are cached per sort key too, keeping only the largest K.
+
+A sort key is a tuple of (field, descending) pairs, e.g.
+
+    (("grade", False), ("percentage", True), ("name", False))
+
+Every field is first turned into an integer column that orders the same
+way as the field itself (names by their rank in the name pool, grades by
+letter, percentage by total), so multi-key sorts compare small ints and
+top-K selection never has to materialise whole records. Ties keep table
+order. NumPy is used when it is installed.
+"""
+
+import heapq
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FIELDS = ("code", "name", "m1", "m2", "m3", "exam", "coursework", "total", "percentage", "grade")
+
+# totals (out of 160) at which each grade starts, best first: 70%, 60%, 50%, 40%
+GRADE_TOTALS = (112, 96, 80, 64)
+
+
+def parse_keys(text, descending=False):
+    """
+    Parse 'grade, percentage d, name' into a sort key. Each field may be
+    followed by 'a' or 'd'; otherwise `descending` decides. Raises
+    ValueError naming the first unknown field.
+    """
+    keys = []
+    for part in text.split(","):
+        words = part.lower().split()
+        if not words:
+            continue
+        field, desc = words[0], descending
+        if len(words) > 1 and words[1] in ("a", "asc", "d", "desc"):
+            desc = words[1].startswith("d")
+        elif len(words) > 1:
+            raise ValueError(part.strip())
+        if field not in FIELDS:
+            raise ValueError(field)
+        keys.append((field, desc))
+    if not keys:
+        raise ValueError(text)
+    return tuple(keys)
+
+
+def _name_ranks(table):
+    """rank[name_id] = place of that name in case-insensitive order"""
+    names = table.names
+    text = names.ascii_text()
+    if text is not None:
+        # byte offsets are character offsets: lowercase the heap in one go
+        text, offsets = text.lower(), names.offsets
+        lowered = [text[offsets[i]:offsets[i + 1]] for i in range(len(names))]
+    else:
+        lowered = [names[i].lower() for i in range(len(names))]
+    ids = sorted(range(len(names)), key=lowered.__getitem__)
+    ranks = array("I", bytes(4 * len(names)))
+    rank = prev = None
+    for n, i in enumerate(ids):
+        low = lowered[i]
+        if low != prev:
+            rank, prev = n, low
+        ranks[i] = rank
+    return ranks
+
+
+def _grade_ranks(table):
+    """rank of the grade for every possible total; A is 0, as the letters sort"""
+    totals = table.column("total")
+    top = max(totals, default=0)
+    return bytes(sum(t < g for g in GRADE_TOTALS) for t in range(top + 1))
+
+
+def key_column(table, field):
+    """Integer column, indexed by position, that sorts like `field`"""
+    def compute(t):
+        if field in ("code", "m1", "m2", "m3", "exam", "coursework", "total"):
+            return t.column(field)
+        if field == "percentage":
+            return t.column("total")
+        if field == "name":
+            ranks = t.cached("name_ranks", _name_ranks)
+            return array("I", map(ranks.__getitem__, t.name_id))
+        if field == "grade":
+            ranks = _grade_ranks(t)
+            return array("B", map(ranks.__getitem__, t.column("total")))
+        raise KeyError(field)
+    return table.cached(("key_column", field), compute)
+
+
+def _np_column(table, field):
+    return table.cached(("np_key_column", field),
+                        lambda t: np.asarray(key_column(t, field)).astype(np.int64))
+
+
+class SortEngine:
+    def __init__(self, table, use_numpy=True):
+        self.table = table
+        self.use_numpy = use_numpy and np is not None
+
+    def order(self, keys):
+        """Live positions sorted by keys, as an indexable sequence (cached)"""
+        return self.table.cached(("order", keys), lambda t: self._order(keys))
+
+    def top(self, keys, k):
+        """The first k positions of order(keys), without sorting the rest"""
+        table = self.table
+        if k <= 0:
+            return array("I")
+        if k >= len(table):
+            return self.order(keys)
+        full = table.peek(("order", keys))
+        if full is not None:
+            return full[:k]
+        # one entry per key: the largest k asked for so far, which holds
+        # the answer for every smaller k
+        best = table.peek(("top", keys))
+        if best is not None and len(best) >= k:
+            return best[:k]
+        return table.remember(("top", keys), self._top(keys, k))[:k]
+
+    # Python path
+
+    def _getters(self, keys):
+        getters = []
+        for field, desc in keys:
+            col = key_column(self.table, field)
+            getters.append((lambda p, c=col: -c[p]) if desc else col.__getitem__)
+        return getters
+
+    def _sort_key(self, keys):
+        getters = self._getters(keys)
+        if len(getters) == 1:
+            return getters[0]
+        return lambda p: tuple(g(p) for g in getters)
+
+    def _order(self, keys):
+        if self.use_numpy:
+            return self._order_numpy(keys)
+        table = self.table
+        if len(keys) == 1:
+            # a reverse sort is still stable, so ties keep table order
+            field, desc = keys[0]
+            return array("I", sorted(table.positions(),
+                                     key=key_column(table, field).__getitem__, reverse=desc))
+        return array("I", sorted(table.positions(), key=self._sort_key(keys)))
+
+    def _top(self, keys, k):
+        if self.use_numpy:
+            return self._top_numpy(keys, k)
+        # nsmallest is equivalent to sorted(...)[:k], ties included
+        return array("I", heapq.nsmallest(k, self.table.positions(), key=self._sort_key(keys)))
+
+    # NumPy path
+
+    def _live(self):
+        table = self.table
+        if table.live == table.size:
+            return None
+        return np.flatnonzero(np.frombuffer(table.alive, dtype=np.uint8))
+
+    def _np_keys(self, keys, pos):
+        cols = []
+        for field, desc in keys:
+            col = _np_column(self.table, field)
+            if pos is not None:
+                col = col[pos]
+            cols.append(-col if desc else col)
+        return cols
+
+    def _order_numpy(self, keys):
+        pos = self._live()
+        cols = self._np_keys(keys, pos)
+        # lexsort is stable and takes its primary key last
+        order = np.lexsort(cols[::-1])
+        if pos is not None:
+            order = pos[order]
+        return array("I", order.astype(np.uint32).tobytes())
+
+    def _top_numpy(self, keys, k):
+        pos = self._live()
+        cols = self._np_keys(keys, pos)
+        # everything in the top k has a primary key no worse than the k-th
+        # smallest one, so only those candidates need a full sort
+        kth = np.partition(cols[0], k - 1)[k - 1]
+        cand = np.flatnonzero(cols[0] <= kth)
+        order = cand[np.lexsort([c[cand] for c in cols[::-1]])[:k]]
+        if pos is not None:
+            order = pos[order]
+        return array("I", order.astype(np.uint32).tobytes())
+
+
+def describe(keys):
+    return ", ".join(f"{field} {'desc' if desc else 'asc'}" for field, desc in keys)
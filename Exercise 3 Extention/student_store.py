@@ -0,0 +1,521 @@
+"""
+Data layer for the Student Manager.
+
+Reads studentMarks.txt line by line so that large rosters never have to be
+held in memory as raw text. File layout:
+
+    <number of students>
+    code,name,m1,m2,m3,exam
+    ...
+"""
+
+import os
+from array import array
+from itertools import compress, islice
+from operator import add
+
+# every code and mark is stored in an unsigned 16-bit column
+MAX_FIELD = 0xFFFF
+BASE_FIELDS = ("code", "name", "m1", "m2", "m3", "exam")
+DERIVED_FIELDS = ("coursework", "total", "percentage", "grade")
+
+
+def to_int(x, default=0):
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return default
+
+def grade_from_percentage(p):
+    if p >= 70: return "A"
+    if p >= 60: return "B"
+    if p >= 50: return "C"
+    if p >= 40: return "D"
+    return "F"
+
+def recalc(s):
+    s['coursework'] = s['m1'] + s['m2'] + s['m3']
+    s['total'] = s['coursework'] + s['exam']
+    s['percentage'] = (s['total'] / 160.0) * 100
+    s['grade'] = grade_from_percentage(s['percentage'])
+
+
+class RosterError(ValueError):
+    """A line of the roster file that could not be parsed."""
+
+    def __init__(self, lineno, line, reason):
+        super().__init__(lineno, line, reason)
+        self.lineno = lineno
+        self.line = line
+        self.reason = reason
+
+    def __str__(self):
+        return f"line {self.lineno}: {self.reason}: {self.line!r}"
+
+
+def parse_row(line, lineno=0):
+    """Parse one 'code,name,m1,m2,m3,exam' line into a (code, name, m1, m2, m3, exam) tuple"""
+    parts = line.split(",")
+    if len(parts) != 6:
+        raise RosterError(lineno, line, f"expected 6 fields, got {len(parts)}")
+    try:
+        code = int(parts[0])
+        marks = [int(p) for p in parts[2:]]
+    except ValueError:
+        raise RosterError(lineno, line, "code and marks must be integers") from None
+    if not 0 <= code <= MAX_FIELD:
+        raise RosterError(lineno, line, "code out of range")
+    if not all(0 <= m <= MAX_FIELD for m in marks):
+        raise RosterError(lineno, line, "marks out of range")
+    name = parts[1].strip()
+    if not name:
+        raise RosterError(lineno, line, "missing name")
+    return (code, name, *marks)
+
+
+def parse_student(line, lineno=0):
+    """Parse one 'code,name,m1,m2,m3,exam' line into a record dict"""
+    return dict(zip(BASE_FIELDS, parse_row(line, lineno)))
+
+
+PROGRESS_EVERY = 1 << 16    # lines / rows between progress() calls
+
+
+def iter_rows(path, errors=None, progress=None):
+    """
+    Yield one (code, name, m1, m2, m3, exam) tuple per student line,
+    reading the file lazily.
+
+    Malformed lines raise RosterError, unless an `errors` list is given,
+    in which case the error is appended to it and parsing carries on.
+    progress(bytes_read, file_size) is called every few thousand lines;
+    anything it raises stops the read.
+    """
+    size = os.path.getsize(path) if progress is not None else 0
+    done = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, ln in enumerate(f, start=1):
+            if progress is not None:
+                done += len(ln)     # characters: close enough to bytes here
+                if not lineno % PROGRESS_EVERY:
+                    progress(min(done, size), size)
+            ln = ln.strip()
+            if not ln:
+                continue
+            try:
+                if lineno == 1:
+                    # header line holds the student count
+                    if to_int(ln, None) is None:
+                        raise RosterError(lineno, ln, "header must be the number of students")
+                    continue
+                row = parse_row(ln, lineno)
+            except RosterError as e:
+                if errors is None:
+                    raise
+                errors.append(e)
+                continue
+            yield row
+
+
+def iter_students(path, errors=None):
+    """Like iter_rows(), but yield full record dicts including derived marks"""
+    for row in iter_rows(path, errors):
+        s = dict(zip(BASE_FIELDS, row))
+        recalc(s)
+        yield s
+
+
+def ensure_roster(path):
+    """Create an empty roster file (and its folder) if it is missing"""
+    if os.path.exists(path):
+        return False
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("0\n")
+    return True
+
+
+def write_roster(table, path, progress=None):
+    """
+    Write the live rows of table to path atomically: the data goes to a
+    temp file that is fsynced and then renamed over the old roster.
+    progress(rows_written, rows) is called every few thousand rows; if it
+    raises, the temp file is removed and the old roster is left alone.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = path + ".tmp"
+    rows = (f"{code},{name},{m1},{m2},{m3},{exam}\n"
+            for code, name, m1, m2, m3, exam in table.rows())
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f"{len(table)}\n")
+            if progress is None:
+                f.writelines(rows)
+            else:
+                n = len(table)
+                for done in range(0, n, PROGRESS_EVERY):
+                    progress(done, n)
+                    f.writelines(islice(rows, PROGRESS_EVERY))
+                progress(n, n)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+
+class StudentRow:
+    """
+    Lightweight view of one row of a StudentTable.
+
+    Supports the same s['field'] reads as the old record dicts; derived
+    fields are computed on demand. A row view is only valid until the
+    table is next reordered or compacted.
+    """
+    __slots__ = ("table", "pos")
+
+    def __init__(self, table, pos):
+        self.table = table
+        self.pos = pos
+
+    def __getitem__(self, key):
+        return self.table.value(self.pos, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        return {k: self[k] for k in BASE_FIELDS + DERIVED_FIELDS}
+
+    def __eq__(self, other):
+        return isinstance(other, StudentRow) and other.table is self.table and other.pos == self.pos
+
+    def __hash__(self):
+        return hash((id(self.table), self.pos))
+
+    def __repr__(self):
+        return f"StudentRow({self.pos}, {self['code']}, {self['name']!r})"
+
+
+class NamePool:
+    """
+    Interned, append-only pool of names.
+
+    Names are kept UTF-8 encoded back to back in one bytearray heap with an
+    array('I') of offsets, and deduplicated through an open-addressing hash
+    table of ids, so the pool holds no per-name Python objects. The heap and
+    offsets may also be read-only memoryviews (e.g. over a memory-mapped
+    snapshot); they are copied the first time a name is interned.
+    """
+
+    def __init__(self, heap=None, offsets=None):
+        self.heap = bytearray() if heap is None else heap
+        self.offsets = array("I", [0]) if offsets is None else offsets
+        self._slots = None      # id + 1 per slot, 0 = empty; built on first intern
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.raw(i).decode("utf-8")
+
+    def raw(self, i):
+        return bytes(self.heap[self.offsets[i]:self.offsets[i + 1]])
+
+    def ascii_text(self):
+        """The whole heap as one str if it is pure ASCII (offsets then index it), else None"""
+        heap = self.heap if isinstance(self.heap, bytearray) else bytes(self.heap)
+        return heap.decode("ascii") if heap.isascii() else None
+
+    def materialize(self):
+        """Swap borrowed read-only buffers for private, growable copies"""
+        if not isinstance(self.heap, bytearray):
+            self.heap = bytearray(self.heap)
+        if not isinstance(self.offsets, array):
+            offsets = array("I")
+            offsets.frombytes(self.offsets.cast("B"))
+            self.offsets = offsets
+
+    def intern(self, name):
+        if self._slots is None:
+            self.materialize()
+            self._slots = array("I", bytes(4 * 16))
+            self._grow()
+        data = name.encode("utf-8")
+        slots = self._slots
+        mask = len(slots) - 1
+        h = hash(data) & mask
+        while slots[h]:
+            i = slots[h] - 1
+            if self.heap[self.offsets[i]:self.offsets[i + 1]] == data:
+                return i
+            h = (h + 1) & mask
+        i = len(self.offsets) - 1
+        self.heap += data
+        self.offsets.append(len(self.heap))
+        slots[h] = i + 1
+        if (i + 1) * 3 >= len(slots) * 2:
+            self._grow()
+        return i
+
+    def _grow(self):
+        size = len(self._slots) * 2
+        while len(self) * 3 >= size * 2:
+            size *= 2
+        slots = array("I", bytes(size * 4))
+        mask = len(slots) - 1
+        for i in range(len(self)):
+            h = hash(self.raw(i)) & mask
+            while slots[h]:
+                h = (h + 1) & mask
+            slots[h] = i + 1
+        self._slots = slots
+
+
+class StudentTable:
+    """
+    Column store for the student roster.
+
+    Codes and marks live in array('H') columns and names in an interned
+    pool referenced by an array('I') of ids, so a student costs a handful
+    of bytes instead of a ten-key dict. Derived columns (coursework, total,
+    percentage, grade) are built on first use and cached until the next
+    mutation.
+
+    Rows are addressed by position. Removing a row only clears its flag in
+    `alive`, so positions stay stable (and indexes stay valid) until
+    compact() is called. Listeners registered with subscribe() are told
+    about every change as listener(event, pos, old), where event is one of
+    "add", "update", "delete" or "reset" and old holds the previous values
+    of the fields an update changed.
+    """
+
+    COLUMNS = {"code": "H", "m1": "H", "m2": "H", "m3": "H", "exam": "H", "name_id": "I"}
+
+    def __init__(self, rows=()):
+        self.code = array("H")
+        self.m1 = array("H")
+        self.m2 = array("H")
+        self.m3 = array("H")
+        self.exam = array("H")
+        self.name_id = array("I")
+        self.alive = bytearray()
+        self.names = NamePool()
+        self.live = 0
+        self.version = 0        # bumped on every mutation
+        self.listeners = []
+        self.mapping = None     # memory map the columns borrow from, if any
+        self._derived = {}
+        for row in rows:
+            self._append(*row)
+
+    @classmethod
+    def from_file(cls, path, errors=None, progress=None):
+        return cls(iter_rows(path, errors, progress))
+
+    # Reading
+
+    def __len__(self):
+        return self.live
+
+    def __iter__(self):
+        alive = self.alive
+        for pos in range(len(self.code)):
+            if alive[pos]:
+                yield StudentRow(self, pos)
+
+    def __getitem__(self, pos):
+        if not (0 <= pos < len(self.code) and self.alive[pos]):
+            raise IndexError("no student at position {}".format(pos))
+        return StudentRow(self, pos)
+
+    @property
+    def size(self):
+        """Number of positions, including removed rows not yet compacted"""
+        return len(self.code)
+
+    def positions(self):
+        return compress(range(len(self.code)), self.alive)
+
+    def live_positions(self):
+        """Positions of the live rows as an indexable sequence (cached)"""
+        if self.live == len(self.code):
+            return range(self.live)
+        return self.cached("live_positions", lambda t: array("I", t.positions()))
+
+    def name(self, pos):
+        return self.names[self.name_id[pos]]
+
+    def value(self, pos, key):
+        if key == "name":
+            return self.names[self.name_id[pos]]
+        if key in ("code", "m1", "m2", "m3", "exam"):
+            return getattr(self, key)[pos]
+        coursework = self.m1[pos] + self.m2[pos] + self.m3[pos]
+        if key == "coursework":
+            return coursework
+        total = coursework + self.exam[pos]
+        if key == "total":
+            return total
+        percentage = (total / 160.0) * 100
+        if key == "percentage":
+            return percentage
+        if key == "grade":
+            return grade_from_percentage(percentage)
+        raise KeyError(key)
+
+    def column(self, key):
+        """
+        Return a whole column indexed by position (removed rows included);
+        derived columns are cached per column.
+        """
+        if key in ("code", "m1", "m2", "m3", "exam"):
+            return getattr(self, key)
+        if key == "name":
+            return [self.names[i] for i in self.name_id]
+        col = self._derived.get(key)
+        if col is not None:
+            return col
+        if key == "coursework":
+            col = array("I", map(add, map(add, self.m1, self.m2), self.m3))
+        elif key == "total":
+            col = array("I", map(add, self.column("coursework"), self.exam))
+        elif key == "percentage":
+            col = array("d", (t / 160.0 * 100 for t in self.column("total")))
+        elif key == "grade":
+            col = [grade_from_percentage(p) for p in self.column("percentage")]
+        else:
+            raise KeyError(key)
+        self._derived[key] = col
+        return col
+
+    def cached(self, key, compute):
+        """Return compute(self), memoised under key until the next mutation"""
+        if key not in self._derived:
+            self._derived[key] = compute(self)
+        return self._derived[key]
+
+    def peek(self, key):
+        """The value cached under key, or None if it is not (or no longer) cached"""
+        return self._derived.get(key)
+
+    def remember(self, key, value):
+        """Cache value under key until the next mutation, replacing any earlier one"""
+        self._derived[key] = value
+        return value
+
+    def rows(self):
+        """Yield (code, name, m1, m2, m3, exam) tuples for the live rows in table order"""
+        names = self.names
+        for code, nid, m1, m2, m3, exam, alive in zip(self.code, self.name_id, self.m1,
+                                                      self.m2, self.m3, self.exam, self.alive):
+            if alive:
+                yield code, names[nid], m1, m2, m3, exam
+
+    # Writing
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _touch(self, event, pos=None, old=None):
+        self.version += 1
+        self._derived.clear()
+        for listener in self.listeners:
+            listener(event, pos, old)
+
+    def _writable(self):
+        if self.mapping is not None:
+            self.detach()
+
+    def detach(self):
+        """Copy columns borrowed from a memory map and release the map"""
+        if self.mapping is None:
+            return
+        for attr, typecode in self.COLUMNS.items():
+            col = array(typecode)
+            col.frombytes(getattr(self, attr).cast("B"))
+            setattr(self, attr, col)
+        self.names.materialize()
+        self._derived.clear()
+        try:
+            self.mapping.close()
+        except BufferError:
+            # a view is still held elsewhere; the map goes when it does
+            pass
+        self.mapping = None
+
+    def _append(self, code, name, m1, m2, m3, exam):
+        self._writable()
+        self.code.append(code)
+        self.m1.append(m1)
+        self.m2.append(m2)
+        self.m3.append(m3)
+        self.exam.append(exam)
+        self.name_id.append(self.names.intern(name))
+        self.alive.append(1)
+        self.live += 1
+        return len(self.code) - 1
+
+    def append(self, code, name, m1, m2, m3, exam):
+        pos = self._append(code, name, m1, m2, m3, exam)
+        self._touch("add", pos)
+        return StudentRow(self, pos)
+
+    def append_record(self, s):
+        return self.append(*(s[k] for k in BASE_FIELDS))
+
+    def update(self, row, **fields):
+        pos = row.pos if isinstance(row, StudentRow) else row
+        old = {}
+        for key, val in fields.items():
+            if key not in BASE_FIELDS:
+                raise KeyError(key)
+            if self.value(pos, key) != val:
+                old[key] = self.value(pos, key)
+        self._writable()
+        for key, val in fields.items():
+            if key == "name":
+                self.name_id[pos] = self.names.intern(val)
+            else:
+                getattr(self, key)[pos] = val
+        self._touch("update", pos, old)
+
+    def remove(self, row):
+        pos = row.pos if isinstance(row, StudentRow) else row
+        if not self.alive[pos]:
+            raise IndexError("student at position {} already removed".format(pos))
+        self.alive[pos] = 0
+        self.live -= 1
+        self._touch("delete", pos)
+
+    def _reorder(self, order):
+        self._writable()
+        for attr, typecode in self.COLUMNS.items():
+            old = getattr(self, attr)
+            setattr(self, attr, array(typecode, map(old.__getitem__, order)))
+        self.alive = bytearray(map(self.alive.__getitem__, order))
+        self._touch("reset")
+
+    def compact(self):
+        """Drop removed rows for good; positions change, listeners get "reset" """
+        if self.live != len(self.code):
+            self._reorder(list(self.positions()))
+
+    def sort(self, key, reverse=False):
+        """Reorder the table by one field, like list.sort(key=...)"""
+        col = self.column(key)
+        if key in ("name", "grade"):
+            col = [v.lower() for v in col]
+        self._reorder(sorted(self.positions(), key=col.__getitem__, reverse=reverse))
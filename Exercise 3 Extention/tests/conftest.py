@@ -0,0 +1,28 @@
+import os
+import sys
+import tkinter as tk
+
+import pytest
+
+# the modules under test sit in the exercise folder, one level up, and
+# import background.py from common/ as the app does
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+sys.path.append(os.path.join(HERE, os.pardir, os.pardir, "common"))
+
+
+@pytest.fixture
+def root():
+    """A Tk root for the widget tests, skipped where there is no display;
+    errors raised in callbacks are collected in root.errors"""
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("needs a display")
+    root.errors = []
+    root.report_callback_exception = lambda kind, error, tb: root.errors.append(error)
+    yield root
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass    # the test destroyed it
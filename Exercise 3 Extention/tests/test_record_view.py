@@ -0,0 +1,126 @@
+"""RecordView draws only the visible records; view_all() opens it on the roster."""
+
+import importlib.util
+import os
+import time
+import tkinter as tk
+from tkinter import messagebox
+
+import pytest
+
+from record_view import RecordView
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Ex 3 Student Manager.py")
+
+
+class Source:
+    """render() for RecordView that remembers which records it drew"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, i):
+        self.calls.append(i)
+        return f"record {i}\n-----"
+
+
+def shown(view):
+    """The record numbers on screen, top to bottom"""
+    return [int(line.split()[1]) for line in view.text.get("1.0", "end-1c").split("\n")
+            if line.startswith("record ")]
+
+
+def window(view):
+    return list(range(view.first, min(view.count, view.first + view.visible_records())))
+
+
+@pytest.mark.parametrize("count", [100, 10 ** 6])
+def test_draws_only_the_visible_records(root, count):
+    view = RecordView(root, lines_per_record=2, height=10)
+    view.pack()
+    root.update()
+    source = Source()
+    view.set_source(count, source, footer="Number of students: many")
+    visible = view.visible_records()
+    assert source.calls == list(range(visible)) == shown(view)
+    assert view.footer.cget("text") == "Number of students: many"
+    first, last = view.scrollbar.get()
+    assert first == 0 and last == pytest.approx(visible / count)
+
+
+def test_scrolling(root):
+    view = RecordView(root, lines_per_record=2, height=10)
+    view.pack()
+    source = Source()
+    view.set_source(1000, source)
+    visible = view.visible_records()
+
+    view.scroll(5)
+    assert view.first == 5 and shown(view) == window(view)
+    view.yview("scroll", "1", "pages")
+    assert view.first == 5 + visible
+    view.yview("scroll", "-2", "units")
+    assert view.first == 3 + visible
+    view.yview("moveto", "0.5")
+    assert view.first == 500 and shown(view) == window(view)
+    # the last record is always in view, and nothing before the first
+    view.scroll_to(10 ** 9)
+    assert view.first == 1000 - visible + 1 and shown(view)[-1] == 999
+    view.scroll_to(-5)
+    assert view.first == 0 and shown(view) == window(view)
+    # every scroll redrew its own window and nothing more
+    assert len(source.calls) <= 7 * visible
+
+
+def test_short_and_empty_sources(root):
+    view = RecordView(root, lines_per_record=2, height=10)
+    view.pack()
+    view.set_source(3, Source())
+    view.scroll(10)
+    assert view.first == 0 and shown(view) == [0, 1, 2]
+    view.set_source(0, Source(), footer="none")
+    assert shown(view) == [] and view.scrollbar.get() == (0.0, 1.0)
+    view.set_footer("still none")
+    assert view.footer.cget("text") == "still none"
+
+
+def test_caption_on_top(root):
+    view = RecordView(root, lines_per_record=1, caption_side=tk.TOP, caption_opts={"fg": "red"})
+    assert view.footer.pack_info()["side"] == "top" and view.footer.cget("fg") == "red"
+    assert RecordView(root, lines_per_record=1).footer.pack_info()["side"] == "bottom"
+
+
+def test_view_all(root, tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("student_manager", APP)
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    roster = str(tmp_path / "studentMarks.txt")
+    with open(roster, "w", encoding="utf-8") as f:
+        f.write("500\n" + "".join(f"{1000 + i},Student {i},{i % 20},5,6,{i % 100}\n" for i in range(500)))
+    monkeypatch.setattr(app_module, "DATA_FILE", roster)
+    monkeypatch.setattr(app_module, "SNAPSHOT_FILE", str(tmp_path / "studentMarks.bin"))
+    for box in ("showinfo", "showwarning", "showerror"):
+        monkeypatch.setattr(messagebox, box, lambda *a, box=box, **kw: root.errors.append((box, a)))
+
+    app = app_module.StudentManager(root)
+    deadline = time.monotonic() + 10
+    while app.index is None or app.tasks.busy:
+        assert time.monotonic() < deadline, "the roster did not load"
+        root.update()
+        time.sleep(0.01)
+    try:
+        # install_roster opened the view; opening it again draws the same
+        app.view_all()
+        root.update()
+        records = app.records
+        assert app.showing_records and records.count == 500
+        text = records.text.get("1.0", "end-1c")
+        assert text.startswith(app.format_student(app.students[0]))
+        assert text.count("Student Number:") == records.visible_records() < 500
+        footer = records.footer.cget("text")
+        assert "Number of students: 500" in footer and "Grades: " in footer
+        assert root.errors == []
+    finally:
+        app.tasks.shutdown()
+        app.journal.close()
+        app.index.close()
@@ -0,0 +1,93 @@
+"""StudentIndex lookups against a linear scan, as the table is edited."""
+
+import random
+
+import pytest
+
+import student_index
+from student_index import StudentIndex
+from student_store import StudentTable
+
+FIRST = ["Lee", "Jo", "Amy", "Priya", "Zoë", "Al", "x"]
+LAST = ["Scott", "Hyde", "Curry", "O'Neil", "Ng"]
+KEYS = ["", "a", "jo", "o", "e ", "zo", "zoë", "lee", "scott 1", "7", "42", "x", "qq", "ab",
+        "'n", "hyde 9", "LEE SCOTT", "²", "4²", "٤٢"]
+
+
+def random_name(rng):
+    if rng.random() < 0.1:
+        return rng.choice(["A", "Jo", "ab"])
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.randint(0, 99)}"
+
+
+def linear(table, key):
+    key = key.lower().strip()
+    code = int(key) if key.isascii() and key.isdigit() and str(int(key)) == key else None
+    return [p for p in table.positions() if key in table.name(p).lower() or table.code[p] == code]
+
+
+def paged(index, key, limit):
+    found, after = [], -1
+    while after is not None:
+        page = index.page(key, after, limit=limit)
+        assert len(page.positions) <= limit
+        found += page.positions
+        after = page.next
+    return found
+
+
+def edit(table, rng, n):
+    for _ in range(n):
+        r = rng.random()
+        live = list(table.positions())
+        if r < 0.4 or not live:
+            table.append(rng.randint(1, 50), random_name(rng), 1, 2, 3, 4)
+        elif r < 0.7:
+            table.update(rng.choice(live), name=random_name(rng))
+        elif r < 0.85:
+            table.update(rng.choice(live), code=rng.randint(1, 50))
+        else:
+            table.remove(rng.choice(live))
+
+
+# (EXACT_MAX, VERIFY_MAX): as shipped, then small enough that the
+# windowed, dense and cut-short paths all run on a small table
+@pytest.mark.parametrize("exact, verify", [(student_index.EXACT_MAX, student_index.VERIFY_MAX),
+                                           (8, 1 << 15), (8, 50)])
+def test_find_and_pages_match_a_scan(monkeypatch, exact, verify):
+    monkeypatch.setattr(student_index, "EXACT_MAX", exact)
+    monkeypatch.setattr(student_index, "VERIFY_MAX", verify)
+    rng = random.Random(exact * verify)
+    table = StudentTable([(rng.randint(1, 50), random_name(rng), 1, 2, 3, 4) for _ in range(2000)])
+    index = StudentIndex(table)
+    for _ in range(6):
+        for key in KEYS:
+            expected = linear(table, key)
+            assert index.find(key) == expected, key
+            assert paged(index, key, 37) == expected, key
+        edit(table, rng, 150)
+    index.close()
+
+
+def test_code_and_prefix():
+    table = StudentTable([(10, "Amy Ng", 1, 2, 3, 4), (11, "al Hyde", 1, 2, 3, 4),
+                          (10, "Jo Curry", 1, 2, 3, 4), (12, "Alan Scott", 1, 2, 3, 4)])
+    index = StudentIndex(table)
+    assert index.code(10) == [0, 2]
+    assert index.prefix("AL") == [1, 3]
+    table.remove(0)
+    table.update(3, name="Zed")
+    assert index.code(10) == [2]
+    assert index.prefix("al") == [1]
+    index.close()
+
+
+def test_compact_rebuilds():
+    table = StudentTable([(i, f"Name {i}", 1, 2, 3, 4) for i in range(1, 30)])
+    index = StudentIndex(table)
+    assert index.find("name 2") == linear(table, "name 2")
+    for pos in range(0, 29, 3):
+        table.remove(pos)
+    table.compact()
+    assert index.find("name 2") == linear(table, "name 2")
+    index.close()
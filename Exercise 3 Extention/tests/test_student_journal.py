@@ -0,0 +1,109 @@
+"""Journal replay after a restart, checkpoints, and damaged or stale journals."""
+
+import os
+
+import pytest
+
+from student_journal import Journal
+from student_snapshot import is_current, load_snapshot
+from student_store import StudentTable, write_roster
+
+ROWS = [(1001, "Amy Ng", 10, 11, 12, 50), (1002, "Jo Curry", 20, 20, 20, 100),
+        (1003, "Lee Scott", 5, 6, 7, 30), (1004, "Zoë Hyde", 15, 14, 13, 70)]
+
+
+@pytest.fixture
+def roster(tmp_path):
+    path = str(tmp_path / "studentMarks.txt")
+    write_roster(StudentTable(ROWS), path)
+    return path
+
+
+def reopen(path, errors=None, snapshot=None):
+    table = StudentTable.from_file(path)
+    return table, Journal.open(path, table, errors, snapshot_path=snapshot)
+
+
+def edit(table):
+    table.append(1005, "Priya Al", 1, 2, 3, 4)
+    table.update(1, name="Jo Curry-Hyde", exam=99)
+    table.remove(2)
+
+
+def test_edits_survive_a_restart(roster):
+    table, journal = reopen(roster)
+    assert journal.replayed == 0
+    edit(table)
+    expected = list(table.rows())
+    assert journal.entries == 3
+    journal.close()
+
+    table, journal = reopen(roster)
+    assert journal.replayed == 3
+    assert list(table.rows()) == expected
+    # new edits go after the replayed ones
+    table.remove(0)
+    expected = list(table.rows())
+    journal.close()
+    table, journal = reopen(roster)
+    assert journal.replayed == 4 and list(table.rows()) == expected
+    journal.close()
+
+
+def test_checkpoint_folds_the_journal_in(roster, tmp_path):
+    snapshot = str(tmp_path / "studentMarks.bin")
+    table, journal = reopen(roster, snapshot=snapshot)
+    edit(table)
+    expected = list(table.rows())
+    journal.checkpoint()
+    assert journal.entries == 0 and table.live == table.size
+    journal.close()
+
+    assert list(StudentTable.from_file(roster).rows()) == expected
+    assert is_current(snapshot, roster)
+    assert list(load_snapshot(snapshot).rows()) == expected
+    table, journal = reopen(roster)
+    assert journal.replayed == 0 and list(table.rows()) == expected
+    journal.close()
+
+
+def test_torn_last_entry_is_dropped(roster):
+    table, journal = reopen(roster)
+    edit(table)
+    journal.close()
+    with open(roster + ".journal", "a", encoding="utf-8") as f:
+        f.write("A,1006,Half Writ")
+    table, journal = reopen(roster)
+    assert journal.replayed == 3
+    table.append(1007, "After Tear", 1, 1, 1, 1)
+    journal.close()
+    table, journal = reopen(roster)
+    assert journal.replayed == 4 and table.value(table.size - 1, "name") == "After Tear"
+    journal.close()
+
+
+def test_bad_entry_keeps_what_came_before(roster):
+    table, journal = reopen(roster)
+    table.append(1005, "Priya Al", 1, 2, 3, 4)
+    journal.close()
+    with open(roster + ".journal", "a", encoding="utf-8") as f:
+        f.write("D,99\nA,1008,Never Seen,1,1,1,1\n")
+    errors = []
+    table, journal = reopen(roster, errors)
+    assert journal.replayed == 1 and len(errors) == 1
+    # the recovered edit was checkpointed; the rest is gone
+    assert [r[1] for r in table.rows()][-1] == "Priya Al"
+    journal.close()
+    assert [r[1] for r in StudentTable.from_file(roster).rows()][-1] == "Priya Al"
+
+
+def test_journal_of_another_roster_is_not_replayed(roster):
+    table, journal = reopen(roster)
+    edit(table)
+    journal.close()
+    # the roster is rewritten behind the journal's back
+    write_roster(StudentTable(ROWS[:2]), roster)
+    table, journal = reopen(roster)
+    assert journal.replayed == 0 and len(table) == 2
+    assert os.path.exists(roster + ".journal.stale")
+    journal.close()
@@ -0,0 +1,70 @@
+"""Binary snapshots: round trips, staleness and damaged files."""
+
+import random
+
+import pytest
+
+from student_snapshot import SnapshotError, is_current, load_snapshot, source_stamp, write_snapshot
+from student_store import StudentTable, write_roster
+
+
+def columns(table):
+    return [(table.code[p], table.name(p), table.m1[p], table.m2[p], table.m3[p], table.exam[p])
+            for p in table.positions()]
+
+
+@pytest.fixture
+def table():
+    rng = random.Random(3)
+    names = ["Amy Ng", "Jo Curry", "Zoë Hyde", "Łukasz", "O'Neil"]
+    return StudentTable([(rng.randint(1000, 9999), rng.choice(names) + f" {i}",
+                          rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20),
+                          rng.randint(0, 100)) for i in range(500)])
+
+
+def test_round_trip(tmp_path, table):
+    path = str(tmp_path / "s.bin")
+    table.remove(7)
+    table.update(8, name="Renamed", exam=1)
+    write_snapshot(table, path, (123, 456))
+    loaded = load_snapshot(path, verify=True)
+    assert columns(loaded) == columns(table)
+    assert len(loaded) == len(table) == 499
+    loaded.detach()
+
+
+def test_loaded_table_can_be_edited(tmp_path, table):
+    path = str(tmp_path / "s.bin")
+    write_snapshot(table, path)
+    loaded = load_snapshot(path)
+    loaded.append(1, "New Row", 1, 2, 3, 4)
+    loaded.update(0, name="Changed")
+    table.append(1, "New Row", 1, 2, 3, 4)
+    table.update(0, name="Changed")
+    assert columns(loaded) == columns(table)
+    # the file itself is untouched
+    assert len(load_snapshot(path)) == 500
+
+
+def test_stale_when_the_roster_changes(tmp_path, table):
+    roster, path = str(tmp_path / "r.txt"), str(tmp_path / "s.bin")
+    write_roster(table, roster)
+    write_snapshot(table, path, source_stamp(roster))
+    assert is_current(path, roster)
+    table.remove(0)
+    write_roster(table, roster)
+    assert not is_current(path, roster)
+
+
+def test_damaged_files_are_refused(tmp_path, table):
+    path = str(tmp_path / "s.bin")
+    write_snapshot(table, path)
+    with open(path, "rb") as f:
+        data = f.read()
+    bad = str(tmp_path / "bad.bin")
+    for damaged in (data[:10], data[:len(data) // 2], b"NOPE" + data[4:],
+                    data[:-40] + bytes(b ^ 0xFF for b in data[-40:])):
+        with open(bad, "wb") as f:
+            f.write(damaged)
+        with pytest.raises(SnapshotError):
+            load_snapshot(bad, verify=True)
@@ -0,0 +1,96 @@
+"""SortEngine orders and top-K against a plain sort of the rows."""
+
+import random
+
+import pytest
+
+import student_sort
+from student_sort import SortEngine, describe, parse_keys
+from student_store import StudentTable
+
+NAMES = ["amy ng", "Amy Ng", "Jo Curry", "al hyde", "Zoë Scott", "Lee", "lee", "Priya O'Neil"]
+KEYS = [(("code", False),), (("name", False),), (("name", True),), (("percentage", True),),
+        (("grade", False), ("name", False)), (("grade", False), ("percentage", True), ("code", False)),
+        (("exam", True), ("coursework", False)), (("m1", False), ("m2", True), ("m3", False))]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def use_numpy(request):
+    if request.param == "numpy" and student_sort.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param == "numpy"
+
+
+def plain(table, pos, field):
+    if field == "name":
+        return table.name(pos).lower()
+    return table.value(pos, field)
+
+
+def expected(table, keys):
+    """Stable sorts from the last key to the first, straight from the rows"""
+    order = list(table.positions())
+    for field, desc in reversed(keys):
+        order.sort(key=lambda p: plain(table, p, field), reverse=desc)
+    return order
+
+
+def make_table(seed, n=600):
+    # narrow ranges, so every key has plenty of ties
+    rng = random.Random(seed)
+    table = StudentTable([(rng.randint(1, 30), rng.choice(NAMES), rng.randint(0, 20), rng.randint(0, 20),
+                           rng.randint(0, 20), rng.randint(0, 100)) for _ in range(n)])
+    for pos in rng.sample(range(n), n // 10):
+        table.remove(pos)
+    return table, rng
+
+
+def test_order_matches_a_sort(use_numpy):
+    table, rng = make_table(1)
+    engine = SortEngine(table, use_numpy=use_numpy)
+    for _ in range(3):
+        for keys in KEYS:
+            assert list(engine.order(keys)) == expected(table, keys), describe(keys)
+        live = list(table.positions())
+        for pos in rng.sample(live, 20):
+            table.update(pos, exam=rng.randint(0, 100), name=rng.choice(NAMES))
+        table.append(7, "New Student", 1, 2, 3, 4)
+
+
+def test_top_matches_the_full_sort_after_an_update(use_numpy):
+    table, rng = make_table(2)
+    engine = SortEngine(table, use_numpy=use_numpy)
+    sizes = [1, 5, 37, 3, 200, len(table) - 1, len(table), len(table) + 5, 0]
+    for _ in range(3):
+        for keys in KEYS:
+            # asked before order(), so top() has to select on its own
+            want = expected(table, keys)
+            for k in sizes:
+                assert list(engine.top(keys, k)) == want[:k], (describe(keys), k)
+        pos = rng.choice(list(table.positions()))
+        table.update(pos, m1=20, m2=20, m3=20, exam=100)
+        assert list(engine.top((("percentage", True),), 1)) == expected(table, (("percentage", True),))[:1]
+
+
+def test_one_top_entry_per_key(use_numpy):
+    table, _ = make_table(3)
+    engine = SortEngine(table, use_numpy=use_numpy)
+    keys = (("percentage", True), ("name", False))
+    engine.top(keys, 5)
+    engine.top(keys, 50)
+    engine.top(keys, 10)
+    # the largest k asked for replaced the smaller one and serves the rest
+    assert len(table.peek(("top", keys))) == 50
+    assert list(engine.top(keys, 10)) == expected(table, keys)[:10]
+    assert table.peek(("order", keys)) is None
+    table.update(next(iter(table.positions())), exam=0)
+    assert table.peek(("top", keys)) is None
+
+
+def test_parse_keys():
+    assert parse_keys("grade, percentage d, name") == (("grade", False), ("percentage", True), ("name", False))
+    assert parse_keys("Total desc,, code a", descending=True) == (("total", True), ("code", False))
+    assert parse_keys("exam", descending=True) == (("exam", True),)
+    for text in ("", " , ", "height", "name sideways", "grade, bogus d"):
+        with pytest.raises(ValueError):
+            parse_keys(text)
@@ -0,0 +1,67 @@
+"""summarise() against statistics computed directly from the rows."""
+
+import random
+import statistics
+
+import pytest
+
+import student_stats
+from student_stats import MarkColumns, grade_for, percentage, summarise
+from student_store import StudentTable
+
+
+@pytest.fixture(params=["numpy", "python"])
+def use_numpy(request):
+    if request.param == "numpy" and student_stats.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param == "numpy"
+
+
+def expected(totals):
+    pct = [percentage(t) for t in totals]
+    grades = dict.fromkeys(student_stats.GRADES, 0)
+    for p in pct:
+        grades[grade_for(p)] += 1
+    return {"count": len(pct), "mean": statistics.fmean(pct), "median": statistics.median(pct),
+            "stddev": statistics.pstdev(pct), "min": min(pct), "max": max(pct), "grades": grades}
+
+
+def check(summary, totals, positions):
+    want = expected(totals)
+    assert summary.count == want["count"] and summary.grades == want["grades"]
+    for key in ("mean", "median", "stddev", "min", "max"):
+        assert getattr(summary, key) == pytest.approx(want[key]), key
+    by_pos = dict(zip(positions, totals))
+    # the first row holding the lowest / highest total
+    assert summary.lowest == next(p for p in positions if by_pos[p] == min(totals))
+    assert summary.highest == next(p for p in positions if by_pos[p] == max(totals))
+
+
+def test_table_summary(use_numpy):
+    rng = random.Random(4)
+    table = StudentTable([(1000 + i, f"S{i}", rng.randint(0, 20), rng.randint(0, 20),
+                           rng.randint(0, 20), rng.randint(0, 100)) for i in range(3000)])
+    for pos in rng.sample(range(3000), 300):
+        table.remove(pos)
+    positions = list(table.positions())
+    totals = [table.value(p, "total") for p in positions]
+    check(summarise(table, use_numpy), totals, positions)
+    percentiles = summarise(table, use_numpy).percentiles
+    assert percentiles[50] == pytest.approx(percentage(statistics.median(totals)))
+
+
+def test_summary_is_cached_until_an_edit(use_numpy):
+    table = StudentTable([(1, "A", 1, 1, 1, 1), (2, "B", 20, 20, 20, 100)])
+    first = summarise(table, use_numpy)
+    assert summarise(table, use_numpy) is first
+    table.update(0, exam=100)
+    assert summarise(table, use_numpy).min == percentage(103)
+    assert summarise(StudentTable(), use_numpy) is None
+
+
+def test_unchecked_marks(use_numpy):
+    # Exercise 3 loads marks without a range check: none of them may fail the summary
+    for m1 in ([-5, 20, 70000, 3], [10 ** 12, 1, 2, 3]):
+        cols = MarkColumns(m1, [1, 2, 3, 4], [0, 0, 0, 0], [10, 100, -1, 50])
+        totals = [a + b + c + d for a, b, c, d in zip(m1, [1, 2, 3, 4], [0] * 4, [10, 100, -1, 50])]
+        check(summarise(cols, use_numpy), totals, list(range(4)))
@@ -1,6 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import os
+import sys
+
+# background.py, record_view.py and the aggregate engine (student_stats.py)
+# are shared by the exercises, from common/ at the top of the repo
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+from background import BackgroundTasks, Cancelled
+from record_view import RecordView
+from student_stats import MarkColumns, summarise
 
 # Color Scheme
 BG_COLOR = "#f5f5f5"
@@ -14,6 +22,8 @@ LIGHT_TEXT = "#ffffff"
 
 class Student:
     """Class to represent a student with their marks"""
+    __slots__ = ("student_num", "name", "coursework1", "coursework2", "coursework3", "exam")
+
     def __init__(self, student_num, name, coursework1, coursework2, coursework3, exam):
         self.student_num = student_num
         self.name = name
@@ -56,6 +66,92 @@ class Student:
                 f"{'-' * 50}")
 
 
+SEARCH_DEBOUNCE_MS = 150
+RECORD_LINES = 7   # lines produced by Student.format_record()
+
+
+class IncrementalFilter:
+    """
+    Case-insensitive substring filter over a fixed list of display strings.
+
+    Results are cached per search text. Typing more characters narrows the
+    smallest cached result whose text is contained in the new text, and
+    deleting characters finds the shorter text already in the cache.
+    """
+    def __init__(self, items, cache_size=64):
+        self.items = items
+        self.lowered = [item.lower() for item in items]
+        self.cache = {"": list(range(len(items)))}
+        self.cache_size = cache_size
+
+    def matches(self, text):
+        """Return the indexes of items containing text"""
+        text = text.lower()
+        hits = self.cache.get(text)
+        if hits is not None:
+            return hits
+        base = min((hits for key, hits in self.cache.items() if key in text), key=len)
+        lowered = self.lowered
+        hits = [i for i in base if text in lowered[i]]
+        if len(self.cache) >= self.cache_size:
+            # forget the oldest search, but always keep the full list
+            del self.cache[next(k for k in self.cache if k)]
+        self.cache[text] = hits
+        return hits
+
+
+def summarise_students(students):
+    """student_stats.summarise() over the students' marks (None if there are none)"""
+    return summarise(MarkColumns((s.coursework1 for s in students), (s.coursework2 for s in students),
+                                 (s.coursework3 for s in students), (s.exam for s in students)))
+
+
+class NoStudentsError(ValueError):
+    """studentMarks.txt was read but held no usable records."""
+
+
+def read_students(task, file_path):
+    """
+    Parse studentMarks.txt into Student objects and summarise them.
+    Runs on the background worker; returns (students, summary).
+    """
+    students = []
+    size = os.path.getsize(file_path)
+    done = 0
+    with open(file_path, "r", encoding="utf-8") as file:
+        first = file.readline()
+        if not first:
+            raise NoStudentsError("File is empty!")
+        done += len(first)
+
+        # First line contains number of students
+        num_students = int(first.strip())
+
+        # Parse each student record
+        for i, line in enumerate(file, start=1):
+            if i > num_students:
+                break
+            done += len(line)
+            if not i % 65536:
+                task.progress(min(done, size), size)
+            parts = line.strip().split(',')
+
+            if len(parts) == 6:
+                student_num = parts[0].strip()
+                name = parts[1].strip()
+                cw1 = parts[2].strip()
+                cw2 = parts[3].strip()
+                cw3 = parts[4].strip()
+                exam = parts[5].strip()
+
+                students.append(Student(student_num, name, cw1, cw2, cw3, exam))
+
+    if not students:
+        raise NoStudentsError("No valid student records found!")
+    task.progress(size, size)
+    return students, summarise_students(students)
+
+
 class StudentManagerApp:
     def __init__(self, root):
         self.root = root
@@ -64,60 +160,63 @@ class StudentManagerApp:
         self.root.configure(bg=BG_COLOR)
         
         self.students = []
-        self.load_students()
-        
+        self.summary = summarise_students(self.students)
+        self.tasks = BackgroundTasks(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+
         self.create_widgets()
+        self.load_students()
     
     def load_students(self):
-        """Load student data from studentMarks.txt file"""
-        try:
-            # Get the directory where this script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(script_dir, "studentMarks.txt")
-            
-            with open(file_path, "r", encoding="utf-8") as file:
-                lines = file.readlines()
-                
-                if not lines:
-                    messagebox.showerror("Error", "File is empty!")
-                    self.root.quit()
-                    return
-                
-                # First line contains number of students
-                num_students = int(lines[0].strip())
-                
-                # Parse each student record
-                for i in range(1, num_students + 1):
-                    if i < len(lines):
-                        line = lines[i].strip()
-                        parts = line.split(',')
-                        
-                        if len(parts) == 6:
-                            student_num = parts[0].strip()
-                            name = parts[1].strip()
-                            cw1 = parts[2].strip()
-                            cw2 = parts[3].strip()
-                            cw3 = parts[4].strip()
-                            exam = parts[5].strip()
-                            
-                            student = Student(student_num, name, cw1, cw2, cw3, exam)
-                            self.students.append(student)
-                
-                if not self.students:
-                    messagebox.showerror("Error", "No valid student records found!")
-                    self.root.quit()
-                    return
-                
-                print(f"✅ Successfully loaded {len(self.students)} students!")
-                
-        except FileNotFoundError:
-            messagebox.showerror("Error", 
+        """Load studentMarks.txt on the background worker"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        file_path = os.path.join(script_dir, "studentMarks.txt")
+        self.set_loading(True)
+        self.tasks.submit(read_students, file_path,
+                          on_done=self.students_loaded,
+                          on_error=self.load_failed,
+                          on_progress=self.show_progress)
+
+    def students_loaded(self, result):
+        self.students, self.summary = result
+        self.set_loading(False)
+        self.info_label.config(text=f"Total Students: {len(self.students)}")
+        print(f"✅ Successfully loaded {len(self.students)} students!")
+
+    def load_failed(self, error):
+        self.set_loading(False)
+        if isinstance(error, Cancelled):
+            self.info_label.config(text="Loading cancelled - no students loaded")
+            return
+        if isinstance(error, FileNotFoundError):
+            messagebox.showerror("Error",
                 f"studentMarks.txt file not found!\n\nMake sure the file is in the same folder as this script.")
-            self.root.quit()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading student data: {str(e)}")
-            self.root.quit()
-    
+        elif isinstance(error, NoStudentsError):
+            messagebox.showerror("Error", str(error))
+        else:
+            messagebox.showerror("Error", f"Error loading student data: {str(error)}")
+        self.root.quit()
+
+    def set_loading(self, loading):
+        """Show the progress bar and lock the menu while the file loads"""
+        for btn in self.menu_buttons:
+            btn.config(state=tk.DISABLED if loading else tk.NORMAL)
+        if loading:
+            self.info_label.config(text="Loading students...")
+            self.progress.config(value=0)
+            self.progress_frame.pack(after=self.info_label, pady=(0, 10))
+        else:
+            self.progress_frame.pack_forget()
+
+    def show_progress(self, done, total):
+        if total:
+            self.progress.config(value=done / total)
+            self.info_label.config(text=f"Loading students... {done * 100 // total}%")
+
+    def quit_app(self):
+        self.tasks.shutdown()
+        self.root.destroy()
+
     def create_widgets(self):
         """Create all GUI widgets"""
         # Header
@@ -132,14 +231,20 @@ class StudentManagerApp:
         header.pack(fill=tk.X)
         
         # Info label
-        info_label = tk.Label(
+        self.info_label = tk.Label(
             self.root,
             text=f"Total Students: {len(self.students)}",
             font=("Arial", 12),
             bg=BG_COLOR,
             fg=TEXT_COLOR
         )
-        info_label.pack(pady=10)
+        self.info_label.pack(pady=10)
+
+        # Load progress, shown while studentMarks.txt is read
+        self.progress_frame = tk.Frame(self.root, bg=BG_COLOR)
+        self.progress = ttk.Progressbar(self.progress_frame, length=300, maximum=1.0)
+        self.progress.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.progress_frame, text="Cancel", command=self.tasks.cancel_all).pack(side=tk.LEFT)
         
         # Button Frame
         button_frame = tk.Frame(self.root, bg=BG_COLOR)
@@ -151,9 +256,10 @@ class StudentManagerApp:
             ("🔍 View Individual Student", self.view_individual_student),
             ("🏆 Highest Score", self.show_highest_score),
             ("⚠️ Lowest Score", self.show_lowest_score),
-            ("❌ Exit", self.root.destroy)
+            ("❌ Exit", self.quit_app)
         ]
-        
+
+        self.menu_buttons = []
         for text, command in buttons:
             btn = tk.Button(
                 button_frame,
@@ -170,6 +276,8 @@ class StudentManagerApp:
                 command=command
             )
             btn.pack(pady=5)
+            if "Exit" not in text:
+                self.menu_buttons.append(btn)
         
         # Output Frame with Scrolled Text
         output_frame = tk.LabelFrame(
@@ -194,9 +302,27 @@ class StudentManagerApp:
             borderwidth=0
         )
         self.output_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        
+        # Virtualized view used instead of output_text for the full roster
+        self.record_view = RecordView(
+            output_frame,
+            RECORD_LINES,
+            caption_side=tk.TOP,
+            caption_opts={"font": ("Courier New", 10, "bold"), "bg": BG_COLOR, "fg": TEXT_COLOR},
+            font=("Courier New", 10),
+            bg="#ffffff",
+            fg=TEXT_COLOR,
+            relief=tk.FLAT,
+            borderwidth=0
+        )
+        self.showing_records = False
     
     def clear_output(self):
         """Clear the output text area"""
+        if self.showing_records:
+            self.record_view.pack_forget()
+            self.output_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+            self.showing_records = False
         self.output_text.delete(1.0, tk.END)
     
     def display_output(self, text):
@@ -206,26 +332,27 @@ class StudentManagerApp:
     
     def view_all_students(self):
         """Display all student records"""
-        output = "=" * 50 + "\n"
-        output += "ALL STUDENT RECORDS\n"
-        output += "=" * 50 + "\n\n"
-        
-        total_percentage = 0
-        
-        for student in self.students:
-            output += student.format_record() + "\n"
-            total_percentage += student.overall_percentage()
-        
         # Summary
-        avg_percentage = total_percentage / len(self.students)
-        output += "\n" + "=" * 50 + "\n"
-        output += "SUMMARY\n"
-        output += "=" * 50 + "\n"
-        output += f"Total Students: {len(self.students)}\n"
-        output += f"Average Percentage: {avg_percentage:.2f}%\n"
-        output += "=" * 50 + "\n"
-        
-        self.display_output(output)
+        st = self.summary
+        title = "ALL STUDENT RECORDS\n"
+        title += f"Total Students: {len(self.students)}   "
+        if st is not None:
+            title += f"Average Percentage: {st.mean:.2f}%\n"
+            title += (f"Median: {st.median:.2f}%  Std dev: {st.stddev:.2f}  "
+                      f"Range: {st.min:.2f}% - {st.max:.2f}%\n")
+            title += "Percentiles: " + "  ".join(f"P{q}={v:.1f}%" for q, v in st.percentiles.items()) + "\n"
+            title += "Grades: " + "  ".join(f"{g}: {n}" for g, n in st.grades.items()) + "\n"
+        title += "=" * 50
+        
+        # Records are rendered on demand as the view scrolls
+        if not self.showing_records:
+            self.output_text.pack_forget()
+            self.record_view.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+            self.showing_records = True
+        self.record_view.set_source(
+            len(self.students),
+            lambda i: self.students[i].format_record(),
+            title)
     
     def view_individual_student(self):
         """Display individual student record via selection window"""
@@ -279,25 +406,39 @@ class StudentManagerApp:
             list_frame,
             font=("Courier New", 10),
             yscrollcommand=scrollbar.set,
-            selectmode=tk.SINGLE
+            selectmode=tk.SINGLE,
+            selectbackground=BUTTON_COLOR
         )
         student_listbox.pack(fill=tk.BOTH, expand=True)
         scrollbar.config(command=student_listbox.yview)
         
         # Populate listbox
+        search_filter = IncrementalFilter(
+            [f"{student.student_num} - {student.name}" for student in self.students])
+        # student indexes currently in the listbox, and the debounce timer
+        state = {"shown": None, "timer": None}
+        
         def populate_listbox(filter_text=""):
+            state["timer"] = None
+            if not student_listbox.winfo_exists():
+                return
+            hits = search_filter.matches(filter_text)
+            if hits is state["shown"]:
+                return
+            items = search_filter.items
             student_listbox.delete(0, tk.END)
-            for idx, student in enumerate(self.students):
-                display_text = f"{student.student_num} - {student.name}"
-                if filter_text.lower() in display_text.lower():
-                    student_listbox.insert(tk.END, display_text)
-                    student_listbox.itemconfig(tk.END, {'selectbackground': BUTTON_COLOR})
+            if hits:
+                student_listbox.insert(tk.END, *[items[i] for i in hits])
+            state["shown"] = hits
         
         populate_listbox()
         
-        # Search functionality
+        # Search functionality (debounced so fast typing filters once)
         def on_search(*args):
-            populate_listbox(search_var.get())
+            if state["timer"] is not None:
+                select_window.after_cancel(state["timer"])
+            state["timer"] = select_window.after(
+                SEARCH_DEBOUNCE_MS, lambda: populate_listbox(search_var.get()))
         
         search_var.trace('w', on_search)
         
@@ -305,18 +446,13 @@ class StudentManagerApp:
         def view_selected():
             selection = student_listbox.curselection()
             if selection:
-                selected_text = student_listbox.get(selection[0])
-                student_num = selected_text.split(' - ')[0]
-                
-                for student in self.students:
-                    if student.student_num == student_num:
-                        output = "=" * 50 + "\n"
-                        output += "INDIVIDUAL STUDENT RECORD\n"
-                        output += "=" * 50 + "\n\n"
-                        output += student.format_record()
-                        self.display_output(output)
-                        select_window.destroy()
-                        return
+                student = self.students[state["shown"][selection[0]]]
+                output = "=" * 50 + "\n"
+                output += "INDIVIDUAL STUDENT RECORD\n"
+                output += "=" * 50 + "\n\n"
+                output += student.format_record()
+                self.display_output(output)
+                select_window.destroy()
             else:
                 messagebox.showwarning("No Selection", "Please select a student!")
         
@@ -349,7 +485,7 @@ class StudentManagerApp:
             messagebox.showwarning("No Data", "No student records available!")
             return
         
-        highest_student = max(self.students, key=lambda s: s.overall_percentage())
+        highest_student = self.students[self.summary.highest]
         
         output = "=" * 50 + "\n"
         output += "🏆 STUDENT WITH HIGHEST SCORE\n"
@@ -364,7 +500,7 @@ class StudentManagerApp:
             messagebox.showwarning("No Data", "No student records available!")
             return
         
-        lowest_student = min(self.students, key=lambda s: s.overall_percentage())
+        lowest_student = self.students[self.summary.lowest]
         
         output = "=" * 50 + "\n"
         output += "⚠️ STUDENT WITH LOWEST SCORE\n"
@@ -0,0 +1,113 @@
+"""
+Benchmarks for the Exercise 3 Student Manager.
+
+Usage:
+    python bench.py keystrokes [--size 100000]
+
+The app script has spaces in its file name, so it is loaded through
+importlib rather than imported.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import time
+import tkinter as tk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_app():
+    spec = importlib.util.spec_from_file_location(
+        "student_manager", os.path.join(HERE, "Ex 3 Student Manager.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_students(app, n, seed=1):
+    rnd = random.Random(seed)
+    first = ["Lee", "Gareth", "Jake", "Alan", "John", "Sam", "Matt", "Ron", "Jo", "Les"]
+    last = ["Scott", "Southgate", "Hobbs", "Shearer", "Curry", "Thompson", "Herrema", "Hyde"]
+    return [app.Student(str(rnd.randint(1000, 9999)), f"{rnd.choice(first)} {rnd.choice(last)}",
+                        rnd.randint(0, 20), rnd.randint(0, 20), rnd.randint(0, 20), rnd.randint(0, 100))
+            for _ in range(n)]
+
+
+def keystrokes(word):
+    """Type word one character at a time, then delete it again"""
+    texts = [word[:i] for i in range(1, len(word) + 1)]
+    return texts + texts[-2::-1] + [""]
+
+
+def legacy_populate(listbox, students, filter_text):
+    # the original populate_listbox(): full rebuild on every keystroke
+    if listbox is not None:
+        listbox.delete(0, tk.END)
+    for student in students:
+        display_text = f"{student.student_num} - {student.name}"
+        if filter_text.lower() in display_text.lower():
+            if listbox is not None:
+                listbox.insert(tk.END, display_text)
+                listbox.itemconfig(tk.END, {'selectbackground': "#3498db"})
+
+
+def incremental_populate(listbox, search_filter, filter_text):
+    hits = search_filter.matches(filter_text)
+    if listbox is not None:
+        listbox.delete(0, tk.END)
+        if hits:
+            listbox.insert(tk.END, *[search_filter.items[i] for i in hits])
+
+
+def bench_keystrokes(args):
+    app = load_app()
+    students = make_students(app, args.size)
+    try:
+        root = tk.Tk()
+        listbox = tk.Listbox(root)
+        where = "with Tk Listbox"
+    except tk.TclError:
+        root = listbox = None
+        where = "filter only (no display for a Tk Listbox)"
+
+    texts = keystrokes(args.word)
+    print(f"{args.size:,} students, {len(texts)} keystrokes typing/deleting {args.word!r}, {where}")
+    t0 = time.perf_counter()
+    search_filter = app.IncrementalFilter(
+        [f"{s.student_num} - {s.name}" for s in students])
+    print(f"  filter setup: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    for label, populate in (("legacy", lambda t: legacy_populate(listbox, students, t)),
+                            ("incremental", lambda t: incremental_populate(listbox, search_filter, t))):
+        lat = []
+        for text in texts:
+            t0 = time.perf_counter()
+            populate(text)
+            if root is not None:
+                root.update_idletasks()
+            lat.append(time.perf_counter() - t0)
+        lat_ms = sorted(x * 1000 for x in lat)
+        print(f"  {label:>11}: mean {sum(lat_ms) / len(lat_ms):8.2f} ms  "
+              f"p50 {lat_ms[len(lat_ms) // 2]:8.2f} ms  max {lat_ms[-1]:8.2f} ms per keystroke")
+
+    if root is not None:
+        root.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("keystrokes", help="per-keystroke latency of the student picker filter")
+    p.add_argument("--size", type=int, default=100_000)
+    p.add_argument("--word", default="lee scott")
+    p.set_defaults(func=bench_keystrokes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
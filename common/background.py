@@ -0,0 +1,151 @@
+"""
+Run slow work (file loading, saving, statistics) off the Tk event thread.
+
+Tk widgets may only be touched from the thread running mainloop(), so a
+task's function runs on a worker thread and never sees the UI: its
+result, error and progress reports are put on a queue that the UI thread
+drains with root.after(). Usage:
+
+    tasks = BackgroundTasks(root)
+    tasks.submit(load, path, on_done=show, on_progress=bar.update)
+
+    def load(task, path):
+        for i, line in enumerate(lines):
+            task.progress(i, total)     # raises Cancelled after task.cancel()
+        return result
+
+Tasks run one at a time, in the order they were submitted.
+"""
+
+import queue
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """Raised inside a task's function once the task has been cancelled."""
+
+
+class Task:
+    def __init__(self, fn, args, on_done, on_error, on_progress, label):
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.label = label
+        self._cancel = threading.Event()
+        self._results = None        # set by BackgroundTasks
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        """Raise Cancelled if the task has been cancelled"""
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def progress(self, done, total=None):
+        """Report progress from the worker; also a cancellation point"""
+        self.check()
+        now = time.monotonic()
+        # the UI polls a few times a second: more reports are wasted work
+        if self.on_progress is not None and (now - self._last_report >= 0.05 or done == total):
+            self._last_report = now
+            self._results.put((self, "progress", (done, total)))
+
+
+class BackgroundTasks:
+    def __init__(self, root, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.current = None
+        self._polling = None
+        self._worker = threading.Thread(target=self._run, name="background-tasks", daemon=True)
+        self._worker.start()
+
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None, label=""):
+        """
+        Run fn(task, *args) on the worker thread. on_done(result),
+        on_error(exception) and on_progress(done, total) are then called
+        on the UI thread; a task stopped by cancel() calls
+        on_error(Cancelled()).
+        """
+        task = Task(fn, args, on_done, on_error, on_progress, label)
+        task._results = self.results
+        self.pending += 1
+        self.jobs.put(task)
+        if self._polling is None:
+            self._polling = self.root.after(self.poll_ms, self._poll)
+        return task
+
+    def cancel_all(self):
+        with self.jobs.mutex:
+            waiting = list(self.jobs.queue)
+        for task in waiting:
+            task.cancel()
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.jobs.put(None)
+        if self._polling is not None:
+            self.root.after_cancel(self._polling)
+            self._polling = None
+
+    # Worker thread
+
+    def _run(self):
+        while True:
+            task = self.jobs.get()
+            if task is None:
+                return
+            self.current = task
+            try:
+                task.check()
+                result = ("done", task.fn(task, *task.args))
+            except BaseException as e:    # handed to the UI thread, never lost
+                result = ("error", e)
+            self.current = None
+            self.results.put((task, *result))
+
+    # UI thread
+
+    def _poll(self):
+        self._polling = None
+        try:
+            while True:
+                try:
+                    task, kind, value = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "progress":
+                    if not task.cancelled:
+                        task.on_progress(*value)
+                    continue
+                self.pending -= 1
+                if kind == "done":
+                    # a task that finished before it noticed cancel() still
+                    # hands over its result, so nothing it opened is leaked
+                    if task.on_done is not None:
+                        task.on_done(value)
+                elif task.on_error is not None:
+                    task.on_error(value)
+                elif not isinstance(value, Cancelled):
+                    raise value
+        finally:
+            if self.pending and self._polling is None:
+                self._polling = self.root.after(self.poll_ms, self._poll)
@@ -0,0 +1,96 @@
+"""
+Virtualized record list for the Student Managers (Exercise 3 and its
+Extension).
+
+Only the records that fit in the window are ever inserted into the Text
+widget. Scrolling moves a window over the record indexes and asks the
+render callback for the newly visible records, so opening the view costs
+the same for 100 records as for a million.
+"""
+
+import tkinter as tk
+from tkinter import font as tkfont
+
+
+class RecordView(tk.Frame):
+    """
+    Scrollable, read-only list of fixed-height records.
+
+    set_source(count, render) shows records 0..count-1, where render(i)
+    returns the text of record i as exactly `lines_per_record` lines. A
+    caption (the footer) sits below the records, or above them with
+    caption_side=tk.TOP; caption_opts are passed on to its Label.
+    """
+
+    def __init__(self, parent, lines_per_record, bg=None, caption_side=tk.BOTTOM,
+                 caption_opts=None, **text_opts):
+        super().__init__(parent, bg=bg)
+        self.lines_per_record = lines_per_record
+        self.count = 0
+        self.render = None
+        self.first = 0
+
+        self.footer = tk.Label(self, **{"anchor": "w", "justify": tk.LEFT, "bg": bg, **(caption_opts or {})})
+        self.footer.pack(side=caption_side, fill=tk.X)
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self, wrap=tk.NONE, bg=bg, state=tk.DISABLED, **text_opts)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+
+        self.text.bind("<Configure>", lambda e: self.render_window())
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        self.text.bind("<Up>", lambda e: self.scroll(-1))
+        self.text.bind("<Down>", lambda e: self.scroll(1))
+        self.text.bind("<Prior>", lambda e: self.scroll(-self.visible_records()))
+        self.text.bind("<Next>", lambda e: self.scroll(self.visible_records()))
+        self.text.bind("<Home>", lambda e: self.scroll_to(0))
+        self.text.bind("<End>", lambda e: self.scroll_to(self.count))
+
+    def set_source(self, count, render, footer=""):
+        self.count = count
+        self.render = render
+        self.first = 0
+        self.footer.config(text=footer)
+        self.render_window()
+
+    def set_footer(self, text):
+        self.footer.config(text=text)
+
+    def visible_records(self):
+        height = self.text.winfo_height()
+        lines = height // self.line_height if height > 1 else int(self.text.cget("height"))
+        # one extra record so a partly visible one at the bottom is drawn
+        return max(1, lines // self.lines_per_record + 1)
+
+    def render_window(self):
+        visible = self.visible_records()
+        self.first = max(0, min(self.first, self.count - visible + 1))
+        end = min(self.count, self.first + visible)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if self.render is not None and end > self.first:
+            self.text.insert("1.0", "\n".join(self.render(i) for i in range(self.first, end)))
+        self.text.config(state=tk.DISABLED)
+        if self.count:
+            self.scrollbar.set(self.first / self.count, end / self.count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, first):
+        self.first = first
+        self.render_window()
+        return "break"
+
+    def scroll(self, records):
+        return self.scroll_to(self.first + records)
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'/'pages')"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == "scroll":
+            step = self.visible_records() if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
@@ -0,0 +1,155 @@
+"""
+Aggregate engine for the Student Managers (Exercise 3 and its Extension).
+
+One pass over the mark columns of a StudentTable builds a histogram of
+totals (out of 160). Because totals only take a few hundred distinct
+values, min, max, mean, median, stddev, percentiles and the grade
+distribution are then all read off that histogram. NumPy is used when it
+is installed; otherwise the pass runs through C-level map()/Counter.
+
+Rosters that are not a StudentTable (Exercise 3 keeps Student objects)
+are summarised through MarkColumns, which holds just the columns read.
+"""
+
+from array import array
+from collections import Counter, namedtuple
+from itertools import compress
+from operator import add
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GRADES = ("A", "B", "C", "D", "F")
+# lowest percentage for each grade, best first; anything lower is an F
+GRADE_FLOORS = ((70, "A"), (60, "B"), (50, "C"), (40, "D"))
+PERCENTILES = (10, 25, 50, 75, 90)
+SPAN_MAX = 1 << 16      # widest range of totals counted with a bincount
+
+Summary = namedtuple("Summary", [
+    "count", "mean", "median", "stddev", "min", "max",
+    "lowest", "highest",    # row positions of the lowest / highest student
+    "percentiles",          # {10: pct, 25: pct, ...}
+    "grades",               # {"A": count, ..., "F": count}
+])
+
+
+class MarkColumns:
+    """
+    The mark columns summarise() reads, built from four iterables of marks.
+    Exercise 3 does not range-check marks, so they are kept as signed
+    64-bit ints rather than the StudentTable's uint16.
+    """
+
+    def __init__(self, m1, m2, m3, exam):
+        self.m1, self.m2, self.m3, self.exam = (array("q", marks) for marks in (m1, m2, m3, exam))
+        self.size = self.live = len(self.m1)
+        self.alive = bytearray(b"\x01") * self.size
+        self._derived = {}
+
+    def __len__(self):
+        return self.live
+
+    def cached(self, key, compute):
+        if key not in self._derived:
+            self._derived[key] = compute(self)
+        return self._derived[key]
+
+
+def percentage(total):
+    return (total / 160.0) * 100
+
+
+def grade_for(pct):
+    for floor, grade in GRADE_FLOORS:
+        if pct >= floor:
+            return grade
+    return "F"
+
+
+def _histogram_numpy(table):
+    m1, m2, m3, exam = (np.asarray(getattr(table, k)) for k in ("m1", "m2", "m3", "exam"))
+    totals = m1.astype(np.int64) + m2 + m3 + exam
+    pos = None
+    if table.live != table.size:
+        # skip removed rows, remembering where the survivors sit
+        pos = np.flatnonzero(np.frombuffer(table.alive, dtype=np.uint8))
+        totals = totals[pos]
+    lowest, highest = int(totals.argmin()), int(totals.argmax())
+    lo, hi = int(totals[lowest]), int(totals[highest])
+    if pos is not None:
+        lowest, highest = int(pos[lowest]), int(pos[highest])
+    if hi - lo > SPAN_MAX:
+        # unchecked marks (MarkColumns) can spread too far for a bincount
+        values, counts = np.unique(totals, return_counts=True)
+        return list(zip(values.tolist(), counts.tolist())), lowest, highest
+    counts = np.bincount(totals - lo)
+    values = np.flatnonzero(counts)
+    return list(zip((values + lo).tolist(), counts[values].tolist())), lowest, highest
+
+
+def _histogram_python(table):
+    totals = array("q", map(add, map(add, table.m1, table.m2), map(add, table.m3, table.exam)))
+    counts = Counter(compress(totals, table.alive))
+    hist = sorted(counts.items())
+    return hist, _first_alive(table, totals, hist[0][0]), _first_alive(table, totals, hist[-1][0])
+
+
+def _first_alive(table, totals, value):
+    pos = totals.index(value)
+    while not table.alive[pos]:
+        pos = totals.index(value, pos + 1)
+    return pos
+
+
+def _value_at(hist, rank):
+    """Value of the rank-th (0-based) element of the sorted data behind hist"""
+    seen = 0
+    for value, count in hist:
+        seen += count
+        if rank < seen:
+            return value
+    return hist[-1][0]
+
+
+def _percentile(hist, n, q):
+    # linear interpolation between closest ranks, as numpy.percentile does
+    pos = (n - 1) * q / 100.0
+    lo = int(pos)
+    lo_val = _value_at(hist, lo)
+    if pos == lo:
+        return lo_val
+    hi_val = _value_at(hist, lo + 1)
+    return lo_val + (hi_val - lo_val) * (pos - lo)
+
+
+def summarise(table, use_numpy=True):
+    """Compute a Summary of the table (None if empty), cached until the next edit"""
+    if not len(table):
+        return None
+    return table.cached("summary", lambda t: _summarise(t, use_numpy and np is not None))
+
+
+def _summarise(table, use_numpy):
+    hist, lowest, highest = (_histogram_numpy if use_numpy else _histogram_python)(table)
+    n = sum(c for _, c in hist)
+    mean = sum(v * c for v, c in hist) / n
+    var = sum((v - mean) ** 2 * c for v, c in hist) / n
+
+    grades = dict.fromkeys(GRADES, 0)
+    for value, count in hist:
+        grades[grade_for(percentage(value))] += count
+
+    return Summary(
+        count=n,
+        mean=percentage(mean),
+        median=percentage(_percentile(hist, n, 50)),
+        stddev=percentage(var ** 0.5),
+        min=percentage(hist[0][0]),
+        max=percentage(hist[-1][0]),
+        lowest=lowest,
+        highest=highest,
+        percentiles={q: percentage(_percentile(hist, n, q)) for q in PERCENTILES},
+        grades=grades,
+    )